@@ -0,0 +1,88 @@
+from web_scrapper.scrappers.audi.extractor_agent.deduplication import (
+    OfferDeduplicator,
+    build_template,
+    model_tokens,
+    simhash,
+)
+from web_scrapper.scrappers.audi.models_library import OfferSettings
+
+OFFER: str = (
+    "5.99% APR* For 60 Months.\n"
+    "Manufacturer Offers\n"
+    "5.99% APR for 60 months\n"
+    "Offer only valid Jun 04, 2024 through Jul 01, 2024\n"
+    "5.99% APR* for 60 months. For highly qualified customers.   See Trims\n"
+    "Disclaimer(s) :\n"
+    "*5.99% APR, no down payment required, available on new, unused 2023 Audi "
+    "A3/S3 models financed by Audi Financial Services through participating "
+    "dealers. Example: 5.99% APR, monthly payment for every $1,000 you finance "
+    "for 60 months is $19.33. Not all customers will qualify for credit approval "
+    "or advertised APR. Offer ends July 1, 2024. Subject to credit approval by "
+    "Audi Financial Services. Offer not valid in Puerto Rico. See your Audi "
+    "dealer for details or, for general product information, call "
+    "1.800.FOR.AUDI (367.2834). © 2024 Audi of America, Inc.\n"
+    "Request More Info\n"
+    "View Inventory"
+)
+TOKENS: list[str] = model_tokens("2023 Audi A3", "A3", 2023)
+
+
+def extract_names(offers: list[tuple[str, str]]) -> list[OfferSettings]:
+    # Stands in for the LLM, the name is the offer's own headline
+    return [
+        OfferSettings(name=" | ".join(offer.splitlines()[:2]), full_offer=offer)
+        for offer, _ in offers
+    ]
+
+
+def distance(first: str, second: str) -> int:
+    return (
+        simhash(build_template(first, TOKENS).template)
+        ^ simhash(build_template(second, TOKENS).template)
+    ).bit_count()
+
+
+def test_headline_change_is_extracted_again() -> None:
+    for original, changed in (
+        ("For 60 Months.", "For 60 Months On Select Models."),
+        ("Manufacturer Offers", "Dealer Offers"),
+    ):
+        other: str = OFFER.replace(original, changed, 1)
+        assert distance(OFFER, other) <= 3
+        deduplicator: OfferDeduplicator = OfferDeduplicator()
+
+        first, second = deduplicator.extract(
+            [(OFFER, "finance"), (other, "finance")], TOKENS, extract_names
+        )
+
+        assert first.name == "5.99% APR* For 60 Months. | Manufacturer Offers"
+        assert second.name == " | ".join(other.splitlines()[:2])
+        assert deduplicator.stats.near_duplicates == 0
+        assert deduplicator.stats.extracted == 2
+
+
+def test_disclaimer_change_reuses_the_extraction() -> None:
+    other: str = OFFER.replace("Offer not valid in Puerto Rico. ", "")
+    deduplicator: OfferDeduplicator = OfferDeduplicator()
+
+    first, second = deduplicator.extract(
+        [(OFFER, "finance"), (other, "finance")], TOKENS, extract_names
+    )
+
+    assert deduplicator.stats.near_duplicates == 1
+    assert deduplicator.stats.extracted == 1
+    assert second.name == first.name
+    assert second.full_offer == other
+
+
+def test_other_model_reuses_the_template() -> None:
+    other: str = OFFER.replace("2023 Audi A3", "2023 Audi Q5")
+    deduplicator: OfferDeduplicator = OfferDeduplicator()
+    deduplicator.extract([(OFFER, "finance")], TOKENS, extract_names)
+
+    (reused,) = deduplicator.extract(
+        [(other, "finance")], model_tokens("2023 Audi Q5", "Q5", 2023), extract_names
+    )
+
+    assert deduplicator.stats.template_duplicates == 1
+    assert reused.full_offer == other
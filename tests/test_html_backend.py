@@ -0,0 +1,73 @@
+from pathlib import Path
+
+import httpx
+import pytest
+
+from web_scrapper.scrappers.audi.backends.html_document import HtmlNode, parse_html
+from web_scrapper.scrappers.audi.backends.http_backend import HttpBackend
+from web_scrapper.scrappers.audi.backends.page_snapshot import PageSnapshot
+from web_scrapper.scrappers.audi.models_library import get_years
+
+FIXTURES: Path = Path(__file__).parent / "fixtures"
+URL: str = "https://dealer.example/incentives/index.htm"
+
+
+def load(name: str) -> tuple[HttpBackend, PageSnapshot]:
+    # The snapshot is what PAGE_SNAPSHOT_SCRIPT returns for the same saved page
+    html: str = (FIXTURES / f"{name}.html").read_text()
+    transport: httpx.MockTransport = httpx.MockTransport(
+        lambda request: httpx.Response(200, text=html)
+    )
+    backend: HttpBackend = HttpBackend(httpx.Client(transport=transport))
+    backend.load(URL)
+    snapshot: PageSnapshot = PageSnapshot.model_validate_json(
+        (FIXTURES / f"{name}.snapshot.json").read_text()
+    )
+    return backend, snapshot
+
+
+@pytest.mark.parametrize("div_number", range(1, 6))
+def test_listing_facets_match_selenium(div_number: int) -> None:
+    backend, snapshot = load("listing")
+
+    assert backend.get_facet_items(div_number) == snapshot.get_facet_items(div_number)
+
+
+def test_listing_models_match_selenium() -> None:
+    backend, snapshot = load("listing")
+
+    assert backend.get_models_count() == snapshot.get_models_count()
+    assert backend.get_model_tiles() == snapshot.get_model_tiles()
+
+
+def test_unclosed_list_items_are_siblings() -> None:
+    backend, _ = load("listing")
+
+    assert get_years(backend) == [2024, 2023, 2022]
+
+
+@pytest.mark.parametrize("offer_section", ["APR", "PROMOTION", "LEASE"])
+def test_detail_offers_match_selenium(offer_section: str) -> None:
+    backend, snapshot = load("detail")
+
+    assert backend.get_offer_texts(offer_section) == snapshot.get_offer_texts(
+        offer_section
+    )
+
+
+def test_nested_lists_keep_their_items() -> None:
+    document: HtmlNode = parse_html("<ul><li>A4<ul><li>Sedan<li>Avant</ul><li>Q5</ul>")
+    outer_list: HtmlNode | None = document.child("ul", 1)
+
+    assert outer_list is not None
+    assert [item.text for item in outer_list.children if not isinstance(item, str)] == [
+        "A4\nSedan\nAvant",
+        "Q5",
+    ]
+
+
+def test_deep_nesting_does_not_recurse() -> None:
+    document: HtmlNode = parse_html("<span>" * 20_000 + "Offer" + "<p>" * 20_000)
+
+    assert document.text == "Offer"
+    assert len(document.find_all(lambda node: node.tag == "span")) == 20_000
@@ -0,0 +1,41 @@
+import json
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from web_scrapper.benchmark.synthetic import load_offer_corpus
+from web_scrapper.cli import parse_args, save_data
+from web_scrapper.scrappers.audi.models_library import Offer
+from web_scrapper.sinks.jsonl_sink import iter_batches
+
+
+def test_batches_keep_every_item() -> None:
+    assert list(iter_batches(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+@pytest.mark.parametrize("size", [0, -1])
+def test_empty_batches_are_rejected(size: int) -> None:
+    with pytest.raises(ValueError):
+        list(iter_batches(range(5), size))
+
+
+@pytest.mark.parametrize("size", ["0", "-1"])
+def test_batch_size_option_is_validated(size: str) -> None:
+    with pytest.raises(SystemExit):
+        parse_args(["--batch-size", size])
+
+
+def test_each_page_is_flushed_before_the_next_is_extracted(tmp_path: Path) -> None:
+    offers: list[Offer] = load_offer_corpus()[:5]
+    output_file: Path = tmp_path / "offers.json"
+    jsonl_file: Path = output_file.with_suffix(".jsonl")
+
+    def extract_pages() -> Iterator[list[Offer]]:
+        yield offers[:3]
+        assert len(jsonl_file.read_bytes().splitlines()) == 3
+        yield offers[3:]
+
+    save_data(extract_pages(), output_file, sqlite_file=None, batch_size=2)
+
+    assert len(json.loads(output_file.read_text())) == 5
@@ -0,0 +1,168 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, BaseMessage
+
+from web_scrapper.scrappers.audi.extractor_agent.extraction import (
+    OfferExtractionInput,
+)
+from web_scrapper.scrappers.audi.extractor_agent.latency_budget import (
+    DeadlineExceeded,
+    LatencyBudget,
+)
+from web_scrapper.scrappers.audi.extractor_agent.offer_extractor_agent import (
+    OfferExtractor,
+)
+from web_scrapper.scrappers.audi.models_library import OfferSettings
+
+OFFER: OfferExtractionInput = OfferExtractionInput(
+    offer_type="finance", offer="5.99% APR* For 60 Months."
+)
+
+
+async def reply(value: str, seconds: float = 0.0) -> str:
+    await asyncio.sleep(seconds)
+    return value
+
+
+async def invalid_reply() -> str:
+    raise ValueError("Output is not a json object")
+
+
+class FakeChatModel:
+    # Stands in for ChatOpenAI, replies after a fixed delay
+    seconds: float
+    calls: int
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.calls = 0
+
+    async def ainvoke(self, messages: list[BaseMessage]) -> AIMessage:
+        self.calls += 1
+        await asyncio.sleep(self.seconds)
+        return AIMessage(content='{"name": "5.99% APR", "apr": "5.99%"}')
+
+
+def test_slow_primary_is_hedged() -> None:
+    budget: LatencyBudget = LatencyBudget(initial_hedge_delay_seconds=0.01)
+
+    result: str = asyncio.run(
+        budget.run(lambda: reply("primary", 1.0), lambda: reply("hedge"))
+    )
+
+    assert result == "hedge"
+    assert (budget.stats.hedged, budget.stats.hedge_wins) == (1, 1)
+
+
+def test_fast_primary_is_not_hedged() -> None:
+    budget: LatencyBudget = LatencyBudget(initial_hedge_delay_seconds=1.0)
+
+    result: str = asyncio.run(
+        budget.run(lambda: reply("primary"), lambda: reply("hedge"))
+    )
+
+    assert result == "primary"
+    assert budget.stats.hedged == 0
+
+
+def test_invalid_primary_reply_is_hedged_at_once() -> None:
+    budget: LatencyBudget = LatencyBudget(initial_hedge_delay_seconds=10.0)
+
+    result: str = asyncio.run(
+        asyncio.wait_for(budget.run(invalid_reply, lambda: reply("hedge")), 1.0)
+    )
+
+    assert result == "hedge"
+
+
+def test_no_hedge_when_disabled() -> None:
+    budget: LatencyBudget = LatencyBudget(hedge=False, initial_hedge_delay_seconds=0.01)
+
+    result: str = asyncio.run(
+        budget.run(lambda: reply("primary", 0.05), lambda: reply("hedge"))
+    )
+
+    assert result == "primary"
+    assert budget.stats.hedged == 0
+
+
+def test_deadline_cancels_every_call() -> None:
+    budget: LatencyBudget = LatencyBudget(
+        initial_hedge_delay_seconds=0.01, deadline_seconds=0.05
+    )
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(
+            budget.run(lambda: reply("primary", 1.0), lambda: reply("hedge", 1.0))
+        )
+    assert budget.stats.deadline_exceeded == 1
+
+
+def test_hedge_delay_follows_recorded_latencies() -> None:
+    budget: LatencyBudget = LatencyBudget(
+        hedge_percentile=50.0, min_samples=3, initial_hedge_delay_seconds=10.0
+    )
+    for seconds in (1.0, 2.0):
+        budget.record_latency(seconds)
+    assert budget.hedge_delay() == 10.0
+
+    budget.record_latency(3.0)
+
+    assert budget.hedge_delay() == 2.0
+
+
+def build_extractor(
+    monkeypatch: pytest.MonkeyPatch, budget: LatencyBudget
+) -> OfferExtractor:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    return OfferExtractor(
+        model_name="gpt-4o-mini",
+        system_message_prompt="Reply with a json object.",
+        human_message_prompt_template="{offer_type}: {offer}",
+        latency_budget=budget,
+    )
+
+
+def test_extractor_defers_offers_over_the_deadline(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    extractor: OfferExtractor = build_extractor(
+        monkeypatch, LatencyBudget(hedge=False, deadline_seconds=0.05)
+    )
+    extractor.llm = FakeChatModel(1.0)  # type: ignore[assignment]
+
+    extracted: OfferSettings = asyncio.run(extractor.aextract(OFFER))
+
+    assert extracted == OfferSettings(full_offer=OFFER.offer, deferred=True)
+
+
+def test_extractor_hedge_wins(monkeypatch: pytest.MonkeyPatch) -> None:
+    extractor: OfferExtractor = build_extractor(
+        monkeypatch, LatencyBudget(initial_hedge_delay_seconds=0.01)
+    )
+    extractor.llm = FakeChatModel(1.0)  # type: ignore[assignment]
+    extractor.hedge_llm = FakeChatModel(0.0)  # type: ignore[assignment]
+
+    extracted: OfferSettings = asyncio.run(extractor.aextract(OFFER))
+
+    assert (extracted.apr, extracted.deferred) == ("5.99%", False)
+    assert extractor.latency_budget is not None
+    assert extractor.latency_budget.stats.hedge_wins == 1
+
+
+def test_rate_limiter_wait_is_not_a_latency_sample(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    budget: LatencyBudget = LatencyBudget(hedge_percentile=100.0, min_samples=1)
+    extractor: OfferExtractor = build_extractor(monkeypatch, budget)
+    extractor.llm = FakeChatModel(0.0)  # type: ignore[assignment]
+
+    async def slow_acquire(tokens: int = 0) -> None:
+        await asyncio.sleep(0.2)
+
+    monkeypatch.setattr(extractor.rate_limiter, "acquire", slow_acquire)
+
+    asyncio.run(extractor.aextract(OFFER))
+
+    assert budget.hedge_delay() < 0.1
@@ -0,0 +1,60 @@
+import json
+from typing import Any
+
+import pytest
+
+from web_scrapper.scrappers.audi.extractor_agent.rule_based_extractor import (
+    RuleBasedExtraction,
+    RuleBasedExtractor,
+    evaluate_against_corpus,
+)
+from web_scrapper.scrappers.audi.models_library import OfferSettings
+from web_scrapper.settings import OUTPUT_FILE
+
+CORPUS: list[dict[str, Any]] = [
+    record["offer_settings"] for record in json.loads(OUTPUT_FILE.read_text())
+]
+
+
+@pytest.mark.parametrize("expected", CORPUS)
+def test_matches_the_llm_extraction(expected: dict[str, Any]) -> None:
+    offer_type: str = "finance" if expected["apr"] else "promotion"
+
+    extraction: RuleBasedExtraction = RuleBasedExtractor().extract(
+        expected["full_offer"], offer_type
+    )
+
+    assert extraction.confidence == 1.0
+    assert extraction.offer_settings == OfferSettings.model_validate(expected)
+
+
+def test_whole_corpus_skips_the_llm() -> None:
+    assert evaluate_against_corpus(OUTPUT_FILE) == {
+        "offers": float(len(CORPUS)),
+        "fast_path_coverage": 1.0,
+        "fast_path_accuracy": 1.0,
+    }
+
+
+def test_lease_wording_goes_to_the_llm() -> None:
+    finance_offer: str = next(offer["full_offer"] for offer in CORPUS if offer["apr"])
+    lease_offer: str = finance_offer.replace(
+        "Manufacturer Offers", "Manufacturer Offers\n$399/mo for 36 months", 1
+    )
+    extractor: RuleBasedExtractor = RuleBasedExtractor()
+
+    assert extractor.try_extract(finance_offer, "finance") is not None
+    assert extractor.try_extract(lease_offer, "finance") is None
+    assert (extractor.skipped_llm, extractor.sent_to_llm) == (1, 1)
+
+
+def test_missing_expiration_lowers_the_confidence() -> None:
+    promotion: str = next(offer["full_offer"] for offer in CORPUS if not offer["apr"])
+    undated: str = "\n".join(
+        line for line in promotion.split("\n") if "Offer only valid" not in line
+    )
+
+    extraction: RuleBasedExtraction = RuleBasedExtractor().extract(undated, "promotion")
+
+    assert extraction.missing_fields == ["expiration"]
+    assert extraction.confidence == 0.75
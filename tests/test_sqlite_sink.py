@@ -0,0 +1,38 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from web_scrapper.benchmark.synthetic import load_offer_corpus
+from web_scrapper.scrappers.audi.models_library import Offer, OfferSettings
+from web_scrapper.sinks.sqlite_sink import SqliteSink, query_offers
+
+
+def test_deferred_offer_keeps_the_earlier_extraction(tmp_path: Path) -> None:
+    database_file: Path = tmp_path / "offers.db"
+    offer: Offer = load_offer_corpus()[0]
+    assert offer.offer_settings is not None
+    deferred: Offer = offer.model_copy(
+        update={
+            "offer_settings": OfferSettings(
+                full_offer=offer.offer_settings.full_offer, deferred=True
+            )
+        }
+    )
+    for run_offer in (offer, deferred):
+        with SqliteSink(database_file) as sink:
+            sink.write(run_offer)
+
+    (stored,) = query_offers(database_file)
+
+    assert stored.offer_settings is not None
+    assert stored.offer_settings.name == offer.offer_settings.name
+    assert not stored.offer_settings.deferred
+
+
+def test_query_does_not_create_the_database(tmp_path: Path) -> None:
+    database_file: Path = tmp_path / "missing.db"
+
+    with pytest.raises(sqlite3.OperationalError):
+        query_offers(database_file)
+    assert not database_file.exists()
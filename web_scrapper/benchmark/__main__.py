@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+from functools import partial
+from pathlib import Path
+
+from web_scrapper.settings import (
+    AUDI_URL,
+    BENCHMARK_RECORDING_FILE,
+    BENCHMARK_RESULTS_FILE,
+    EXTRACTION_WORKERS,
+    LLM_DEADLINE_SECONDS,
+    LLM_HEDGE_INITIAL_DELAY_SECONDS,
+    SCRAPER_BACKEND,
+    SCRAPER_WORKERS,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m web_scrapper.benchmark",
+        description="Record the live pipeline or benchmark it against a replay",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="capture pages and LLM responses")
+    record.add_argument("--url", default=AUDI_URL)
+    record.add_argument("--backend", default=SCRAPER_BACKEND)
+    record.add_argument("--recording", type=Path, default=BENCHMARK_RECORDING_FILE)
+
+    run = commands.add_parser("run", help="benchmark against the replay server")
+    run.add_argument("--scales", type=int, nargs="*", default=[10, 100, 1000])
+    run.add_argument("--recording", type=Path, default=None)
+    run.add_argument("--backend", default="http")
+    run.add_argument("--workers", type=int, default=SCRAPER_WORKERS)
+    run.add_argument("--page-latency", type=float, default=0.0)
+    run.add_argument("--llm-latency", type=float, default=0.0)
+    run.add_argument("--no-fast-path", action="store_true")
+    run.add_argument("--no-dedup", action="store_true")
+    run.add_argument("--extraction-workers", type=int, default=EXTRACTION_WORKERS)
+    run.add_argument("--llm-tail-fraction", type=float, default=0.0)
+    run.add_argument("--llm-tail-latency", type=float, default=0.0)
+    run.add_argument("--no-latency-budget", action="store_true")
+    run.add_argument("--no-hedge", action="store_true")
+    run.add_argument(
+        "--hedge-initial-delay", type=float, default=LLM_HEDGE_INITIAL_DELAY_SECONDS
+    )
+    run.add_argument("--deadline", type=float, default=LLM_DEADLINE_SECONDS)
+    run.add_argument("--results", type=Path, default=BENCHMARK_RESULTS_FILE)
+
+    serialization = commands.add_parser(
+        "serialization", help="records/s and peak memory of saving offers"
+    )
+    serialization.add_argument("--offers", type=int, default=100_000)
+
+    query = commands.add_parser(
+        "query", help="queries/s of the offer query service under load"
+    )
+    query.add_argument("--offers", type=int, default=10_000)
+    query.add_argument("--clients", type=int, default=8)
+    query.add_argument("--seconds", type=float, default=10.0)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+    if args.command == "serialization":
+        from web_scrapper.benchmark.serialization import (
+            format_results,
+            run_serialization_benchmark,
+        )
+
+        print(format_results(run_serialization_benchmark(args.offers)))
+        return
+
+    if args.command == "query":
+        from web_scrapper.benchmark.query_load import (
+            format_results as format_query_results,
+        )
+        from web_scrapper.benchmark.query_load import run_query_benchmark
+
+        print(
+            format_query_results(
+                run_query_benchmark(args.offers, args.clients, args.seconds)
+            )
+        )
+        return
+
+    if args.command == "run":
+        # The replay server answers LLM calls, no real key is needed
+        os.environ.setdefault("OPENAI_API_KEY", "replay")
+
+    # Imported late so the environment is set before the extractor is built
+    from web_scrapper.benchmark.suite import record_session, run_suite
+    from web_scrapper.scrappers.audi.extractor_agent.offer_extractor_agent import (
+        build_latency_budget,
+    )
+
+    if args.command == "record":
+        record_session(args.recording, url=args.url, backend_kind=args.backend)
+        return
+
+    results = run_suite(
+        scales=args.scales,
+        recording_file=args.recording,
+        backend_kind=args.backend,
+        workers=args.workers,
+        page_latency_seconds=args.page_latency,
+        llm_latency_seconds=args.llm_latency,
+        fast_path=not args.no_fast_path,
+        deduplicate=not args.no_dedup,
+        extraction_workers=args.extraction_workers,
+        llm_tail_fraction=args.llm_tail_fraction,
+        llm_tail_latency_seconds=args.llm_tail_latency,
+        latency_budget=partial(
+            build_latency_budget,
+            not args.no_latency_budget,
+            not args.no_hedge,
+            args.hedge_initial_delay,
+            args.deadline,
+        ),
+    )
+    args.results.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.results, "w") as file:
+        json.dump([result.model_dump() for result in results], file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import logging
+import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+from pydantic import BaseModel
+
+from web_scrapper.benchmark.synthetic import load_offer_corpus
+from web_scrapper.instrumentation import percentile
+from web_scrapper.scrappers.audi.models_library import Offer, OfferSettings
+from web_scrapper.service.offer_index import (
+    LiveOfferIndex,
+    OfferIndex,
+    OfferQuery,
+    get_offer_type,
+    get_sort_value,
+    load_offers,
+    normalize,
+)
+from web_scrapper.service.server import OfferQueryServer
+from web_scrapper.sinks.jsonl_sink import write_offers_json
+
+
+class QueryLoadResult(BaseModel):
+    case: str
+    queries: int
+    seconds: float
+    queries_per_second: float
+    p50_ms: float
+    p99_ms: float
+    errors: int = 0
+    reloads: int = 0
+
+
+def synthetic_offers(offers_count: int, corpus: list[Offer]) -> list[Offer]:
+    # The corpus repeated as other dealers, with expirations spread over four
+    # weeks so date ranges select a part of the offers
+    offers: list[Offer] = []
+    for idx in range(offers_count):
+        offer: Offer = corpus[idx % len(corpus)]
+        offer_settings: OfferSettings = offer.offer_settings or OfferSettings()
+        expiration: str | None = offer_settings.expiration
+        if expiration is not None:
+            expiration = (
+                date.fromisoformat(expiration) + timedelta(days=idx % 28)
+            ).isoformat()
+        offers.append(
+            offer.model_copy(
+                update={
+                    "dealer": f"dealer-{idx // len(corpus)}",
+                    "offer_settings": offer_settings.model_copy(
+                        update={"expiration": expiration}
+                    ),
+                }
+            )
+        )
+    return offers
+
+
+def sample_queries(corpus: list[Offer]) -> list[OfferQuery]:
+    finance: Offer = next(
+        (offer for offer in corpus if get_offer_type(offer) == "finance"), corpus[0]
+    )
+    expirations: list[str] = sorted(
+        offer.offer_settings.expiration
+        for offer in corpus
+        if offer.offer_settings is not None and offer.offer_settings.expiration
+    )
+    week_start: date = (
+        date.fromisoformat(expirations[0]) if expirations else date.today()
+    )
+    return [
+        # Lowest APR for one model year
+        OfferQuery(
+            model=finance.model, year=finance.year, type="finance", sort="apr", limit=1
+        ),
+        # Promotions expiring within a week
+        OfferQuery(
+            type="promotion",
+            expires_from=week_start.isoformat(),
+            expires_to=(week_start + timedelta(days=6)).isoformat(),
+            limit=50,
+        ),
+        # Best rates of one dealer
+        OfferQuery(dealer="dealer-0", sort="apr", limit=10),
+        OfferQuery(trim=finance.trim, year=finance.year, limit=20),
+    ]
+
+
+def matches(offer: Offer, query: OfferQuery) -> bool:
+    expiration: str | None = (
+        offer.offer_settings.expiration if offer.offer_settings is not None else None
+    )
+    return (
+        all(
+            value is None
+            or normalize(
+                get_offer_type(offer) if field == "type" else getattr(offer, field)
+            )
+            == normalize(value)
+            for field, value in (
+                ("dealer", query.dealer),
+                ("model", query.model),
+                ("year", query.year),
+                ("trim", query.trim),
+                ("type", query.type),
+            )
+        )
+        and (query.expires_from is None or (expiration or "") >= query.expires_from)
+        and (
+            query.expires_to is None
+            or (expiration is not None and expiration <= query.expires_to)
+        )
+    )
+
+
+def scan(offers: list[Offer], query: OfferQuery) -> list[Offer]:
+    # How consumers answered queries before, one pass over every offer
+    found: list[Offer] = [offer for offer in offers if matches(offer, query)]
+    if query.sort is not None:
+        found = [
+            offer for offer in found if get_sort_value(offer, query.sort) is not None
+        ]
+        found.sort(key=lambda offer: get_sort_value(offer, query.sort))  # type: ignore
+    return found[: query.limit] if query.limit is not None else found
+
+
+def measure(
+    case: str, queries: list[OfferQuery], run: Callable[[OfferQuery], object], count: int
+) -> QueryLoadResult:
+    latencies: list[float] = []
+    start_time: float = time.perf_counter()
+    for idx in range(count):
+        query_start: float = time.perf_counter()
+        run(queries[idx % len(queries)])
+        latencies.append(time.perf_counter() - query_start)
+    seconds: float = time.perf_counter() - start_time
+    return summarize(case, latencies, seconds)
+
+
+def summarize(
+    case: str,
+    latencies: list[float],
+    seconds: float,
+    errors: int = 0,
+    reloads: int = 0,
+) -> QueryLoadResult:
+    result: QueryLoadResult = QueryLoadResult(
+        case=case,
+        queries=len(latencies),
+        seconds=seconds,
+        queries_per_second=len(latencies) / seconds if seconds else 0.0,
+        p50_ms=percentile(latencies, 50) * 1000,
+        p99_ms=percentile(latencies, 99) * 1000,
+        errors=errors,
+        reloads=reloads,
+    )
+    logging.info(
+        f"{case}: {result.queries_per_second:,.0f} queries/s, "
+        f"p50 {result.p50_ms:.3f}ms, p99 {result.p99_ms:.3f}ms"
+    )
+    return result
+
+
+def run_client(
+    origin: str, params: list[dict[str, Any]], offset: int, deadline: float
+) -> tuple[list[float], int]:
+    latencies: list[float] = []
+    errors: int = 0
+    with httpx.Client(base_url=origin) as client:
+        idx: int = offset
+        while time.perf_counter() < deadline:
+            query_start: float = time.perf_counter()
+            try:
+                response: httpx.Response = client.get(
+                    "/offers", params=params[idx % len(params)]
+                )
+                errors += response.status_code != 200
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - query_start)
+            idx += 1
+    return latencies, errors
+
+
+def load_test(
+    source: Path,
+    offers: list[Offer],
+    queries: list[OfferQuery],
+    clients: int,
+    seconds: float,
+    reload_every_seconds: float,
+) -> QueryLoadResult:
+    deadline: float = time.perf_counter() + seconds
+    params: list[dict[str, Any]] = [
+        query.model_dump(exclude_none=True) for query in queries
+    ]
+    reloads: int = 0
+    with OfferQueryServer(
+        LiveOfferIndex(source), port=0, reload_seconds=reload_every_seconds / 2
+    ) as server, ThreadPoolExecutor(max_workers=clients) as executor:
+        start_time: float = time.perf_counter()
+        runs: list[Future[tuple[list[float], int]]] = [
+            executor.submit(run_client, server.origin, params, offset, deadline)
+            for offset in range(clients)
+        ]
+        # A new crawl lands while the clients are querying
+        while time.perf_counter() + reload_every_seconds < deadline:
+            time.sleep(reload_every_seconds)
+            # Alternates between two crawls so every reload changes the file
+            first: int = reloads % 2
+            write_offers_json(offers[first:], source)
+            reloads += 1
+        client_results: list[tuple[list[float], int]] = [run.result() for run in runs]
+        elapsed: float = time.perf_counter() - start_time
+
+    return summarize(
+        f"http_{clients}_clients",
+        [latency for latencies, _ in client_results for latency in latencies],
+        elapsed,
+        sum(errors for _, errors in client_results),
+        reloads,
+    )
+
+
+def run_query_benchmark(
+    offers_count: int = 10_000,
+    clients: int = 8,
+    seconds: float = 10.0,
+    reload_every_seconds: float = 2.0,
+) -> list[QueryLoadResult]:
+    corpus: list[Offer] = load_offer_corpus()
+    offers: list[Offer] = synthetic_offers(offers_count, corpus)
+    queries: list[OfferQuery] = sample_queries(corpus)
+
+    start_time: float = time.perf_counter()
+    index: OfferIndex = OfferIndex(offers)
+    logging.info(
+        f"Indexed {len(index)} offers in {time.perf_counter() - start_time:.2f}s"
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        source: Path = Path(directory) / "offers.json"
+        write_offers_json(offers, source)
+        return [
+            measure(
+                "reread_and_scan",
+                queries,
+                lambda query: scan(load_offers(source), query),
+                8,
+            ),
+            measure("scan", queries, lambda query: scan(offers, query), 200),
+            measure("index", queries, index.query, 20_000),
+            measure("index_json", queries, index.query_json, 20_000),
+            load_test(source, offers, queries, clients, seconds, reload_every_seconds),
+        ]
+
+
+def format_results(results: list[QueryLoadResult]) -> str:
+    rows: list[str] = [
+        f"{result.case:<20}{result.queries_per_second:>14,.0f}"
+        f"{result.p50_ms:>10.3f}{result.p99_ms:>10.3f}{result.errors:>8}"
+        for result in results
+    ]
+    header: str = (
+        f"{'case':<20}{'queries/s':>14}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}"
+    )
+    return header + "\n" + "\n".join(rows)
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+from pydantic import BaseModel
+
+from web_scrapper.scrappers.audi.backends.base import ScrapingBackend
+from web_scrapper.scrappers.audi.backends.fallback_backend import FallbackBackend
+from web_scrapper.scrappers.audi.backends.http_backend import HttpBackend
+from web_scrapper.scrappers.audi.backends.polite_backend import PoliteBackend
+from web_scrapper.scrappers.audi.backends.selenium_backend import SeleniumBackend
+from web_scrapper.scrappers.audi.backends.session_backend import SessionBackend
+from web_scrapper.scrappers.audi.models_library import ModelTile
+
+
+class Recording(BaseModel):
+    # Origin of the recorded site, rewritten to the replay server when serving
+    origin: str
+    listing_path: str
+    pages: dict[str, str] = {}
+    llm_responses: dict[str, dict[str, Any]] = {}
+
+    @classmethod
+    def load(cls, recording_file: Path) -> "Recording":
+        return cls.model_validate_json(recording_file.read_text(encoding="utf-8"))
+
+    def save(self, recording_file: Path) -> None:
+        recording_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file: Path = recording_file.with_suffix(".tmp")
+        tmp_file.write_text(self.model_dump_json(), encoding="utf-8")
+        tmp_file.replace(recording_file)
+        logging.info(
+            f"Recorded {len(self.pages)} pages and {len(self.llm_responses)} "
+            f"LLM responses to {recording_file}"
+        )
+
+
+def get_origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_path(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.path or '/'}?{parts.query}" if parts.query else parts.path or "/"
+
+
+def make_llm_request_key(request_body: dict[str, Any]) -> str:
+    # Only what decides the answer, so unrelated client options do not matter
+    key_fields: dict[str, Any] = {
+        "model": request_body.get("model"),
+        "messages": request_body.get("messages"),
+        "response_format": request_body.get("response_format"),
+    }
+    return hashlib.sha256(
+        json.dumps(key_fields, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def current_page_html(backend: ScrapingBackend) -> str | None:
+    if isinstance(backend, (PoliteBackend, SessionBackend)):
+        return current_page_html(backend.backend)
+    if isinstance(backend, FallbackBackend):
+        return current_page_html(backend.active)
+    if isinstance(backend, HttpBackend):
+        return backend.html
+    if isinstance(backend, SeleniumBackend):
+        return backend.driver.page_source
+    raise TypeError(f"Cannot record pages from {backend.__class__.__name__}")
+
+
+class RecordingBackend(ScrapingBackend):
+    backend: ScrapingBackend
+    recording: Recording
+
+    def __init__(self, backend: ScrapingBackend, recording: Recording) -> None:
+        self.backend = backend
+        self.recording = recording
+        self._url: str | None = None
+
+    def load(self, url: str) -> None:
+        # Captured when leaving the page, by then a fallback backend has
+        # switched to the browser if the served HTML was not enough
+        self._capture()
+        self._url = url
+        self.backend.load(url)
+
+    def get_facet_items(self, div_number: int) -> list[str]:
+        return self.backend.get_facet_items(div_number)
+
+    def get_models_count(self) -> int:
+        return self.backend.get_models_count()
+
+    def get_model_tiles(self) -> list[ModelTile]:
+        return self.backend.get_model_tiles()
+
+    def get_offer_texts(self, offer_section: str) -> list[str]:
+        return self.backend.get_offer_texts(offer_section)
+
+    def quit(self) -> None:
+        self._capture()
+        self.backend.quit()
+
+    def _capture(self) -> None:
+        if self._url is None:
+            return
+        html: str | None = current_page_html(self.backend)
+        if html is not None:
+            self.recording.pages[get_path(self._url)] = html
+        self._url = None
+
+
+class LlmResponseRecorder:
+    recording: Recording
+
+    def __init__(self, recording: Recording) -> None:
+        self.recording = recording
+
+    def http_client(self) -> httpx.Client:
+        return httpx.Client(event_hooks={"response": [self.on_response]})
+
+    def http_async_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(event_hooks={"response": [self.on_async_response]})
+
+    def on_response(self, response: httpx.Response) -> None:
+        response.read()
+        self._record(response)
+
+    async def on_async_response(self, response: httpx.Response) -> None:
+        await response.aread()
+        self._record(response)
+
+    def _record(self, response: httpx.Response) -> None:
+        if response.status_code != 200 or not response.request.url.path.endswith(
+            "/chat/completions"
+        ):
+            return
+        request_body: dict[str, Any] = json.loads(response.request.content)
+        self.recording.llm_responses[make_llm_request_key(request_body)] = (
+            response.json()
+        )
@@ -0,0 +1,172 @@
+import contextlib
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any
+
+from web_scrapper.benchmark.recording import Recording, make_llm_request_key
+from web_scrapper.scrappers.audi.extractor_agent.rate_limiter import estimate_tokens
+
+# Roughly the size of one extracted offer json
+SYNTHETIC_COMPLETION_TOKENS: int = 120
+
+
+def synthetic_chat_completion(request_body: dict[str, Any]) -> dict[str, Any]:
+    # For requests that were never recorded, e.g. synthetic listings. An empty
+    # json object is a valid extraction with every field left unset.
+    prompt_tokens: int = sum(
+        estimate_tokens(str(message.get("content", "")))
+        for message in request_body.get("messages", [])
+    )
+    return {
+        "id": "chatcmpl-replay",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request_body.get("model", "replay"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": "{}"},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": SYNTHETIC_COMPLETION_TOKENS,
+            "total_tokens": prompt_tokens + SYNTHETIC_COMPLETION_TOKENS,
+        },
+    }
+
+
+class ReplayServer:
+    recording: Recording
+    page_latency_seconds: float
+    llm_latency_seconds: float
+    llm_tail_fraction: float
+    llm_tail_latency_seconds: float
+    page_requests: int
+    llm_requests: int
+    llm_replayed: int
+
+    def __init__(
+        self,
+        recording: Recording,
+        page_latency_seconds: float = 0.0,
+        llm_latency_seconds: float = 0.0,
+        llm_tail_fraction: float = 0.0,
+        llm_tail_latency_seconds: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.recording = recording
+        self.page_latency_seconds = page_latency_seconds
+        self.llm_latency_seconds = llm_latency_seconds
+        # A share of LLM requests is slowed down to reproduce a latency tail
+        self.llm_tail_fraction = llm_tail_fraction
+        self.llm_tail_latency_seconds = llm_tail_latency_seconds
+        self._random: random.Random = random.Random(seed)
+        self.page_requests = 0
+        self.llm_requests = 0
+        self.llm_replayed = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._server: ThreadingHTTPServer = ThreadingHTTPServer(
+            ("127.0.0.1", 0), self._handler_class()
+        )
+        self._server.daemon_threads = True
+        self._thread: threading.Thread = threading.Thread(
+            target=self._server.serve_forever, name="replay-server", daemon=True
+        )
+
+    @property
+    def origin(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    @property
+    def listing_url(self) -> str:
+        return self.origin + self.recording.listing_path
+
+    @property
+    def llm_base_url(self) -> str:
+        return self.origin + "/v1"
+
+    def __enter__(self) -> "ReplayServer":
+        self._thread.start()
+        logging.info(f"Replay server listening on {self.origin}")
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def page(self, path: str) -> str | None:
+        with self._lock:
+            self.page_requests += 1
+        time.sleep(self.page_latency_seconds)
+        html: str | None = self.recording.pages.get(path)
+        if html is None:
+            return None
+        # Recorded links point to the live site, keep the crawl on the server
+        return html.replace(self.recording.origin, self.origin)
+
+    def chat_completion(self, request_body: dict[str, Any]) -> dict[str, Any]:
+        with self._lock:
+            in_tail: bool = self._random.random() < self.llm_tail_fraction
+        time.sleep(
+            self.llm_latency_seconds + (self.llm_tail_latency_seconds if in_tail else 0)
+        )
+        recorded: dict[str, Any] | None = self.recording.llm_responses.get(
+            make_llm_request_key(request_body)
+        )
+        with self._lock:
+            self.llm_requests += 1
+            self.llm_replayed += recorded is not None
+        return recorded or synthetic_chat_completion(request_body)
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server: ReplayServer = self
+
+        class ReplayRequestHandler(BaseHTTPRequestHandler):
+            # Keep-alive like the OpenAI API, so the benchmark exercises the
+            # clients' connection pools. Headers and body are separate writes,
+            # Nagle would hold the body for the client's delayed ACK.
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                html: str | None = server.page(self.path)
+                if html is None:
+                    self.send_error(404)
+                    return
+                self._send(html.encode("utf-8"), "text/html; charset=utf-8")
+
+            def do_POST(self) -> None:
+                if not self.path.endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                length: int = int(self.headers.get("Content-Length", 0))
+                request_body: dict[str, Any] = json.loads(self.rfile.read(length))
+                response_body: dict[str, Any] = server.chat_completion(request_body)
+                self._send(json.dumps(response_body).encode("utf-8"), "application/json")
+
+            def _send(self, body: bytes, content_type: str) -> None:
+                # The client may have given up on the request, e.g. a losing hedge
+                with contextlib.suppress(BrokenPipeError, ConnectionResetError):
+                    self.send_response(200)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return ReplayRequestHandler
@@ -0,0 +1,143 @@
+import json
+import logging
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+from pathlib import Path
+from typing import Callable
+
+from pydantic import BaseModel
+
+from web_scrapper.benchmark.synthetic import load_offer_corpus
+from web_scrapper.scrappers.audi.models_library import Offer
+from web_scrapper.settings import SERIALIZATION_BATCH_SIZE
+from web_scrapper.sinks.jsonl_sink import (
+    JsonlSink,
+    iter_batches,
+    write_compacted,
+    write_offers_json,
+)
+
+
+class SerializationResult(BaseModel):
+    case: str
+    offers: int
+    seconds: float
+    records_per_second: float
+    peak_memory_mb: float
+
+
+def dump_per_object(offers: list[Offer], output_file: Path) -> None:
+    # The original save_data: model_dump every offer, then one indented dump
+    with open(output_file, "w") as file:
+        json.dump([offer.model_dump() for offer in offers], file, indent=4, default=str)
+
+
+def stream_per_record(offers: list[Offer], output_file: Path) -> None:
+    # One write and flush per offer, then every record parsed and re-indented
+    jsonl_file: Path = output_file.with_suffix(".jsonl")
+    with open(jsonl_file, "w", encoding="utf-8") as file:
+        for offer in offers:
+            file.write(offer.model_dump_json())
+            file.write("\n")
+            file.flush()
+    write_compacted(jsonl_file, output_file, indent=4)
+
+
+def stream_batched(offers: list[Offer], output_file: Path) -> None:
+    # What save_data does by default
+    jsonl_file: Path = output_file.with_suffix(".jsonl")
+    with JsonlSink(jsonl_file) as sink:
+        for batch in iter_batches(offers, SERIALIZATION_BATCH_SIZE):
+            sink.write_many(batch)
+    write_compacted(jsonl_file, output_file)
+
+
+def dump_bulk(offers: list[Offer], output_file: Path) -> None:
+    write_offers_json(offers, output_file, indent=None)
+
+
+def copy_and_mutate(offers: list[Offer]) -> list[Offer]:
+    model_offers: list[Offer] = []
+    for offer in offers:
+        new_offer: Offer = offer.model_copy()
+        new_offer.type = offer.type
+        new_offer.offer_settings = offer.offer_settings
+        model_offers.append(new_offer)
+    return model_offers
+
+
+def construct(offers: list[Offer]) -> list[Offer]:
+    return [
+        Offer.model_construct(
+            audience_model=offer.audience_model,
+            model=offer.model,
+            trim=offer.trim,
+            year=offer.year,
+            type=offer.type,
+            offer_settings=offer.offer_settings,
+        )
+        for offer in offers
+    ]
+
+
+def measure(
+    case: str, offers: list[Offer], run: Callable[[], object]
+) -> SerializationResult:
+    # Timed without tracemalloc, tracing every allocation slows the run down
+    start_time: float = time.perf_counter()
+    run()
+    seconds: float = time.perf_counter() - start_time
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result: SerializationResult = SerializationResult(
+        case=case,
+        offers=len(offers),
+        seconds=seconds,
+        records_per_second=len(offers) / seconds if seconds else 0.0,
+        peak_memory_mb=peak / 2**20,
+    )
+    logging.info(
+        f"{case}: {result.records_per_second:,.0f} records/s, "
+        f"peak {result.peak_memory_mb:.1f} MB"
+    )
+    return result
+
+
+def run_serialization_benchmark(
+    offers_count: int = 100_000,
+) -> list[SerializationResult]:
+    corpus: list[Offer] = load_offer_corpus()
+    offers: list[Offer] = [corpus[idx % len(corpus)] for idx in range(offers_count)]
+
+    results: list[SerializationResult] = [
+        measure("copy_and_mutate", offers, lambda: copy_and_mutate(offers)),
+        measure("model_construct", offers, lambda: construct(offers)),
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        output_file: Path = Path(directory) / "offers.json"
+        writers: dict[str, Callable[[list[Offer], Path], None]] = {
+            "dump_per_object": dump_per_object,
+            "stream_per_record": stream_per_record,
+            "stream_batched": stream_batched,
+            "dump_bulk": dump_bulk,
+        }
+        for case, write in writers.items():
+            results.append(measure(case, offers, partial(write, offers, output_file)))
+    return results
+
+
+def format_results(results: list[SerializationResult]) -> str:
+    rows: list[str] = [
+        f"{result.case:<20}{result.records_per_second:>14,.0f}"
+        f"{result.peak_memory_mb:>12.1f}"
+        for result in results
+    ]
+    return f"{'case':<20}{'records/s':>14}{'peak MB':>12}\n" + "\n".join(rows)
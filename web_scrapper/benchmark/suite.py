@@ -0,0 +1,281 @@
+import logging
+import math
+import time
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from pydantic import BaseModel
+
+from web_scrapper.benchmark.recording import (
+    LlmResponseRecorder,
+    Recording,
+    RecordingBackend,
+    get_origin,
+    get_path,
+)
+from web_scrapper.benchmark.replay_server import ReplayServer
+from web_scrapper.benchmark.synthetic import load_offer_corpus, synthetic_recording
+from web_scrapper.instrumentation import (
+    PhaseReport,
+    RunReport,
+    RunReportHook,
+    instrumentation,
+)
+from web_scrapper.scrappers.audi.audi_scrapper import scrape_audi
+from web_scrapper.scrappers.audi.backends.base import ScrapingBackend
+from web_scrapper.scrappers.audi.backends.fallback_backend import setup_backend
+from web_scrapper.scrappers.audi.extractor_agent.cache import ExtractionCache
+from web_scrapper.scrappers.audi.extractor_agent.extraction import (
+    get_extractor,
+    rule_based_extractor,
+)
+from web_scrapper.scrappers.audi.extractor_agent.latency_budget import LatencyBudget
+from web_scrapper.scrappers.audi.extractor_agent.offer_extractor_agent import (
+    OfferExtractor,
+    build_latency_budget,
+)
+from web_scrapper.scrappers.audi.models_library import Offer
+from web_scrapper.settings import (
+    AUDI_URL,
+    DEDUPLICATE_OFFERS,
+    EXTRACTION_WORKERS,
+    SCRAPER_BACKEND,
+    SCRAPER_WORKERS,
+)
+
+
+class BenchmarkResult(BaseModel):
+    scenario: str
+    backend: str
+    offers: int
+    seconds: float
+    offers_per_second: float
+    page_requests: int
+    webdriver_commands: int
+    llm_calls: int
+    llm_replayed: int
+    prompt_tokens: int
+    completion_tokens: int
+    llm_call_p50_seconds: float
+    llm_call_p95_seconds: float
+    # Per offer, hedges and retries included
+    llm_offer_p50_seconds: float
+    llm_offer_p99_seconds: float
+    llm_hedged: int
+    llm_hedge_wins: int
+    llm_deadline_exceeded: int
+    llm_cost: float
+    llm_hedge_cost: float
+
+
+def run_pipeline(
+    url: str,
+    backend_factory: Callable[[], ScrapingBackend],
+    workers: int,
+    deduplicate: bool = DEDUPLICATE_OFFERS,
+    extraction_workers: int = EXTRACTION_WORKERS,
+) -> list[Offer]:
+    return list(
+        scrape_audi(
+            backend_factory(),
+            url=url,
+            workers=workers,
+            backend_factory=backend_factory,
+            deduplicate=deduplicate,
+            extraction_workers=extraction_workers,
+        )
+    )
+
+
+def record_session(
+    recording_file: Path,
+    url: str = AUDI_URL,
+    backend_kind: str = SCRAPER_BACKEND,
+    workers: int = SCRAPER_WORKERS,
+) -> Recording:
+    recording: Recording = Recording(origin=get_origin(url), listing_path=get_path(url))
+    recorder: LlmResponseRecorder = LlmResponseRecorder(recording)
+    extractor: OfferExtractor = get_extractor()
+    extractor.use_llm_client(
+        http_client=recorder.http_client(),
+        http_async_client=recorder.http_async_client(),
+    )
+    # Every offer has to reach the API for its response to be recorded
+    extractor.cache = None
+
+    def recording_backend_factory() -> ScrapingBackend:
+        return RecordingBackend(setup_backend(backend_kind), recording)
+
+    offers: list[Offer] = run_pipeline(url, recording_backend_factory, workers)
+    logging.info(f"Recorded a crawl of {len(offers)} offers")
+    recording.save(recording_file)
+    return recording
+
+
+def summarize(
+    scenario: str,
+    backend_kind: str,
+    offers: list[Offer],
+    seconds: float,
+    server: ReplayServer,
+    report: RunReport,
+) -> BenchmarkResult:
+    no_calls: PhaseReport = PhaseReport(
+        count=0,
+        errors=0,
+        total_seconds=0.0,
+        p50_seconds=0.0,
+        p95_seconds=0.0,
+        p99_seconds=0.0,
+        max_seconds=0.0,
+    )
+    llm_calls: PhaseReport = report.phases.get("llm_call", no_calls)
+    webdriver: PhaseReport = report.phases.get("webdriver_session", no_calls)
+    llm_offers: PhaseReport = report.phases.get("llm_offer", no_calls)
+    return BenchmarkResult(
+        scenario=scenario,
+        backend=backend_kind,
+        offers=len(offers),
+        seconds=seconds,
+        offers_per_second=len(offers) / seconds if seconds else 0.0,
+        page_requests=server.page_requests,
+        webdriver_commands=int(webdriver.totals.get("commands", 0)),
+        llm_calls=llm_calls.count,
+        llm_replayed=server.llm_replayed,
+        prompt_tokens=int(llm_calls.totals.get("prompt_tokens", 0)),
+        completion_tokens=int(llm_calls.totals.get("completion_tokens", 0)),
+        llm_call_p50_seconds=llm_calls.p50_seconds,
+        llm_call_p95_seconds=llm_calls.p95_seconds,
+        llm_offer_p50_seconds=llm_offers.p50_seconds,
+        llm_offer_p99_seconds=llm_offers.p99_seconds,
+        llm_hedged=int(llm_offers.totals.get("hedged", 0)),
+        llm_hedge_wins=int(llm_offers.totals.get("hedge_won", 0)),
+        llm_deadline_exceeded=int(llm_offers.totals.get("deadline_exceeded", 0)),
+        llm_cost=llm_offers.totals.get("cost", 0.0),
+        llm_hedge_cost=llm_offers.totals.get("hedge_cost", 0.0),
+    )
+
+
+@contextmanager
+def replay_extractor(
+    server: ReplayServer,
+    fast_path: bool,
+    latency_budget: LatencyBudget | None = None,
+) -> Iterator[None]:
+    extractor: OfferExtractor = get_extractor()
+    cache: ExtractionCache | None = extractor.cache
+    extractor_budget: LatencyBudget | None = extractor.latency_budget
+    min_confidence: float | None = (
+        rule_based_extractor.min_confidence if rule_based_extractor else None
+    )
+    # The same clients as a crawl, connection reuse included
+    extractor.use_llm_client(base_url=server.llm_base_url, api_key="replay")
+    # Cached extractions would hide the LLM cost being measured
+    extractor.cache = None
+    # A fresh budget per scenario, hedge delays learned on one do not carry over
+    extractor.latency_budget = latency_budget
+    if not fast_path and rule_based_extractor is not None:
+        rule_based_extractor.min_confidence = math.inf
+    try:
+        yield
+    finally:
+        extractor.cache = cache
+        extractor.latency_budget = extractor_budget
+        if rule_based_extractor is not None and min_confidence is not None:
+            rule_based_extractor.min_confidence = min_confidence
+
+
+def run_benchmark(
+    scenario: str,
+    recording: Recording,
+    backend_kind: str = "http",
+    workers: int = SCRAPER_WORKERS,
+    page_latency_seconds: float = 0.0,
+    llm_latency_seconds: float = 0.0,
+    fast_path: bool = True,
+    deduplicate: bool = DEDUPLICATE_OFFERS,
+    extraction_workers: int = EXTRACTION_WORKERS,
+    llm_tail_fraction: float = 0.0,
+    llm_tail_latency_seconds: float = 0.0,
+    latency_budget: Callable[[], LatencyBudget | None] = build_latency_budget,
+) -> BenchmarkResult:
+    report_hook: RunReportHook = RunReportHook()
+    with ReplayServer(
+        recording,
+        page_latency_seconds,
+        llm_latency_seconds,
+        llm_tail_fraction,
+        llm_tail_latency_seconds,
+    ) as server, replay_extractor(server, fast_path, latency_budget()):
+        instrumentation.add_hook(report_hook)
+        try:
+            start_time: float = time.perf_counter()
+            offers: list[Offer] = run_pipeline(
+                server.listing_url,
+                partial(setup_backend, backend_kind),
+                workers,
+                deduplicate,
+                extraction_workers,
+            )
+            seconds: float = time.perf_counter() - start_time
+        finally:
+            instrumentation.remove_hook(report_hook)
+
+    result: BenchmarkResult = summarize(
+        scenario, backend_kind, offers, seconds, server, report_hook.report()
+    )
+    logging.info(
+        f"{scenario}: {result.offers} offers in {result.seconds:.2f}s "
+        f"({result.offers_per_second:.1f} offers/s), "
+        f"{result.webdriver_commands} WebDriver commands, "
+        f"{result.llm_calls} LLM calls, "
+        f"{result.prompt_tokens + result.completion_tokens} tokens, "
+        f"p99 {result.llm_offer_p99_seconds:.2f}s per offer, "
+        f"{result.llm_hedged} hedged, "
+        f"{result.llm_deadline_exceeded} over the deadline"
+    )
+    return result
+
+
+def run_suite(
+    scales: Iterable[int] = (10, 100, 1000),
+    recording_file: Path | None = None,
+    backend_kind: str = "http",
+    workers: int = SCRAPER_WORKERS,
+    page_latency_seconds: float = 0.0,
+    llm_latency_seconds: float = 0.0,
+    fast_path: bool = True,
+    deduplicate: bool = DEDUPLICATE_OFFERS,
+    extraction_workers: int = EXTRACTION_WORKERS,
+    llm_tail_fraction: float = 0.0,
+    llm_tail_latency_seconds: float = 0.0,
+    latency_budget: Callable[[], LatencyBudget | None] = build_latency_budget,
+) -> list[BenchmarkResult]:
+    run: Callable[[str, Recording], BenchmarkResult] = partial(
+        run_benchmark,
+        backend_kind=backend_kind,
+        workers=workers,
+        page_latency_seconds=page_latency_seconds,
+        llm_latency_seconds=llm_latency_seconds,
+        fast_path=fast_path,
+        deduplicate=deduplicate,
+        extraction_workers=extraction_workers,
+        llm_tail_fraction=llm_tail_fraction,
+        llm_tail_latency_seconds=llm_tail_latency_seconds,
+        latency_budget=latency_budget,
+    )
+    results: list[BenchmarkResult] = []
+    if recording_file is not None:
+        results.append(run("recorded", Recording.load(recording_file)))
+
+    corpus: list[Offer] = load_offer_corpus()
+    for models_count in scales:
+        results.append(
+            run(
+                f"synthetic-{models_count}",
+                synthetic_recording(models_count, corpus=corpus),
+            )
+        )
+    return results
@@ -0,0 +1,91 @@
+import html
+import json
+from pathlib import Path
+from typing import Final
+
+from web_scrapper.benchmark.recording import Recording
+from web_scrapper.scrappers.audi.models_library import Offer
+from web_scrapper.settings import OUTPUT_FILE
+
+SYNTHETIC_ORIGIN: Final[str] = "https://dealer.example"
+SYNTHETIC_LISTING_PATH: Final[str] = "/global-incentives-search/index.htm"
+
+
+def load_offer_corpus(corpus_file: Path = OUTPUT_FILE) -> list[Offer]:
+    with open(corpus_file) as file:
+        return [Offer.model_validate(record) for record in json.load(file)]
+
+
+def render_list(items: list[str]) -> str:
+    return "<ul>" + "".join(f"<li>{html.escape(item)}</li>" for item in items) + "</ul>"
+
+
+def render_article(offer_text: str) -> str:
+    # One paragraph per line so the parsed text keeps the original line breaks
+    return (
+        "<article>"
+        + "".join(f"<p>{html.escape(line)}</p>" for line in offer_text.splitlines())
+        + "</article>"
+    )
+
+
+def render_listing(corpus: list[Offer], models_count: int) -> str:
+    years: list[str] = sorted({str(offer.year) for offer in corpus if offer.year})
+    styles: list[str] = sorted({offer.trim for offer in corpus if offer.trim})
+    models: list[str] = sorted({offer.model for offer in corpus if offer.model})
+    names: list[str] = list(dict.fromkeys(offer.audience_model for offer in corpus))
+    tiles: str = "".join(
+        '<div class="vehicle-container"><a href="#">image</a>'
+        f'<a href="/models/{idx}.htm">details</a>'
+        f"<h5>{html.escape(names[idx % len(names)])}</h5></div>"
+        for idx in range(models_count)
+    )
+    # Facet divs in the same positions as on the dealer site
+    facets: str = "".join(
+        f"<div>{render_list(items)}</div>" for items in ([], years, [], styles, models)
+    )
+    return (
+        '<html><body><div class="ddc-wrapper"><div>navigation</div><div>'
+        '<div class="incentives-header">'
+        f'<span id="results-count">{models_count}</span></div>'
+        f'<div class="facets-container">{facets}</div>'
+        f'<div class="vehicles-container">{tiles}</div>'
+        "</div></div></body></html>"
+    )
+
+
+def render_detail(offers: list[Offer]) -> str:
+    sections: dict[str, list[str]] = {"APR": [], "PROMOTION": []}
+    for offer in offers:
+        offer_settings = offer.offer_settings
+        if offer_settings is None or offer_settings.full_offer is None:
+            continue
+        section: str = "APR" if offer_settings.apr else "PROMOTION"
+        sections[section].append(render_article(offer_settings.full_offer))
+    return (
+        '<html><body><div class="ddc-wrapper"><div>navigation</div><div>'
+        + "".join(
+            f'<section data-offer="{section}">{"".join(articles)}</section>'
+            for section, articles in sections.items()
+        )
+        + "</div></div></body></html>"
+    )
+
+
+def synthetic_recording(
+    models_count: int, offers_per_model: int = 2, corpus: list[Offer] | None = None
+) -> Recording:
+    offers: list[Offer] = corpus if corpus is not None else load_offer_corpus()
+    recording: Recording = Recording(
+        origin=SYNTHETIC_ORIGIN, listing_path=SYNTHETIC_LISTING_PATH
+    )
+    recording.pages[SYNTHETIC_LISTING_PATH] = render_listing(offers, models_count)
+    for idx in range(models_count):
+        start: int = idx * offers_per_model
+        recording.pages[f"/models/{idx}.htm"] = render_detail(
+            [
+                offers[(start + offset) % len(offers)]
+                for offset in range(offers_per_model)
+            ]
+        )
+    return recording
@@ -0,0 +1,268 @@
+import argparse
+import contextlib
+import itertools
+import logging
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Final, Iterable, Iterator
+
+from web_scrapper.instrumentation import RunReportHook, instrumentation
+from web_scrapper.scrappers.audi.dealer_scheduler import DealerScheduler
+from web_scrapper.scrappers.audi.extractor_agent.deduplication import (
+    OfferDeduplicator,
+    model_tokens,
+)
+from web_scrapper.scrappers.audi.extractor_agent.extraction import (
+    ExtractOffers,
+    extract_offers_info,
+    keep_offer_texts,
+)
+from web_scrapper.scrappers.audi.models_library import Offer, OfferSettings
+from web_scrapper.settings import (
+    COMPACT_OUTPUT,
+    CRAWL_STATE_FILE,
+    DEALER_URLS,
+    DEDUPLICATE_OFFERS,
+    IMPORT_TIME_BUDGET_SECONDS,
+    INCREMENTAL_CRAWL,
+    OUTPUT_FILE,
+    OUTPUT_FSYNC,
+    RAW_OFFERS_FILE,
+    RUN_REPORT_FILE,
+    SCRAPER_WORKERS,
+    SERIALIZATION_BATCH_SIZE,
+    SQLITE_BATCH_SIZE,
+    SQLITE_OUTPUT,
+    SQLITE_OUTPUT_FILE,
+)
+from web_scrapper.sinks.jsonl_sink import (
+    JsonlSink,
+    compact_jsonl,
+    iter_batches,
+    read_jsonl,
+)
+from web_scrapper.sinks.sqlite_sink import SqliteSink
+
+CLI_MODULE: Final[str] = "web_scrapper.cli"
+# Only needed once an offer goes to the LLM
+LLM_MODULES: Final[tuple[str, ...]] = (
+    "langchain",
+    "langchain_community",
+    "langchain_openai",
+    "openai",
+    "tiktoken",
+)
+
+
+def save_data(
+    offer_batches: Iterable[list[Offer]],
+    output_file: Path = OUTPUT_FILE,
+    fsync: bool = OUTPUT_FSYNC,
+    compact: bool = COMPACT_OUTPUT,
+    sqlite_file: Path | None = SQLITE_OUTPUT_FILE if SQLITE_OUTPUT else None,
+    batch_size: int = SERIALIZATION_BATCH_SIZE,
+) -> None:
+    jsonl_file: Path = output_file.with_suffix(".jsonl")
+    with contextlib.ExitStack() as sinks:
+        sink: JsonlSink = sinks.enter_context(JsonlSink(jsonl_file, fsync=fsync))
+        sqlite_sink: SqliteSink | None = (
+            sinks.enter_context(SqliteSink(sqlite_file, SQLITE_BATCH_SIZE))
+            if sqlite_file is not None
+            else None
+        )
+        # Offers are extracted a dealer or a model page at a time, each batch is
+        # encoded and flushed as soon as it is ready
+        for offers in offer_batches:
+            for batch in iter_batches(offers, batch_size):
+                sink.write_many(batch)
+                if sqlite_sink is not None:
+                    for offer in batch:
+                        sqlite_sink.write(offer)
+
+    logging.info(f"{sink.records_written} Extracted Offers streamed to: {jsonl_file}")
+
+    if compact:
+        compact_jsonl(jsonl_file, output_file)
+        logging.info(f"Extracted Offers saved to: {output_file}")
+
+
+def scrape(
+    dealer_urls: list[str] = DEALER_URLS,
+    extract_offers: ExtractOffers = extract_offers_info,
+    incremental: bool = INCREMENTAL_CRAWL,
+) -> Iterator[list[Offer]]:
+    scheduler: DealerScheduler = DealerScheduler(
+        # A single dealer gets the whole worker budget for its model pages
+        workers_per_dealer=SCRAPER_WORKERS if len(dealer_urls) == 1 else 1,
+        crawl_state_file=CRAWL_STATE_FILE if incremental else None,
+        extract_offers=extract_offers,
+    )
+    for url in dealer_urls:
+        scheduler.add(url)
+    return scheduler.run()
+
+
+def extract_dump(
+    dump_file: Path, deduplicate: bool = DEDUPLICATE_OFFERS
+) -> Iterator[list[Offer]]:
+    deduplicator: OfferDeduplicator | None = OfferDeduplicator() if deduplicate else None
+    # One extraction call per model page, the same grouping as a full crawl
+    for _, model_offers in itertools.groupby(
+        read_jsonl(dump_file), key=lambda offer: (offer.dealer, offer.audience_model)
+    ):
+        pending: list[Offer] = []
+        offer_texts: list[tuple[str, str]] = []
+        for offer in model_offers:
+            if offer.offer_settings is None or not offer.offer_settings.full_offer:
+                logging.warning(f"No offer text to extract for: {offer.audience_model}")
+                continue
+            pending.append(offer)
+            offer_texts.append((offer.offer_settings.full_offer, offer.type or ""))
+        if not offer_texts:
+            continue
+
+        extracted_offers: list[OfferSettings] = (
+            deduplicator.extract(
+                offer_texts,
+                model_tokens(
+                    pending[0].audience_model, pending[0].model, pending[0].year
+                ),
+                extract_offers_info,
+            )
+            if deduplicator is not None
+            else extract_offers_info(offer_texts)
+        )
+        for offer, extracted_offer in zip(pending, extracted_offers):
+            offer.offer_settings = extracted_offer
+        yield pending
+
+    if deduplicator is not None:
+        deduplicator.log_stats()
+
+
+def measure_import_time(module: str = CLI_MODULE) -> tuple[float, list[str]]:
+    # A fresh interpreter, modules already imported here would not be counted
+    result: subprocess.CompletedProcess[str] = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    seconds: float = 0.0
+    loaded: set[str] = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            seconds = int(cumulative) / 1_000_000
+        if name.strip().split(".")[0] in LLM_MODULES:
+            loaded.add(name.strip().split(".")[0])
+    return seconds, sorted(loaded)
+
+
+def check_import_time(
+    module: str = CLI_MODULE, budget_seconds: float = IMPORT_TIME_BUDGET_SECONDS
+) -> bool:
+    seconds, llm_modules = measure_import_time(module)
+    logging.info(
+        f"Importing {module} took {seconds:.3f}s (budget {budget_seconds:.3f}s)"
+    )
+    if llm_modules:
+        logging.error(f"{module} imports LLM modules at startup: {llm_modules}")
+    if seconds > budget_seconds:
+        logging.error(f"Import time of {module} is over budget")
+    return seconds <= budget_seconds and not llm_modules
+
+
+def positive_int(value: str) -> int:
+    size: int = int(value)
+    if size < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {size}")
+    return size
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="web-scrapper",
+        description="Scrape dealer offers and extract their terms with an LLM",
+    )
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument(
+        "--scrape-only",
+        action="store_true",
+        help="dump the raw offer texts without calling the LLM",
+    )
+    modes.add_argument(
+        "--extract-only",
+        type=Path,
+        metavar="DUMP",
+        help="extract the offers of a --scrape-only dump",
+    )
+    modes.add_argument(
+        "--check-import-time",
+        action="store_true",
+        help="fail when the CLI imports are over the startup budget",
+    )
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--url", dest="urls", action="append", default=None)
+    parser.add_argument(
+        "--sqlite",
+        type=Path,
+        nargs="?",
+        const=SQLITE_OUTPUT_FILE,
+        default=SQLITE_OUTPUT_FILE if SQLITE_OUTPUT else None,
+        metavar="DATABASE",
+        help="also upsert the extracted offers into an indexed SQLite database",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=positive_int,
+        default=SERIALIZATION_BATCH_SIZE,
+        help="most offers encoded per write, each page is written once extracted",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args: argparse.Namespace = parse_args(argv)
+    if args.check_import_time:
+        sys.exit(0 if check_import_time() else 1)
+
+    start_time: float = time.time()
+    run_report: RunReportHook = RunReportHook()
+    instrumentation.add_hook(run_report)
+    with instrumentation.span("run"):
+        if args.scrape_only:
+            # Crawl state stores extracted offers, raw texts must not end up in it
+            save_data(
+                scrape(args.urls or DEALER_URLS, keep_offer_texts, incremental=False),
+                args.output or RAW_OFFERS_FILE,
+                compact=False,
+                sqlite_file=None,
+                batch_size=args.batch_size,
+            )
+        elif args.extract_only is not None:
+            save_data(
+                extract_dump(args.extract_only),
+                args.output or OUTPUT_FILE,
+                sqlite_file=args.sqlite,
+                batch_size=args.batch_size,
+            )
+        else:
+            save_data(
+                scrape(args.urls or DEALER_URLS),
+                args.output or OUTPUT_FILE,
+                sqlite_file=args.sqlite,
+                batch_size=args.batch_size,
+            )
+    run_report.write(RUN_REPORT_FILE)
+    end_time: float = time.time()
+    execution_time_minutes: float = (end_time - start_time) / 60
+    logging.info(f"Execution time: {execution_time_minutes:.2f} minutes")
+
+
+if __name__ == "__main__":
+    main()
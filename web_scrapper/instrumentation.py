@@ -0,0 +1,163 @@
+import json
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from pydantic import BaseModel
+
+
+class SpanRecord(BaseModel):
+    phase: str
+    seconds: float
+    attributes: dict[str, Any] = {}
+
+
+class Span:
+    phase: str
+    attributes: dict[str, Any]
+
+    def __init__(self, phase: str, attributes: dict[str, Any]) -> None:
+        self.phase = phase
+        self.attributes = attributes
+
+    def update(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+
+class InstrumentationHook:
+    # Hooks are called from scraper threads and event loops, so implementations
+    # must be thread safe and cheap
+    def on_span_start(self, span: Span) -> None:
+        pass
+
+    def on_span_end(self, record: SpanRecord) -> None:
+        pass
+
+
+class Instrumentation:
+    hooks: list[InstrumentationHook]
+
+    def __init__(self) -> None:
+        self.hooks = []
+
+    def add_hook(self, hook: InstrumentationHook) -> None:
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: InstrumentationHook) -> None:
+        self.hooks.remove(hook)
+
+    @contextmanager
+    def span(self, phase: str, **attributes: Any) -> Iterator[Span]:
+        span: Span = Span(phase, attributes)
+        for hook in self.hooks:
+            hook.on_span_start(span)
+        start_time: float = time.perf_counter()
+        try:
+            yield span
+        except BaseException as error:
+            span.update(error=error.__class__.__name__)
+            raise
+        finally:
+            self.record(phase, time.perf_counter() - start_time, **span.attributes)
+
+    def record(self, phase: str, seconds: float, **attributes: Any) -> None:
+        if not self.hooks:
+            return
+        record: SpanRecord = SpanRecord(
+            phase=phase, seconds=seconds, attributes=attributes
+        )
+        for hook in self.hooks:
+            hook.on_span_end(record)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    # Nearest-rank percentile, defined for a single value too
+    if not values:
+        return 0.0
+    ordered: list[float] = sorted(values)
+    rank: int = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class PhaseReport(BaseModel):
+    count: int
+    errors: int
+    total_seconds: float
+    p50_seconds: float
+    p95_seconds: float
+    p99_seconds: float = 0.0
+    max_seconds: float
+    totals: dict[str, float] = {}
+
+
+class RunReport(BaseModel):
+    started_at: str
+    wall_seconds: float
+    phases: dict[str, PhaseReport]
+
+
+class RunReportHook(InstrumentationHook):
+    def __init__(self) -> None:
+        self._started_at: str = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        self._start_time: float = time.perf_counter()
+        self._seconds: defaultdict[str, list[float]] = defaultdict(list)
+        self._errors: defaultdict[str, int] = defaultdict(int)
+        # Numeric attributes such as tokens and cost are summed per phase
+        self._totals: defaultdict[str, defaultdict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        self._lock: threading.Lock = threading.Lock()
+
+    def on_span_end(self, record: SpanRecord) -> None:
+        with self._lock:
+            self._seconds[record.phase].append(record.seconds)
+            if "error" in record.attributes:
+                self._errors[record.phase] += 1
+            for name, value in record.attributes.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    self._totals[record.phase][name] += value
+
+    def report(self) -> RunReport:
+        with self._lock:
+            return RunReport(
+                started_at=self._started_at,
+                wall_seconds=time.perf_counter() - self._start_time,
+                phases={
+                    phase: PhaseReport(
+                        count=len(seconds),
+                        errors=self._errors[phase],
+                        total_seconds=sum(seconds),
+                        p50_seconds=percentile(seconds, 50),
+                        p95_seconds=percentile(seconds, 95),
+                        p99_seconds=percentile(seconds, 99),
+                        max_seconds=max(seconds),
+                        totals=dict(self._totals[phase]),
+                    )
+                    for phase, seconds in self._seconds.items()
+                },
+            )
+
+    def write(self, report_file: Path) -> RunReport:
+        report: RunReport = self.report()
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_file, "w") as file:
+            json.dump(report.model_dump(), file, indent=4)
+
+        for phase, phase_report in report.phases.items():
+            logging.info(
+                f"{phase}: {phase_report.count} x, "
+                f"total {phase_report.total_seconds:.2f}s, "
+                f"p50 {phase_report.p50_seconds:.3f}s, "
+                f"p95 {phase_report.p95_seconds:.3f}s, "
+                f"p99 {phase_report.p99_seconds:.3f}s"
+            )
+        logging.info(f"Run report saved to: {report_file}")
+        return report
+
+
+instrumentation: Instrumentation = Instrumentation()
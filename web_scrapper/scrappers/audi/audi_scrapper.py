@@ -1,168 +1,293 @@
 import logging
-import re
-from typing import Iterable
-
-from selenium.webdriver.chrome.webdriver import WebDriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webelement import WebElement
-
-from web_scrapper.scrappers.audi.extractor_agent.offer_extractor_agent import (
-    extract_offer_info,
+from functools import partial
+from typing import Callable, Iterator
+
+from web_scrapper.instrumentation import instrumentation
+from web_scrapper.scrappers.audi.backends.base import ScrapingBackend
+from web_scrapper.scrappers.audi.backends.fallback_backend import setup_backend
+from web_scrapper.scrappers.audi.crawl_state import (
+    CrawlStateStore,
+    fingerprint_offers,
+)
+from web_scrapper.scrappers.audi.extractor_agent.deduplication import (
+    OfferDeduplicator,
+    model_tokens,
+)
+from web_scrapper.scrappers.audi.extractor_agent.extraction import (
+    ExtractOffers,
+    extract_offers_info,
 )
 from web_scrapper.scrappers.audi.models_library import (
-    BodyStyles,
-    Models,
+    ModelPage,
+    ModelTile,
     Offer,
     OfferSettings,
-    Years,
-    build_data,
 )
-from web_scrapper.scrappers.audi.utils import close_cookie_banner
-from web_scrapper.settings import AUDI_URL
-
+from web_scrapper.scrappers.audi.taxonomy import (
+    ResolvedModel,
+    TaxonomyIndex,
+    load_taxonomy,
+)
+from web_scrapper.scrappers.driver_pool import DriverPool
+from web_scrapper.scrappers.pipeline import Pipeline
+from web_scrapper.settings import (
+    AUDI_URL,
+    DEDUPLICATE_OFFERS,
+    EXTRACTION_QUEUE_SIZE,
+    EXTRACTION_WORKERS,
+    SCRAPER_WORKERS,
+)
 
-def get_offer_types(
-    main_content: WebElement,
-) -> tuple[list[WebElement], list[WebElement]]:
-    finance_offers: list[WebElement] = []
-    promotion_offers: list[WebElement] = []
 
-    try:
-        finance_offers: list[WebElement] = main_content.find_element(
-            By.CSS_SELECTOR, 'section[data-offer="APR"]'
-        ).find_elements(By.TAG_NAME, "article")
-    except Exception:
+def get_offer_types(backend: ScrapingBackend) -> tuple[list[str], list[str]]:
+    finance_offers: list[str] = backend.get_offer_texts("APR")
+    if not finance_offers:
         logging.info("No finance offers found")
 
-    try:
-        promotion_offers: list[WebElement] = main_content.find_element(
-            By.CSS_SELECTOR, 'section[data-offer="PROMOTION"]'
-        ).find_elements(By.TAG_NAME, "article")
-    except Exception:
+    promotion_offers: list[str] = backend.get_offer_texts("PROMOTION")
+    if not promotion_offers:
         logging.info("No promotion offers found")
 
     return finance_offers, promotion_offers
 
 
-def get_offers(model: WebElement, driver: WebDriver) -> list[OfferSettings]:
-    model.find_element(By.XPATH, "a[2]").click()
-    close_cookie_banner(driver)
-    main_content: WebElement = driver.find_element(
-        By.CLASS_NAME, "ddc-wrapper"
-    ).find_element(By.XPATH, "div[2]")
+def get_offer_texts(model: ModelTile, backend: ScrapingBackend) -> list[tuple[str, str]]:
+    with instrumentation.span("model_page_load"):
+        backend.load(model.url)
 
-    offer_types: tuple[list[WebElement], list[WebElement]] = get_offer_types(
-        main_content
-    )
+    offer_types: tuple[list[str], list[str]] = get_offer_types(backend)
 
-    offers: dict[str, list[WebElement]] = {
+    offers: dict[str, list[str]] = {
         "finance_offers": offer_types[0],
         "promotion_offers": offer_types[1],
     }
 
-    extracted_offers: list[OfferSettings] = []
-    for offer_type, offers_list in offers.items():
-        if not offers_list:
-            continue
+    offer_texts: list[tuple[str, str]] = [
+        (offer, offer_type)
+        for offer_type, offers_list in offers.items()
+        for offer in offers_list
+    ]
 
-        for offer in offers_list:
-            extracted_offers.append(extract_offer_info(offer.text, offer_type))
+    return offer_texts
 
-    return extracted_offers
 
+def get_offers(
+    model: ModelTile,
+    backend: ScrapingBackend,
+    extract_offers: ExtractOffers = extract_offers_info,
+) -> list[OfferSettings]:
+    offer_texts: list[tuple[str, str]] = get_offer_texts(model, backend)
+    if not offer_texts:
+        return []
 
-def extract_pattern_from_string(
-    patterns: Iterable[int | str], input_string: str
-) -> str | None:
-    patterns_str = "|".join(map(str, patterns))
-    match: re.Match[str] | None = re.search(rf"\b({patterns_str})\b", input_string)
-    if match:
-        matched_value: str = match.group(1)
-        return matched_value
-    return None
+    return extract_offers(offer_texts)
 
 
-def extract_year_from_string(years: Years, input_string: str) -> int | None:
-    year: str | None = extract_pattern_from_string(years.available_years, input_string)
-    return int(year) if (year and year.isdigit()) else None
+def get_offer_type(offer_type: str) -> str:
+    # "finance_offers" -> "finance"
+    return offer_type.split("_")[0]
 
 
-def extract_trim_from_string(styles: BodyStyles, input_string: str) -> str | None:
-    return extract_pattern_from_string(styles.available_styles, input_string)
+def get_models_count(backend: ScrapingBackend) -> int:
+    return backend.get_models_count()
 
 
-def extract_model_from_string(models: Models, input_string: str) -> str | None:
-    return extract_pattern_from_string(models.available_models, input_string)
+def get_all_models(backend: ScrapingBackend) -> list[ModelTile]:
+    return backend.get_model_tiles()
 
 
-def get_models_count(driver: WebDriver) -> int:
-    return int(
-        driver.find_element(By.CLASS_NAME, "incentives-header")
-        .find_element(By.ID, "results-count")
-        .text
+def extract_model_offers(
+    model: ModelTile,
+    offer_texts: list[tuple[str, str]],
+    taxonomy: TaxonomyIndex,
+    extract_offers: ExtractOffers = extract_offers_info,
+    deduplicator: OfferDeduplicator | None = None,
+) -> list[Offer]:
+    resolved_model: ResolvedModel = taxonomy.resolve(model.name)
+    offer: Offer = Offer(
+        audience_model=model.name,
+        model=resolved_model.model,
+        trim=resolved_model.trim,
+        year=resolved_model.year,
+    )
+
+    extracted_offers: list[OfferSettings] = []
+    if offer_texts and deduplicator is not None:
+        extracted_offers = deduplicator.extract(
+            offer_texts,
+            model_tokens(model.name, resolved_model.model, resolved_model.year),
+            extract_offers,
+        )
+    elif offer_texts:
+        extracted_offers = extract_offers(offer_texts)
+
+    model_offers: list[Offer] = []
+    for (_, offer_type), extracted_offer in zip(offer_texts, extracted_offers):
+        new_offer: Offer = offer.model_copy()
+        new_offer.type = get_offer_type(offer_type)
+        new_offer.offer_settings = extracted_offer
+        model_offers.append(new_offer)
+
+    return model_offers
+
+
+def load_model_page(
+    backend: ScrapingBackend,
+    model: ModelTile,
+    crawl_state: CrawlStateStore | None = None,
+) -> ModelPage:
+    logging.info(f"Getting all offers for: {model.name}")
+
+    if crawl_state is None:
+        return ModelPage(model=model, offer_texts=get_offer_texts(model, backend))
+
+    completed_offers: list[Offer] | None = crawl_state.completed_offers(model)
+    if completed_offers is not None:
+        logging.info(f"Already scraped in this run: {model.name}")
+        return ModelPage(model=model, offer_texts=[], offers=completed_offers)
+
+    offer_texts: list[tuple[str, str]] = get_offer_texts(model, backend)
+    fingerprint: str = fingerprint_offers(model, offer_texts)
+    model_offers: list[Offer] | None = crawl_state.unchanged_offers(model, fingerprint)
+    if model_offers is not None:
+        logging.info(f"Offers unchanged since last crawl: {model.name}")
+
+    return ModelPage(
+        model=model,
+        offer_texts=offer_texts,
+        fingerprint=fingerprint,
+        offers=model_offers,
     )
 
 
-def get_all_models(driver: WebDriver) -> list[WebElement]:
-    all_models: list[WebElement] = driver.find_element(
-        By.CLASS_NAME, "vehicles-container"
-    ).find_elements(By.CLASS_NAME, "vehicle-container")
+def extract_model_page(
+    page: ModelPage,
+    taxonomy: TaxonomyIndex,
+    crawl_state: CrawlStateStore | None = None,
+    extract_offers: ExtractOffers = extract_offers_info,
+    deduplicator: OfferDeduplicator | None = None,
+) -> list[Offer]:
+    model_offers: list[Offer] | None = page.offers
+    if model_offers is None:
+        model_offers = extract_model_offers(
+            page.model, page.offer_texts, taxonomy, extract_offers, deduplicator
+        )
 
-    return all_models
+    deferred: int = sum(
+        offer.offer_settings is not None and offer.offer_settings.deferred
+        for offer in model_offers
+    )
+    if deferred:
+        # Not recorded, the next incremental run extracts the page again
+        logging.warning(
+            f"{deferred} offers of {page.model.name} missed the LLM deadline, "
+            "left for the next run"
+        )
+    elif crawl_state is not None and page.fingerprint is not None:
+        crawl_state.record(page.model, page.fingerprint, model_offers)
+    return model_offers
+
+
+def get_model_offers(
+    backend: ScrapingBackend,
+    model: ModelTile,
+    taxonomy: TaxonomyIndex,
+    crawl_state: CrawlStateStore | None = None,
+    extract_offers: ExtractOffers = extract_offers_info,
+    deduplicator: OfferDeduplicator | None = None,
+) -> list[Offer]:
+    return extract_model_page(
+        load_model_page(backend, model, crawl_state),
+        taxonomy,
+        crawl_state,
+        extract_offers,
+        deduplicator,
+    )
 
 
 def get_all_offers(
-    driver: WebDriver,
-    years: Years,
-    styles: BodyStyles,
-    models: Models,
+    backend: ScrapingBackend,
+    taxonomy: TaxonomyIndex,
     expected_models_count: int,
-) -> list[Offer]:
-    all_models: list[WebElement] = get_all_models(driver)
+    workers: int = 1,
+    backend_factory: Callable[[], ScrapingBackend] = setup_backend,
+    crawl_state: CrawlStateStore | None = None,
+    extract_offers: ExtractOffers = extract_offers_info,
+    deduplicator: OfferDeduplicator | None = None,
+    extraction_workers: int = EXTRACTION_WORKERS,
+    extraction_queue_size: int = EXTRACTION_QUEUE_SIZE,
+) -> Iterator[Offer]:
+    all_models: list[ModelTile] = get_all_models(backend)
 
     assert (
         len(all_models) == expected_models_count
     ), "Did not find the correct number of models"
 
-    offers_data: list[Offer] = []
-    for model_idx in range(expected_models_count):
-        model_name: str = all_models[model_idx].find_element(By.TAG_NAME, "h5").text
-        logging.info(f"Getting all offers for: {model_name}")
-
-        offer: Offer = Offer(
-            audience_model=model_name,
-            model=extract_model_from_string(models, input_string=model_name),
-            trim=extract_trim_from_string(styles, input_string=model_name),
-            year=extract_year_from_string(years, input_string=model_name),
-        )
-
-        extracted_offers: list[OfferSettings] = get_offers(all_models[model_idx], driver)
-
-        for extracted_offer in extracted_offers:
-            new_offer: Offer = offer.model_copy()
-            new_offer.offer_settings = extracted_offer
-            offers_data.append(new_offer)
-
-        driver.back()
-        # Refresh all models
-        all_models = get_all_models(driver)
-
-        assert (
-            len(all_models) == expected_models_count
-        ), "Did not find the correct number of models"
-        close_cookie_banner(driver)
-
-    return offers_data
-
-
-def scrape_audi(driver: WebDriver, url: str = AUDI_URL) -> list[Offer]:
-    driver.get(url)
-    close_cookie_banner(driver)
-    years, styles, models = build_data(driver)
-    offers: list[Offer] = get_all_offers(
-        driver, years, styles, models, get_models_count(driver)
+    load_page: Callable[[ScrapingBackend, ModelTile], ModelPage] = partial(
+        load_model_page, crawl_state=crawl_state
     )
-    logging.info("Quitting Driver")
-    driver.quit()
-
-    return offers
+    model_pages: Iterator[ModelPage]
+    if workers > 1:
+        logging.info(f"Scraping {len(all_models)} models with {workers} workers")
+        model_pages = DriverPool[ScrapingBackend, ModelTile, ModelPage](
+            workers, backend_factory
+        ).imap(load_page, all_models)
+    else:
+        model_pages = (load_page(backend, model) for model in all_models)
+
+    extract_page: Callable[[ModelPage], list[Offer]] = partial(
+        extract_model_page,
+        taxonomy=taxonomy,
+        crawl_state=crawl_state,
+        extract_offers=extract_offers,
+        deduplicator=deduplicator,
+    )
+    offers_per_model: Iterator[list[Offer]]
+    if extraction_workers > 0:
+        # Browsers keep loading model pages while earlier ones are extracted
+        offers_per_model = Pipeline[ModelPage, list[Offer]](
+            extraction_workers, extraction_queue_size
+        ).imap(model_pages, extract_page)
+    else:
+        offers_per_model = map(extract_page, model_pages)
+
+    for model_offers in offers_per_model:
+        yield from model_offers
+
+    if crawl_state is not None:
+        crawl_state.finish(all_models)
+
+
+def scrape_audi(
+    backend: ScrapingBackend,
+    url: str = AUDI_URL,
+    workers: int = SCRAPER_WORKERS,
+    backend_factory: Callable[[], ScrapingBackend] = setup_backend,
+    crawl_state: CrawlStateStore | None = None,
+    extract_offers: ExtractOffers = extract_offers_info,
+    deduplicate: bool = DEDUPLICATE_OFFERS,
+    extraction_workers: int = EXTRACTION_WORKERS,
+) -> Iterator[Offer]:
+    # Shared by every model of the listing, one extraction per manufacturer
+    # offer instead of one per model carrying it
+    deduplicator: OfferDeduplicator | None = OfferDeduplicator() if deduplicate else None
+    try:
+        with instrumentation.span("listing_load"):
+            backend.load(url)
+        with instrumentation.span("facet_build"):
+            taxonomy: TaxonomyIndex = load_taxonomy(backend)
+        yield from get_all_offers(
+            backend,
+            taxonomy,
+            get_models_count(backend),
+            workers=workers,
+            backend_factory=backend_factory,
+            crawl_state=crawl_state,
+            extract_offers=extract_offers,
+            deduplicator=deduplicator,
+            extraction_workers=extraction_workers,
+        )
+        if deduplicator is not None:
+            deduplicator.log_stats()
+    finally:
+        backend.quit()
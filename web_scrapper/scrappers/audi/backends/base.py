@@ -0,0 +1,33 @@
+from abc import ABC, abstractmethod
+
+from web_scrapper.scrappers.audi.models_library import ModelTile
+
+
+class PageRequiresJavaScript(Exception):
+    pass
+
+
+class ScrapingBackend(ABC):
+    @abstractmethod
+    def load(self, url: str) -> None:
+        pass
+
+    @abstractmethod
+    def get_facet_items(self, div_number: int) -> list[str]:
+        pass
+
+    @abstractmethod
+    def get_models_count(self) -> int:
+        pass
+
+    @abstractmethod
+    def get_model_tiles(self) -> list[ModelTile]:
+        pass
+
+    @abstractmethod
+    def get_offer_texts(self, offer_section: str) -> list[str]:
+        pass
+
+    @abstractmethod
+    def quit(self) -> None:
+        pass
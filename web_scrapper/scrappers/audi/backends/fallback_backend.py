@@ -0,0 +1,87 @@
+import logging
+from typing import Callable, TypeVar
+
+from web_scrapper.scrappers.audi.backends.base import (
+    PageRequiresJavaScript,
+    ScrapingBackend,
+)
+from web_scrapper.scrappers.audi.backends.http_backend import HttpBackend
+from web_scrapper.scrappers.audi.models_library import ModelTile
+from web_scrapper.settings import SCRAPER_BACKEND
+
+T = TypeVar("T")
+
+
+class FallbackBackend(ScrapingBackend):
+    primary: ScrapingBackend
+    fallback_factory: Callable[[], ScrapingBackend]
+    url: str | None
+
+    def __init__(
+        self,
+        primary: ScrapingBackend,
+        fallback_factory: Callable[[], ScrapingBackend],
+    ) -> None:
+        self.primary = primary
+        self.fallback_factory = fallback_factory
+        self.url = None
+        self._fallback: ScrapingBackend | None = None
+        self._active: ScrapingBackend = primary
+
+    @property
+    def active(self) -> ScrapingBackend:
+        return self._active
+
+    def load(self, url: str) -> None:
+        self.url = url
+        self._active = self.primary
+        self.primary.load(url)
+
+    def get_facet_items(self, div_number: int) -> list[str]:
+        return self._call(lambda backend: backend.get_facet_items(div_number))
+
+    def get_models_count(self) -> int:
+        return self._call(lambda backend: backend.get_models_count())
+
+    def get_model_tiles(self) -> list[ModelTile]:
+        return self._call(lambda backend: backend.get_model_tiles())
+
+    def get_offer_texts(self, offer_section: str) -> list[str]:
+        return self._call(lambda backend: backend.get_offer_texts(offer_section))
+
+    def quit(self) -> None:
+        self.primary.quit()
+        if self._fallback is not None:
+            self._fallback.quit()
+
+    def _call(self, getter: Callable[[ScrapingBackend], T]) -> T:
+        try:
+            return getter(self._active)
+        except PageRequiresJavaScript as error:
+            if self._active is not self.primary:
+                raise
+            logging.info(f"{error}, falling back to a browser for {self.url}")
+
+        if self._fallback is None:
+            self._fallback = self.fallback_factory()
+        assert self.url is not None, "No page has been loaded"
+        self._fallback.load(self.url)
+        self._active = self._fallback
+        return getter(self._active)
+
+
+def setup_selenium_backend() -> ScrapingBackend:
+    # Selenium is only imported once a page needs a browser, most runs of the
+    # http backend never fall back
+    from web_scrapper.scrappers.audi.backends.selenium_backend import SeleniumBackend
+    from web_scrapper.scrappers.utils import setup_driver
+
+    return SeleniumBackend(setup_driver())
+
+
+def setup_backend(kind: str = SCRAPER_BACKEND) -> ScrapingBackend:
+    if kind == "selenium":
+        return setup_selenium_backend()
+    if kind == "http":
+        return FallbackBackend(HttpBackend(), fallback_factory=setup_selenium_backend)
+    raise ValueError(f"Unknown scraping backend: {kind}")
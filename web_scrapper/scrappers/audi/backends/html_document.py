@@ -0,0 +1,244 @@
+import re
+from html.parser import HTMLParser
+from typing import Callable, Final, Iterator, NamedTuple
+
+VOID_TAGS: Final[frozenset[str]] = frozenset(
+    {
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+    }
+)
+# Tags whose content never shows up in the rendered text of a page
+SKIPPED_TAGS: Final[frozenset[str]] = frozenset(
+    {"script", "style", "noscript", "template", "svg", "head"}
+)
+# Tags that start a new line in the rendered text, like innerText does
+BLOCK_TAGS: Final[frozenset[str]] = frozenset(
+    {
+        "address",
+        "article",
+        "aside",
+        "blockquote",
+        "br",
+        "dd",
+        "div",
+        "dl",
+        "dt",
+        "figure",
+        "footer",
+        "form",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "header",
+        "hr",
+        "li",
+        "main",
+        "nav",
+        "ol",
+        "p",
+        "section",
+        "table",
+        "tr",
+        "ul",
+    }
+)
+
+
+class ImpliedEnd(NamedTuple):
+    # Open elements a start tag closes, unless one of the boundaries is open
+    # inside them, e.g. an <li> of a nested list does not close the outer one
+    closes: frozenset[str]
+    boundaries: frozenset[str]
+
+
+CLOSES_PARAGRAPH: Final[ImpliedEnd] = ImpliedEnd(
+    frozenset({"p"}), frozenset({"button", "table", "td", "th"})
+)
+# HTML5 end tags a browser implies, listing pages leave <li> and <p> open
+IMPLIED_ENDS: Final[dict[str, tuple[ImpliedEnd, ...]]] = {
+    **{tag: (CLOSES_PARAGRAPH,) for tag in BLOCK_TAGS - {"br", "tr"}},
+    "li": (
+        ImpliedEnd(frozenset({"li"}), frozenset({"ul", "ol", "table", "td", "th"})),
+        CLOSES_PARAGRAPH,
+    ),
+    **dict.fromkeys(
+        ("dt", "dd"),
+        (
+            ImpliedEnd(frozenset({"dt", "dd"}), frozenset({"dl", "table", "td", "th"})),
+            CLOSES_PARAGRAPH,
+        ),
+    ),
+    "option": (ImpliedEnd(frozenset({"option"}), frozenset({"select", "optgroup"})),),
+    "tr": (
+        ImpliedEnd(
+            frozenset({"tr", "td", "th"}),
+            frozenset({"table", "thead", "tbody", "tfoot"}),
+        ),
+    ),
+    **dict.fromkeys(
+        ("td", "th"), (ImpliedEnd(frozenset({"td", "th"}), frozenset({"tr", "table"})),)
+    ),
+}
+WHITESPACE_PATTERN: Final[re.Pattern[str]] = re.compile(r"[ \t\r\n\f]+")
+HIDDEN_STYLE_PATTERN: Final[re.Pattern[str]] = re.compile(
+    r"display\s*:\s*none|visibility\s*:\s*hidden"
+)
+
+
+class HtmlNode:
+    tag: str
+    attrs: dict[str, str]
+    children: list["HtmlNode | str"]
+
+    def __init__(self, tag: str, attrs: dict[str, str]) -> None:
+        self.tag = tag
+        self.attrs = attrs
+        self.children = []
+
+    @property
+    def classes(self) -> set[str]:
+        return set(self.attrs.get("class", "").split())
+
+    def iter_descendants(self) -> Iterator["HtmlNode"]:
+        # Document order with an explicit stack, unclosed tags can nest deeper
+        # than the recursion limit
+        stack: list[HtmlNode] = self._child_nodes()
+        while stack:
+            node: HtmlNode = stack.pop()
+            yield node
+            stack.extend(node._child_nodes())
+
+    def _child_nodes(self) -> list["HtmlNode"]:
+        # Reversed, the first child is popped first
+        return [
+            child for child in reversed(self.children) if isinstance(child, HtmlNode)
+        ]
+
+    def find_all(self, predicate: Callable[["HtmlNode"], bool]) -> list["HtmlNode"]:
+        return [node for node in self.iter_descendants() if predicate(node)]
+
+    def find(self, predicate: Callable[["HtmlNode"], bool]) -> "HtmlNode | None":
+        return next((node for node in self.iter_descendants() if predicate(node)), None)
+
+    def child(self, tag: str, position: int) -> "HtmlNode | None":
+        # Same semantics as the XPath step `tag[position]`, which is 1-based
+        matching: list[HtmlNode] = [
+            child
+            for child in self.children
+            if isinstance(child, HtmlNode) and child.tag == tag
+        ]
+        return matching[position - 1] if len(matching) >= position else None
+
+    @property
+    def is_hidden(self) -> bool:
+        return (
+            "hidden" in self.attrs
+            or self.attrs.get("aria-hidden") == "true"
+            or bool(HIDDEN_STYLE_PATTERN.search(self.attrs.get("style", "")))
+        )
+
+    @property
+    def text(self) -> str:
+        chunks: list[str] = []
+        self._collect_text(chunks)
+        lines: list[str] = "".join(chunks).split("\n")
+        return "\n".join(stripped for line in lines if (stripped := line.strip(" ")))
+
+    def _collect_text(self, chunks: list[str]) -> None:
+        # Text runs have their whitespace collapsed, so a newline on the stack
+        # can only be the end of a block
+        stack: list[HtmlNode | str] = [self]
+        while stack:
+            item: HtmlNode | str = stack.pop()
+            if isinstance(item, str):
+                chunks.append(item)
+                continue
+            if item.tag in SKIPPED_TAGS or item.is_hidden:
+                continue
+            if item.tag in BLOCK_TAGS:
+                chunks.append("\n")
+                stack.append("\n")
+            stack.extend(
+                (
+                    child
+                    if isinstance(child, HtmlNode)
+                    else WHITESPACE_PATTERN.sub(" ", child)
+                )
+                for child in reversed(item.children)
+            )
+
+
+def has_class(class_name: str) -> Callable[[HtmlNode], bool]:
+    return lambda node: class_name in node.classes
+
+
+def has_tag(tag: str) -> Callable[[HtmlNode], bool]:
+    return lambda node: node.tag == tag
+
+
+def has_attribute(tag: str, name: str, value: str) -> Callable[[HtmlNode], bool]:
+    return lambda node: node.tag == tag and node.attrs.get(name) == value
+
+
+class HtmlTreeBuilder(HTMLParser):
+    root: HtmlNode
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root = HtmlNode("document", {})
+        self._stack: list[HtmlNode] = [self.root]
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        for implied_end in IMPLIED_ENDS.get(tag, ()):
+            self._close_implied(implied_end)
+        node: HtmlNode = HtmlNode(tag, {name: value or "" for name, value in attrs})
+        self._stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self._stack.append(node)
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self._stack[-1].children.append(
+            HtmlNode(tag, {name: value or "" for name, value in attrs})
+        )
+
+    def handle_endtag(self, tag: str) -> None:
+        # Tolerate unclosed tags by popping up to the matching open element
+        for depth in range(len(self._stack) - 1, 0, -1):
+            if self._stack[depth].tag == tag:
+                del self._stack[depth:]
+                return
+
+    def _close_implied(self, implied_end: ImpliedEnd) -> None:
+        for depth in range(len(self._stack) - 1, 0, -1):
+            open_tag: str = self._stack[depth].tag
+            if open_tag in implied_end.closes:
+                del self._stack[depth:]
+                return
+            if open_tag in implied_end.boundaries:
+                return
+
+    def handle_data(self, data: str) -> None:
+        self._stack[-1].children.append(data)
+
+
+def parse_html(html: str) -> HtmlNode:
+    builder: HtmlTreeBuilder = HtmlTreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
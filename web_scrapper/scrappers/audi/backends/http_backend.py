@@ -0,0 +1,125 @@
+import logging
+from typing import Callable
+from urllib.parse import urljoin
+
+import httpx
+
+from web_scrapper.instrumentation import instrumentation
+from web_scrapper.scrappers.audi.backends.base import (
+    PageRequiresJavaScript,
+    ScrapingBackend,
+)
+from web_scrapper.scrappers.audi.backends.html_document import (
+    HtmlNode,
+    has_attribute,
+    has_class,
+    has_tag,
+    parse_html,
+)
+from web_scrapper.scrappers.audi.models_library import ModelTile
+from web_scrapper.settings import HTTP_MAX_CONNECTIONS, HTTP_TIMEOUT_SECONDS
+
+USER_AGENT: str = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/125.0.0.0 Safari/537.36"
+)
+
+
+def setup_http_client() -> httpx.Client:
+    return httpx.Client(
+        follow_redirects=True,
+        timeout=HTTP_TIMEOUT_SECONDS,
+        headers={"User-Agent": USER_AGENT},
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+        ),
+    )
+
+
+class HttpBackend(ScrapingBackend):
+    client: httpx.Client
+    url: str | None
+    document: HtmlNode | None
+    html: str | None
+
+    def __init__(self, client: httpx.Client | None = None) -> None:
+        self.client = client or setup_http_client()
+        self.url = None
+        self.document = None
+        self.html = None
+
+    def load(self, url: str) -> None:
+        response: httpx.Response = self.client.get(url)
+        response.raise_for_status()
+        self.url = str(response.url)
+        self.html = response.text
+        with instrumentation.span("dom_query"):
+            self.document = parse_html(response.text)
+
+    def get_facet_items(self, div_number: int) -> list[str]:
+        sidebar: HtmlNode = self._require(has_class("facets-container"), "facets")
+        div_element: HtmlNode | None = sidebar.child("div", div_number)
+        ul_element: HtmlNode | None = (
+            div_element.find(has_tag("ul")) if div_element else None
+        )
+        if ul_element is None:
+            raise PageRequiresJavaScript(f"Facet {div_number} is not in the HTML")
+        return [li.text for li in ul_element.find_all(has_tag("li"))]
+
+    def get_models_count(self) -> int:
+        header: HtmlNode = self._require(has_class("incentives-header"), "header")
+        results_count: HtmlNode | None = header.find(
+            lambda node: node.attrs.get("id") == "results-count"
+        )
+        if results_count is None or not results_count.text.isdigit():
+            raise PageRequiresJavaScript("Results count is not in the HTML")
+        return int(results_count.text)
+
+    def get_model_tiles(self) -> list[ModelTile]:
+        container: HtmlNode = self._require(
+            has_class("vehicles-container"), "vehicles container"
+        )
+        model_tiles: list[ModelTile] = []
+        for model_element in container.find_all(has_class("vehicle-container")):
+            name_element: HtmlNode | None = model_element.find(has_tag("h5"))
+            link_element: HtmlNode | None = model_element.child("a", 2)
+            if name_element is None or link_element is None:
+                raise PageRequiresJavaScript("Model tile is not fully rendered")
+            model_tiles.append(
+                ModelTile(
+                    name=name_element.text,
+                    url=urljoin(self.url or "", link_element.attrs.get("href", "")),
+                )
+            )
+
+        if not model_tiles:
+            raise PageRequiresJavaScript("No model tiles in the HTML")
+        return model_tiles
+
+    def get_offer_texts(self, offer_section: str) -> list[str]:
+        document: HtmlNode = self._require_document()
+        # A detail page always has at least one offers section once rendered
+        if document.find(lambda node: "data-offer" in node.attrs) is None:
+            raise PageRequiresJavaScript("No offer sections in the HTML")
+
+        section: HtmlNode | None = document.find(
+            has_attribute("section", "data-offer", offer_section)
+        )
+        if section is None:
+            return []
+        return [article.text for article in section.find_all(has_tag("article"))]
+
+    def quit(self) -> None:
+        logging.debug("Closing HTTP client")
+        self.client.close()
+
+    def _require_document(self) -> HtmlNode:
+        assert self.document is not None, "No page has been loaded"
+        return self.document
+
+    def _require(self, predicate: Callable[[HtmlNode], bool], name: str) -> HtmlNode:
+        node: HtmlNode | None = self._require_document().find(predicate)
+        if node is None:
+            raise PageRequiresJavaScript(f"Could not find {name} in the HTML")
+        return node
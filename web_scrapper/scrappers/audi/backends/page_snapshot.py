@@ -0,0 +1,108 @@
+from typing import Any, Final
+
+from pydantic import BaseModel
+from selenium.common.exceptions import NoSuchElementException
+
+from web_scrapper.scrappers.audi.models_library import ModelTile
+
+# Reads everything the scraper needs from a listing or detail page in a single
+# WebDriver roundtrip. innerText without the blank lines of paragraph margins
+# matches what WebElement.text returns, and the text of the HTTP backend.
+PAGE_SNAPSHOT_SCRIPT: Final[
+    str
+] = """
+const childrenByTag = (element, tag) => Array.from(element.children).filter(
+    (child) => child.tagName.toLowerCase() === tag
+);
+const textOf = (element) => (
+    element
+        ? element.innerText.split("\n").map((line) => line.trim())
+            .filter(Boolean).join("\n")
+        : null
+);
+
+const sidebar = document.querySelector(".facets-container");
+const facets = sidebar
+    ? childrenByTag(sidebar, "div").map((div) => {
+        const list = div.querySelector("ul");
+        return list ? Array.from(list.querySelectorAll("li"), textOf) : null;
+    })
+    : null;
+
+const header = document.querySelector(".incentives-header");
+const modelsCount = header ? textOf(header.querySelector("#results-count")) : null;
+
+const vehicles = document.querySelector(".vehicles-container");
+const tiles = vehicles
+    ? Array.from(vehicles.querySelectorAll(".vehicle-container"), (tile) => {
+        const links = childrenByTag(tile, "a");
+        return {
+            name: textOf(tile.querySelector("h5")),
+            url: links.length > 1 ? links[1].href : null,
+        };
+    })
+    : null;
+
+const wrapper = document.querySelector(".ddc-wrapper");
+const mainContent = wrapper ? childrenByTag(wrapper, "div")[1] : null;
+let offers = null;
+if (mainContent) {
+    offers = {};
+    for (const section of mainContent.querySelectorAll("section[data-offer]")) {
+        if (!(section.dataset.offer in offers)) {
+            offers[section.dataset.offer] = Array.from(
+                section.querySelectorAll("article"), textOf
+            );
+        }
+    }
+}
+
+return {facets: facets, models_count: modelsCount, tiles: tiles, offers: offers};
+"""
+
+
+class TileSnapshot(BaseModel):
+    name: str | None = None
+    url: str | None = None
+
+
+class PageSnapshot(BaseModel):
+    facets: list[list[str] | None] | None = None
+    models_count: str | None = None
+    tiles: list[TileSnapshot] | None = None
+    offers: dict[str, list[str]] | None = None
+
+    @classmethod
+    def from_script_result(cls, result: Any) -> "PageSnapshot":
+        return cls.model_validate(result or {})
+
+    def get_facet_items(self, div_number: int) -> list[str]:
+        facet: list[str] | None = (
+            self.facets[div_number - 1]
+            if self.facets is not None and 0 < div_number <= len(self.facets)
+            else None
+        )
+        if facet is None:
+            raise NoSuchElementException(f"Facet {div_number} not found on the page")
+        return facet
+
+    def get_models_count(self) -> int:
+        if self.models_count is None:
+            raise NoSuchElementException("Results count not found on the page")
+        return int(self.models_count)
+
+    def get_model_tiles(self) -> list[ModelTile]:
+        if self.tiles is None:
+            raise NoSuchElementException("Vehicles container not found on the page")
+
+        model_tiles: list[ModelTile] = []
+        for tile in self.tiles:
+            assert tile.name is not None, "Model tile has no name"
+            assert tile.url, "Model tile does not link to a detail page"
+            model_tiles.append(ModelTile(name=tile.name, url=tile.url))
+        return model_tiles
+
+    def get_offer_texts(self, offer_section: str) -> list[str]:
+        if self.offers is None:
+            raise NoSuchElementException("Main content not found on the page")
+        return self.offers.get(offer_section, [])
@@ -0,0 +1,47 @@
+from typing import Callable
+
+from web_scrapper.scrappers.audi.backends.base import ScrapingBackend
+from web_scrapper.scrappers.audi.backends.fallback_backend import FallbackBackend
+from web_scrapper.scrappers.audi.models_library import ModelTile
+from web_scrapper.scrappers.politeness import HostPolicies
+
+
+class PoliteBackend(ScrapingBackend):
+    backend: ScrapingBackend
+    policies: HostPolicies
+
+    def __init__(self, backend: ScrapingBackend, policies: HostPolicies) -> None:
+        self.backend = backend
+        self.policies = policies
+
+    def load(self, url: str) -> None:
+        # Only page loads hit the dealer site, the getters read the loaded page
+        self.policies.for_url(url).acquire()
+        self.backend.load(url)
+
+    def get_facet_items(self, div_number: int) -> list[str]:
+        return self.backend.get_facet_items(div_number)
+
+    def get_models_count(self) -> int:
+        return self.backend.get_models_count()
+
+    def get_model_tiles(self) -> list[ModelTile]:
+        return self.backend.get_model_tiles()
+
+    def get_offer_texts(self, offer_section: str) -> list[str]:
+        return self.backend.get_offer_texts(offer_section)
+
+    def quit(self) -> None:
+        self.backend.quit()
+
+
+def make_polite(backend: ScrapingBackend, policies: HostPolicies) -> ScrapingBackend:
+    # Wraps the backends that request pages, a fallback loads the page again
+    # and has to wait its turn and count against the budget too
+    if isinstance(backend, FallbackBackend):
+        fallback_factory: Callable[[], ScrapingBackend] = backend.fallback_factory
+        return FallbackBackend(
+            make_polite(backend.primary, policies),
+            fallback_factory=lambda: make_polite(fallback_factory(), policies),
+        )
+    return PoliteBackend(backend, policies)
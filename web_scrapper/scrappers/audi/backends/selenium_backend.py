@@ -0,0 +1,112 @@
+import logging
+import statistics
+import time
+
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from web_scrapper.instrumentation import instrumentation
+from web_scrapper.scrappers.audi.backends.base import ScrapingBackend
+from web_scrapper.scrappers.audi.backends.page_snapshot import (
+    PAGE_SNAPSHOT_SCRIPT,
+    PageSnapshot,
+)
+from web_scrapper.scrappers.audi.models_library import ModelTile
+from web_scrapper.scrappers.audi.utils import close_cookie_banner
+from web_scrapper.scrappers.utils import WebDriverCommandCounter, wait_for_page_ready
+from web_scrapper.settings import (
+    BROWSER_OFFERS_READY_TIMEOUT_SECONDS,
+    BROWSER_PAGE_READY_TIMEOUT_SECONDS,
+)
+
+# Present on both the listing and the detail pages once they are rendered
+PAGE_READY_SELECTOR: str = ".ddc-wrapper"
+# Rendered into the wrapper later, only on detail pages
+OFFERS_READY_SELECTOR: str = "section[data-offer]"
+
+
+class SeleniumBackend(ScrapingBackend):
+    driver: WebDriver
+    command_counter: WebDriverCommandCounter
+    commands_per_page: dict[str, int]
+    load_seconds_per_page: dict[str, float]
+
+    def __init__(self, driver: WebDriver) -> None:
+        self.driver = driver
+        self.command_counter = WebDriverCommandCounter(driver)
+        self.commands_per_page = {}
+        self.load_seconds_per_page = {}
+        self._url: str | None = None
+        self._snapshot: PageSnapshot | None = None
+        self._offers_waited: bool = False
+
+    def load(self, url: str) -> None:
+        self._record_page_commands()
+        self.command_counter.start_page()
+        self._url = url
+        self._snapshot = None
+        self._offers_waited = False
+        start_time: float = time.perf_counter()
+        self.driver.get(url)
+        if self.driver.capabilities.get("pageLoadStrategy") == "eager":
+            wait_for_page_ready(
+                self.driver, PAGE_READY_SELECTOR, BROWSER_PAGE_READY_TIMEOUT_SECONDS
+            )
+        self.load_seconds_per_page[url] = time.perf_counter() - start_time
+        close_cookie_banner(self.driver)
+
+    def get_facet_items(self, div_number: int) -> list[str]:
+        return self.snapshot().get_facet_items(div_number)
+
+    def get_models_count(self) -> int:
+        return self.snapshot().get_models_count()
+
+    def get_model_tiles(self) -> list[ModelTile]:
+        return self.snapshot().get_model_tiles()
+
+    def get_offer_texts(self, offer_section: str) -> list[str]:
+        if not self.snapshot().offers and not self._offers_waited:
+            # Snapshotted before the offers were rendered, read the page again
+            # once they show up. Once per page, a page may have no offers.
+            self._offers_waited = True
+            wait_for_page_ready(
+                self.driver, OFFERS_READY_SELECTOR, BROWSER_OFFERS_READY_TIMEOUT_SECONDS
+            )
+            self._snapshot = None
+        return self.snapshot().get_offer_texts(offer_section)
+
+    def snapshot(self) -> PageSnapshot:
+        if self._snapshot is None:
+            with instrumentation.span("dom_query"):
+                self._snapshot = PageSnapshot.from_script_result(
+                    self.driver.execute_script(PAGE_SNAPSHOT_SCRIPT)
+                )
+        return self._snapshot
+
+    def quit(self) -> None:
+        self._record_page_commands()
+        logging.info(
+            f"WebDriver commands issued: {self.command_counter.total} "
+            f"over {len(self.commands_per_page)} pages"
+        )
+        if self.load_seconds_per_page:
+            logging.info(
+                "Median page load: "
+                f"{statistics.median(self.load_seconds_per_page.values()):.2f}s "
+                f"over {len(self.load_seconds_per_page)} pages"
+            )
+        instrumentation.record(
+            "webdriver_session",
+            0.0,
+            commands=self.command_counter.total,
+            pages=len(self.commands_per_page),
+        )
+        logging.info("Quitting Driver")
+        self.driver.quit()
+
+    def _record_page_commands(self) -> None:
+        if self._url is None:
+            return
+        self.commands_per_page[self._url] = self.command_counter.current_page
+        logging.debug(
+            f"WebDriver commands for {self._url}: {self.command_counter.current_page}"
+        )
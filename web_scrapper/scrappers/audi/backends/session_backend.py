@@ -0,0 +1,46 @@
+import logging
+from types import TracebackType
+
+from web_scrapper.scrappers.audi.backends.base import ScrapingBackend
+from web_scrapper.scrappers.audi.models_library import ModelTile
+
+
+class SessionBackend(ScrapingBackend):
+    backend: ScrapingBackend
+
+    def __init__(self, backend: ScrapingBackend) -> None:
+        self.backend = backend
+
+    def __enter__(self) -> "SessionBackend":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def load(self, url: str) -> None:
+        self.backend.load(url)
+
+    def get_facet_items(self, div_number: int) -> list[str]:
+        return self.backend.get_facet_items(div_number)
+
+    def get_models_count(self) -> int:
+        return self.backend.get_models_count()
+
+    def get_model_tiles(self) -> list[ModelTile]:
+        return self.backend.get_model_tiles()
+
+    def get_offer_texts(self, offer_section: str) -> list[str]:
+        return self.backend.get_offer_texts(offer_section)
+
+    def quit(self) -> None:
+        # scrape_audi quits its backend when done, keep the browser running so
+        # the next call skips the startup
+        logging.debug("Keeping the scraping session open")
+
+    def close(self) -> None:
+        self.backend.quit()
@@ -0,0 +1,122 @@
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import BaseModel, ValidationError
+
+from web_scrapper.scrappers.audi.models_library import ModelTile, Offer
+
+
+class ModelCrawlState(BaseModel):
+    name: str
+    fingerprint: str
+    offers: list[Offer]
+    run_id: str
+
+
+class CrawlState(BaseModel):
+    run_id: str
+    run_completed: bool = False
+    models: dict[str, ModelCrawlState] = {}
+
+
+class CrawlSummary(BaseModel):
+    new: list[str] = []
+    changed: list[str] = []
+    unchanged: list[str] = []
+    resumed: list[str] = []
+    removed: list[str] = []
+
+
+def fingerprint_offers(model: ModelTile, offer_texts: list[tuple[str, str]]) -> str:
+    digest = hashlib.sha256(model.name.encode("utf-8"))
+    for offer, offer_type in offer_texts:
+        digest.update(b"\x00" + offer_type.encode("utf-8") + b"\x00")
+        digest.update(offer.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class CrawlStateStore:
+    state_file: Path
+    state: CrawlState
+    summary: CrawlSummary
+
+    def __init__(self, state_file: Path) -> None:
+        self.state_file = state_file
+        self.summary = CrawlSummary()
+        self._lock: threading.Lock = threading.Lock()
+        self.state = self._load()
+
+    def completed_offers(self, model: ModelTile) -> list[Offer] | None:
+        # Models already done by an interrupted run with the same run_id
+        model_state: ModelCrawlState | None = self.state.models.get(model.url)
+        if model_state is None or model_state.run_id != self.state.run_id:
+            return None
+        with self._lock:
+            self.summary.resumed.append(model.name)
+        return model_state.offers
+
+    def unchanged_offers(self, model: ModelTile, fingerprint: str) -> list[Offer] | None:
+        model_state: ModelCrawlState | None = self.state.models.get(model.url)
+        if model_state is None or model_state.fingerprint != fingerprint:
+            return None
+        return model_state.offers
+
+    def record(self, model: ModelTile, fingerprint: str, offers: list[Offer]) -> None:
+        with self._lock:
+            previous: ModelCrawlState | None = self.state.models.get(model.url)
+            if previous is None:
+                self.summary.new.append(model.name)
+            elif previous.fingerprint != fingerprint:
+                self.summary.changed.append(model.name)
+            else:
+                self.summary.unchanged.append(model.name)
+
+            self.state.models[model.url] = ModelCrawlState(
+                name=model.name,
+                fingerprint=fingerprint,
+                offers=offers,
+                run_id=self.state.run_id,
+            )
+            self._save()
+
+    def finish(self, listed_models: list[ModelTile]) -> CrawlSummary:
+        listed_urls: set[str] = {model.url for model in listed_models}
+        with self._lock:
+            for url in list(self.state.models):
+                if url not in listed_urls:
+                    self.summary.removed.append(self.state.models.pop(url).name)
+            self.state.run_completed = True
+            self._save()
+
+        logging.info(
+            f"Crawl summary: {len(self.summary.new)} new, "
+            f"{len(self.summary.changed)} changed, "
+            f"{len(self.summary.unchanged)} unchanged, "
+            f"{len(self.summary.resumed)} resumed, "
+            f"{len(self.summary.removed)} removed"
+        )
+        return self.summary
+
+    def _load(self) -> CrawlState:
+        try:
+            state: CrawlState = CrawlState.model_validate_json(
+                self.state_file.read_text(encoding="utf-8")
+            )
+        except (OSError, ValidationError):
+            return CrawlState(run_id=datetime.now().isoformat())
+
+        if state.run_completed:
+            return CrawlState(run_id=datetime.now().isoformat(), models=state.models)
+
+        logging.info(f"Resuming interrupted crawl {state.run_id}")
+        return state
+
+    def _save(self) -> None:
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file: Path = self.state_file.with_suffix(".tmp")
+        tmp_file.write_text(self.state.model_dump_json(), encoding="utf-8")
+        # Atomic so that an interruption never leaves a truncated state file
+        tmp_file.replace(self.state_file)
@@ -0,0 +1,246 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Iterator
+
+from pydantic import BaseModel
+
+from web_scrapper.scrappers.audi.audi_scrapper import scrape_audi
+from web_scrapper.scrappers.audi.backends.base import ScrapingBackend
+from web_scrapper.scrappers.audi.backends.fallback_backend import setup_backend
+from web_scrapper.scrappers.audi.backends.polite_backend import make_polite
+from web_scrapper.scrappers.audi.backends.session_backend import SessionBackend
+from web_scrapper.scrappers.audi.crawl_state import CrawlStateStore
+from web_scrapper.scrappers.audi.extractor_agent.extraction import (
+    ExtractOffers,
+    extract_offers_info,
+)
+from web_scrapper.scrappers.audi.models_library import Offer
+from web_scrapper.scrappers.driver_pool import RETRYABLE_ERRORS
+from web_scrapper.scrappers.politeness import HostPolicies, get_host
+from web_scrapper.settings import (
+    DEALER_MAX_RETRIES,
+    DEALER_RETRY_DELAY_SECONDS,
+    DEALER_WORKERS,
+    HOST_REQUEST_BUDGET,
+    HOST_REQUESTS_PER_MINUTE,
+    REUSE_BROWSER_SESSIONS,
+)
+
+
+class DealerJob(BaseModel):
+    url: str
+    priority: int = 0
+    attempts: int = 0
+
+    @property
+    def dealer(self) -> str:
+        return get_host(self.url)
+
+
+class SiteStats(BaseModel):
+    dealer: str
+    status: str = "pending"
+    attempts: int = 0
+    requests: int = 0
+    offers: int = 0
+    seconds: float = 0.0
+    error: str | None = None
+
+    @property
+    def offers_per_minute(self) -> float:
+        return self.offers / self.seconds * 60 if self.seconds else 0.0
+
+    @property
+    def requests_per_minute(self) -> float:
+        return self.requests / self.seconds * 60 if self.seconds else 0.0
+
+
+def dealer_path(path: Path, dealer: str) -> Path:
+    # One state file per dealer, the files are keyed by the whole site
+    return path.with_name(f"{path.stem}.{dealer}{path.suffix}")
+
+
+class DealerScheduler:
+    workers: int
+    policies: HostPolicies
+    backend_factory: Callable[[], ScrapingBackend]
+    workers_per_dealer: int
+    max_retries: int
+    retry_delay_seconds: float
+    retry_on: tuple[type[Exception], ...]
+    crawl_state_file: Path | None
+    reuse_sessions: bool
+    extract_offers: ExtractOffers
+    stats: dict[str, SiteStats]
+
+    def __init__(
+        self,
+        workers: int = DEALER_WORKERS,
+        policies: HostPolicies | None = None,
+        backend_factory: Callable[[], ScrapingBackend] = setup_backend,
+        workers_per_dealer: int = 1,
+        max_retries: int = DEALER_MAX_RETRIES,
+        retry_delay_seconds: float = DEALER_RETRY_DELAY_SECONDS,
+        retry_on: tuple[type[Exception], ...] = RETRYABLE_ERRORS,
+        crawl_state_file: Path | None = None,
+        reuse_sessions: bool = REUSE_BROWSER_SESSIONS,
+        extract_offers: ExtractOffers = extract_offers_info,
+    ) -> None:
+        self.workers = workers
+        self.policies = policies or HostPolicies(
+            HOST_REQUESTS_PER_MINUTE, HOST_REQUEST_BUDGET
+        )
+        self.backend_factory = backend_factory
+        self.workers_per_dealer = workers_per_dealer
+        self.max_retries = max_retries
+        self.retry_delay_seconds = retry_delay_seconds
+        self.retry_on = retry_on
+        self.crawl_state_file = crawl_state_file
+        self.reuse_sessions = reuse_sessions
+        self.extract_offers = extract_offers
+        self.stats = {}
+        self._queue: list[tuple[int, int, DealerJob]] = []
+        self._retry_queue: list[tuple[float, int, DealerJob]] = []
+        self._sequence: Iterator[int] = itertools.count()
+        self._lock: threading.Lock = threading.Lock()
+        self._sessions: list[SessionBackend] = []
+        self._local: threading.local = threading.local()
+
+    def add(self, url: str, priority: int = 0) -> None:
+        # Lower priority values are crawled first, ties keep insertion order
+        job: DealerJob = DealerJob(url=url, priority=priority)
+        self.stats.setdefault(job.dealer, SiteStats(dealer=job.dealer))
+        heapq.heappush(self._queue, (priority, next(self._sequence), job))
+
+    def run(self) -> Iterator[list[Offer]]:
+        # The offers of each finished dealer together, they are written at once
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="dealer"
+        )
+        running: dict[Future[list[Offer]], DealerJob] = {}
+        try:
+            while self._queue or self._retry_queue or running:
+                while len(running) < self.workers and (job := self._next_job()):
+                    running[executor.submit(self._crawl, job)] = job
+
+                timeout: float | None = self._seconds_until_next_retry()
+                if not running:
+                    time.sleep(timeout or 0.0)
+                    continue
+
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if offers := self._collect(running.pop(future), future):
+                        yield offers
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+            self.log_stats()
+
+    def log_stats(self) -> None:
+        for site in self.stats.values():
+            logging.info(
+                f"{site.dealer}: {site.status}, {site.offers} offers, "
+                f"{site.requests} requests in {site.seconds:.1f}s "
+                f"({site.offers_per_minute:.1f} offers/min, "
+                f"{site.requests_per_minute:.1f} requests/min), "
+                f"{site.attempts} attempts"
+                + (f", last error: {site.error}" if site.error else "")
+            )
+
+    def _next_job(self) -> DealerJob | None:
+        # Retries that are due go first so a dealer is not starved by new ones
+        if self._retry_queue and self._retry_queue[0][0] <= time.monotonic():
+            return heapq.heappop(self._retry_queue)[2]
+        if self._queue:
+            return heapq.heappop(self._queue)[2]
+        return None
+
+    def _seconds_until_next_retry(self) -> float | None:
+        if not self._retry_queue:
+            return None
+        return max(0.0, self._retry_queue[0][0] - time.monotonic())
+
+    def _polite_backend(self) -> ScrapingBackend:
+        return make_polite(self.backend_factory(), self.policies)
+
+    def _session(self) -> SessionBackend:
+        # Each worker thread keeps its browser across the dealers it crawls
+        session: SessionBackend | None = getattr(self._local, "session", None)
+        if session is None:
+            session = SessionBackend(self._polite_backend())
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def _discard_session(self) -> None:
+        session: SessionBackend | None = getattr(self._local, "session", None)
+        if session is None:
+            return
+        self._local.session = None
+        with self._lock:
+            self._sessions.remove(session)
+        session.close()
+
+    def _crawl(self, job: DealerJob) -> list[Offer]:
+        crawl_state: CrawlStateStore | None = (
+            CrawlStateStore(dealer_path(self.crawl_state_file, job.dealer))
+            if self.crawl_state_file is not None
+            else None
+        )
+        logging.info(f"Crawling {job.dealer} (attempt {job.attempts + 1})")
+        start_time: float = time.monotonic()
+        try:
+            offers: list[Offer] = list(
+                scrape_audi(
+                    self._session() if self.reuse_sessions else self._polite_backend(),
+                    url=job.url,
+                    workers=self.workers_per_dealer,
+                    backend_factory=self._polite_backend,
+                    crawl_state=crawl_state,
+                    extract_offers=self.extract_offers,
+                )
+            )
+        except Exception:
+            # A session that failed mid-crawl may hold a broken browser
+            self._discard_session()
+            raise
+        finally:
+            with self._lock:
+                self.stats[job.dealer].seconds += time.monotonic() - start_time
+
+        for offer in offers:
+            offer.dealer = job.dealer
+        return offers
+
+    def _collect(self, job: DealerJob, future: Future[list[Offer]]) -> list[Offer]:
+        site: SiteStats = self.stats[job.dealer]
+        site.attempts += 1
+        site.requests = self.policies.for_url(job.url).requests_made
+        job.attempts += 1
+
+        error: BaseException | None = future.exception()
+        if error is None:
+            offers: list[Offer] = future.result()
+            site.status = "done"
+            site.offers = len(offers)
+            return offers
+
+        site.error = repr(error)
+        if isinstance(error, self.retry_on) and job.attempts <= self.max_retries:
+            retry_at: float = time.monotonic() + self.retry_delay_seconds * job.attempts
+            logging.warning(f"Crawl of {job.dealer} failed ({error!r}), will retry")
+            heapq.heappush(self._retry_queue, (retry_at, next(self._sequence), job))
+            site.status = "retrying"
+        else:
+            logging.error(f"Giving up on {job.dealer}: {error!r}")
+            site.status = "failed"
+        return []
@@ -0,0 +1,157 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from web_scrapper.scrappers.audi.models_library import OfferSettings
+
+
+def make_cache_key(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        # Separator so that ("ab", "c") and ("a", "bc") hash differently
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    directory: Path
+    ttl_seconds: float | None
+    max_entries: int | None
+    low_water_ratio: float
+    hits: int
+    misses: int
+
+    def __init__(
+        self,
+        directory: Path,
+        ttl_seconds: float | None = None,
+        max_entries: int | None = None,
+        low_water_ratio: float = 0.9,
+    ) -> None:
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # Eviction goes below the limit so the directory scan runs once every
+        # few hundred writes instead of on every write at the limit
+        self.low_water_ratio = low_water_ratio
+        self.hits = 0
+        self.misses = 0
+        self._entries_count: int | None = None
+        self._lock: threading.Lock = threading.Lock()
+        self._evict_lock: threading.Lock = threading.Lock()
+
+    def get(self, key: str) -> OfferSettings | None:
+        path: Path = self._entry_path(key)
+        try:
+            modified_at: float = path.stat().st_mtime
+            if self._is_expired(modified_at):
+                self._remove(path)
+                raise FileNotFoundError(path)
+            offer_settings: OfferSettings = OfferSettings.model_validate_json(
+                path.read_text(encoding="utf-8")
+            )
+        except (OSError, ValueError):
+            self._record(hit=False)
+            return None
+
+        self._record(hit=True)
+        return offer_settings
+
+    def set(self, key: str, offer_settings: OfferSettings) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path: Path = self._entry_path(key)
+        with self._lock:
+            if self._entries_count is None:
+                self._entries_count = sum(1 for _ in self.directory.glob("*.json"))
+            if not path.exists():
+                self._entries_count += 1
+            needs_eviction: bool = (
+                self.max_entries is not None and self._entries_count > self.max_entries
+            )
+
+        tmp_path: Path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(
+            offer_settings.model_dump_json(exclude={"full_offer"}), encoding="utf-8"
+        )
+        # Atomic so that a concurrent reader never sees a partially written entry
+        tmp_path.replace(path)
+
+        # Writers reaching the limit while another thread evicts skip the scan
+        if needs_eviction and self._evict_lock.acquire(blocking=False):
+            try:
+                self.evict()
+            finally:
+                self._evict_lock.release()
+
+    def evict(self) -> int:
+        entries: list[tuple[float, Path]] = sorted(self._modified_entries())
+        expired: list[Path] = [
+            path for modified_at, path in entries if self._is_expired(modified_at)
+        ]
+        alive: list[Path] = [
+            path for modified_at, path in entries if not self._is_expired(modified_at)
+        ]
+        low_water_mark: int | None = (
+            int(self.max_entries * self.low_water_ratio)
+            if self.max_entries is not None
+            else None
+        )
+        overflow: int = (
+            max(0, len(alive) - low_water_mark) if low_water_mark is not None else 0
+        )
+        # Entries are sorted by modification time, so the oldest go first
+        to_remove: list[Path] = expired + alive[:overflow]
+        for path in to_remove:
+            self._remove(path)
+
+        with self._lock:
+            self._entries_count = len(alive) - overflow
+        logging.debug(f"Evicted {len(to_remove)} entries from extraction cache")
+        return len(to_remove)
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.json"):
+            self._remove(path)
+        with self._lock:
+            self._entries_count = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups: int = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _modified_entries(self) -> list[tuple[float, Path]]:
+        entries: list[tuple[float, Path]] = []
+        for path in self.directory.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                # Removed by another extraction thread since the glob
+                continue
+        return entries
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _is_expired(self, modified_at: float) -> bool:
+        if self.ttl_seconds is None:
+            return False
+        return time.time() - modified_at > self.ttl_seconds
+
+    def _record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,130 @@
+import functools
+import json
+import logging
+import re
+from typing import Any, Final, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from web_scrapper.scrappers.audi.extractor_agent.rule_based_extractor import (
+    DISCLAIMER_PATTERN,
+)
+
+# Fields the model has to fill in. The disclaimer is copied from the offer
+# text instead, echoing it back was most of the completion tokens.
+COMPACT_FIELD_HINTS: Final[dict[str, str]] = {
+    "payment": "amount due per payment period",
+    "payment_label": "payment period, e.g. Monthly payment",
+    "term": "number of payments",
+    "down_payment": "initial payment, 0 when no down payment is required",
+    "down_payment_label": "terms of the down payment",
+    "expiration": "offer end date as YYYY-MM-DD",
+    "price": "special price, if any",
+    "apr": "annual percentage rate, e.g. 3.99%",
+    "name": "headline | offer category line",
+    "amount": "bonus or credit amount",
+    "msrp": "manufacturer's suggested retail price",
+}
+JSON_SCHEMA_TYPES: Final[dict[str, str]] = {
+    "number": "number",
+    "integer": "integer",
+    "string": "string",
+    "null": "null",
+}
+NUMBER_CLEANUP_PATTERN: Final[re.Pattern[str]] = re.compile(r"[$,\s]")
+TRIMMED_MARKER: Final[str] = " [...]"
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@functools.cache
+def get_field_types(model: type[BaseModel]) -> dict[str, str]:
+    # Built once per model, every reply is coerced with it
+    properties: dict[str, Any] = model.model_json_schema()["properties"]
+    field_types: dict[str, str] = {}
+    for name, field_schema in properties.items():
+        options: list[dict[str, Any]] = field_schema.get("anyOf", [field_schema])
+        field_types[name] = "|".join(
+            JSON_SCHEMA_TYPES.get(option.get("type", ""), "string") for option in options
+        )
+    return field_types
+
+
+def build_field_schema(
+    model: type[BaseModel], field_hints: dict[str, str] = COMPACT_FIELD_HINTS
+) -> str:
+    field_types: dict[str, str] = get_field_types(model)
+    return "\n".join(
+        f"{name} ({field_types[name]}): {hint}" for name, hint in field_hints.items()
+    )
+
+
+def extract_disclaimer(offer: str) -> str | None:
+    match: re.Match[str] | None = DISCLAIMER_PATTERN.search(offer)
+    return match.group(0) if match else None
+
+
+def trim_disclaimer(offer: str, max_chars: int) -> str:
+    # The start of the disclaimer has the APR example and the eligible models,
+    # the rest is legal boilerplate the extraction does not need
+    match: re.Match[str] | None = DISCLAIMER_PATTERN.search(offer)
+    if match is None or len(match.group(0)) <= max_chars:
+        return offer
+    start, end = match.span()
+    return (
+        offer[:start]
+        + match.group(0)[:max_chars].rstrip()
+        + TRIMMED_MARKER
+        + offer[end:]
+    )
+
+
+def parse_json_reply(content: str) -> Any:
+    # JSON mode replies are plain json, older prompts sometimes wrap it in a
+    # code fence or add a sentence around it
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        pass
+
+    starts: list[int] = [
+        idx for idx in (content.find("{"), content.find("[")) if idx >= 0
+    ]
+    start: int = min(starts, default=-1)
+    end: int = max(content.rfind("}"), content.rfind("]")) + 1
+    if start < 0 or end <= start:
+        raise ValueError("Reply does not contain json")
+    return json.loads(content[start:end])
+
+
+def clean_number(value: Any) -> Any:
+    if isinstance(value, str):
+        cleaned: str = NUMBER_CLEANUP_PATTERN.sub("", value)
+        return cleaned or None
+    return value
+
+
+def coerce_fields(model: type[M], fields: dict[str, Any]) -> M:
+    field_types: dict[str, str] = get_field_types(model)
+    known: dict[str, Any] = {
+        name: (
+            clean_number(value)
+            if field_types[name].startswith(("number", "integer"))
+            else value
+        )
+        for name, value in fields.items()
+        if name in field_types
+    }
+    while True:
+        try:
+            return model.model_validate(known)
+        except ValidationError as error:
+            invalid: set[str] = {
+                str(detail["loc"][0]) for detail in error.errors() if detail["loc"]
+            }
+            if not invalid & known.keys():
+                raise
+            # One bad value should not lose the rest of the extraction
+            logging.warning(f"Dropping invalid extracted fields: {sorted(invalid)}")
+            for name in invalid:
+                known.pop(name, None)
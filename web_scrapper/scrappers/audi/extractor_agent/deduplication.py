@@ -0,0 +1,303 @@
+import hashlib
+import logging
+import re
+import threading
+from concurrent.futures import Future
+from typing import Callable, Final
+
+from pydantic import BaseModel
+
+from web_scrapper.scrappers.audi.extractor_agent.compact_prompt import (
+    extract_disclaimer,
+)
+from web_scrapper.scrappers.audi.extractor_agent.rule_based_extractor import (
+    DISCLAIMER_PATTERN,
+)
+from web_scrapper.scrappers.audi.models_library import OfferSettings
+
+SIMHASH_BITS: Final[int] = 64
+SIMHASH_BANDS: Final[int] = 4
+SHINGLE_SIZE: Final[int] = 3
+# Offers this many bits apart are treated as the same manufacturer offer, a
+# distance below the number of bands always shares at least one band
+NEAR_DUPLICATE_MAX_DISTANCE: Final[int] = 3
+WORD_PATTERN: Final[re.Pattern[str]] = re.compile(r"\w+")
+NUMBER_PATTERN: Final[re.Pattern[str]] = re.compile(r"\d+(?:[.,]\d+)*")
+# Private use characters, never part of a scraped offer
+PLACEHOLDER: Final[str] = "\ue000{}\ue001"
+
+
+class OfferTemplate(BaseModel):
+    template: str
+    # Amounts, rates and dates, offers that differ in any of them need their
+    # own extraction
+    numbers: tuple[str, ...]
+    # Everything but the disclaimer. The name and labels are copied from the
+    # extraction a near duplicate reuses, so only the disclaimer may differ.
+    description: str
+    simhash: int
+
+
+class DeduplicationStats(BaseModel):
+    offers: int = 0
+    extracted: int = 0
+    exact_duplicates: int = 0
+    # The same text once the model names are masked, e.g. an A4 and an A5 offer
+    template_duplicates: int = 0
+    near_duplicates: int = 0
+
+    @property
+    def saved_extractions(self) -> float:
+        return 1 - self.extracted / self.offers if self.offers else 0.0
+
+
+def model_tokens(audience_model: str, model: str | None, year: int | None) -> list[str]:
+    # Phrases naming the vehicle, the same slots for every model so a token
+    # of one offer maps to the token of another. Bare years are left alone,
+    # they are also part of the offer dates.
+    return [
+        audience_model,
+        f"{year} Audi {model}" if year and model else "",
+        f"{year} {model}" if year and model else "",
+        f"Audi {model}" if model else "",
+        model or "",
+    ]
+
+
+def get_token_pattern(token: str) -> re.Pattern[str]:
+    return re.compile(rf"(?<!\w){re.escape(token)}(?!\w)")
+
+
+def templatize(text: str, tokens: list[str]) -> str:
+    # Longest phrases first so "2024 Audi Q5" is not split by "Q5"
+    for slot in sorted(range(len(tokens)), key=lambda slot: -len(tokens[slot])):
+        if tokens[slot]:
+            text = get_token_pattern(tokens[slot]).sub(PLACEHOLDER.format(slot), text)
+    return text
+
+
+def fill_template(template: str, tokens: list[str]) -> str:
+    for slot, token in enumerate(tokens):
+        template = template.replace(PLACEHOLDER.format(slot), token)
+    return template
+
+
+def substitute_tokens(
+    text: str, source_tokens: list[str], target_tokens: list[str]
+) -> str:
+    return fill_template(templatize(text, source_tokens), target_tokens)
+
+
+def simhash(text: str, shingle_size: int = SHINGLE_SIZE) -> int:
+    words: list[str] = WORD_PATTERN.findall(text.lower())
+    weights: list[int] = [0] * SIMHASH_BITS
+    for start in range(max(1, len(words) - shingle_size + 1)):
+        end: int = start + shingle_size
+        shingle: str = " ".join(words[start:end])
+        digest: int = int.from_bytes(
+            hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if digest >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def get_bands(fingerprint: int) -> list[tuple[int, int]]:
+    band_bits: int = SIMHASH_BITS // SIMHASH_BANDS
+    mask: int = (1 << band_bits) - 1
+    return [
+        (band, fingerprint >> (band * band_bits) & mask) for band in range(SIMHASH_BANDS)
+    ]
+
+
+def build_template(text: str, tokens: list[str]) -> OfferTemplate:
+    template: str = templatize(text, tokens)
+    return OfferTemplate(
+        template=template,
+        numbers=tuple(NUMBER_PATTERN.findall(template)),
+        description=DISCLAIMER_PATTERN.sub("", template),
+        simhash=simhash(template),
+    )
+
+
+def reapply_fields(
+    offer_settings: OfferSettings,
+    offer: str,
+    source_tokens: list[str],
+    target_tokens: list[str],
+) -> OfferSettings:
+    fields: dict[str, object] = {
+        name: (
+            substitute_tokens(value, source_tokens, target_tokens)
+            if isinstance(value, str)
+            else value
+        )
+        for name, value in offer_settings.model_dump().items()
+    }
+    fields["full_offer"] = offer
+    if offer_settings.disclaimer is not None:
+        fields["disclaimer"] = extract_disclaimer(offer) or fields["disclaimer"]
+    # Deferred extractions stay deferred on every page that reuses them
+    return OfferSettings.model_validate(fields)
+
+
+class DuplicateGroup:
+    offer: str
+    offer_type: str
+    template: OfferTemplate
+    tokens: list[str]
+    result: Future[OfferSettings]
+
+    def __init__(
+        self, offer: str, offer_type: str, template: OfferTemplate, tokens: list[str]
+    ) -> None:
+        self.offer = offer
+        self.offer_type = offer_type
+        self.template = template
+        self.tokens = tokens
+        self.result = Future()
+
+
+class OfferDeduplicator:
+    max_distance: int
+    stats: DeduplicationStats
+
+    def __init__(self, max_distance: int = NEAR_DUPLICATE_MAX_DISTANCE) -> None:
+        self.max_distance = max_distance
+        self.stats = DeduplicationStats()
+        self._lock: threading.Lock = threading.Lock()
+        self._texts: dict[tuple[str, str], DuplicateGroup] = {}
+        self._groups: dict[tuple[str, str], DuplicateGroup] = {}
+        self._bands: dict[tuple[int, int], list[DuplicateGroup]] = {}
+
+    def extract(
+        self,
+        offers: list[tuple[str, str]],
+        tokens: list[str],
+        extract_offers: Callable[[list[tuple[str, str]]], list[OfferSettings]],
+    ) -> list[OfferSettings]:
+        # Offers of a group already seen in this run reuse its extraction,
+        # the rest are extracted together and start new groups
+        groups, own = self._assign_groups(offers, tokens)
+        if own:
+            self._extract_groups(
+                [offers[idx] for idx in own],
+                [groups[idx] for idx in own],
+                extract_offers,
+            )
+
+        owned: set[int] = set(own)
+        # Owned groups are resolved above, waiting on groups of other threads
+        # cannot deadlock
+        offers_settings: list[OfferSettings] = []
+        for idx, group in enumerate(groups):
+            if idx in owned:
+                offers_settings.append(group.result.result())
+                continue
+            try:
+                offer_settings: OfferSettings = group.result.result()
+            except Exception:
+                # The extraction of the group failed in another thread
+                offers_settings.extend(extract_offers([offers[idx]]))
+                continue
+            offer: str = offers[idx][0]
+            # The same text on another model page names the models the same
+            # way, only templated matches get the model tokens swapped
+            offers_settings.append(
+                reapply_fields(
+                    offer_settings,
+                    offer,
+                    group.tokens,
+                    group.tokens if offer == group.offer else tokens,
+                )
+            )
+        return offers_settings
+
+    def log_stats(self) -> None:
+        logging.info(
+            f"Deduplication: {self.stats.offers} offers, "
+            f"{self.stats.extracted} extracted, "
+            f"{self.stats.exact_duplicates} exact, "
+            f"{self.stats.template_duplicates} same template and "
+            f"{self.stats.near_duplicates} near duplicates reused "
+            f"({self.stats.saved_extractions:.0%} fewer extraction calls)"
+        )
+
+    def _assign_groups(
+        self, offers: list[tuple[str, str]], tokens: list[str]
+    ) -> tuple[list[DuplicateGroup], list[int]]:
+        templates: list[OfferTemplate] = [
+            build_template(offer, tokens) for offer, _ in offers
+        ]
+        groups: list[DuplicateGroup] = []
+        own: list[int] = []
+        with self._lock:
+            for idx, ((offer, offer_type), template) in enumerate(
+                zip(offers, templates)
+            ):
+                group: DuplicateGroup | None = self._find_group(
+                    offer, offer_type, template
+                )
+                if group is None:
+                    group = DuplicateGroup(offer, offer_type, template, tokens)
+                    self._add_group(group)
+                    own.append(idx)
+                groups.append(group)
+            self.stats.offers += len(offers)
+            self.stats.extracted += len(own)
+        return groups, own
+
+    def _extract_groups(
+        self,
+        offers: list[tuple[str, str]],
+        groups: list[DuplicateGroup],
+        extract_offers: Callable[[list[tuple[str, str]]], list[OfferSettings]],
+    ) -> None:
+        try:
+            extracted_offers: list[OfferSettings] = extract_offers(offers)
+        except Exception as error:
+            with self._lock:
+                for group in groups:
+                    self._remove_group(group)
+                    group.result.set_exception(error)
+            raise
+        for group, extracted_offer in zip(groups, extracted_offers):
+            group.result.set_result(extracted_offer)
+
+    def _find_group(
+        self, offer: str, offer_type: str, template: OfferTemplate
+    ) -> DuplicateGroup | None:
+        group: DuplicateGroup | None = self._texts.get((offer_type, offer))
+        if group is not None:
+            self.stats.exact_duplicates += 1
+            return group
+
+        group = self._groups.get((offer_type, template.template))
+        if group is not None:
+            self.stats.template_duplicates += 1
+            return group
+
+        for band in get_bands(template.simhash):
+            for candidate in self._bands.get(band, []):
+                if (
+                    candidate.offer_type == offer_type
+                    and candidate.template.numbers == template.numbers
+                    and candidate.template.description == template.description
+                    and (candidate.template.simhash ^ template.simhash).bit_count()
+                    <= self.max_distance
+                ):
+                    self.stats.near_duplicates += 1
+                    return candidate
+        return None
+
+    def _add_group(self, group: DuplicateGroup) -> None:
+        self._texts[(group.offer_type, group.offer)] = group
+        self._groups[(group.offer_type, group.template.template)] = group
+        for band in get_bands(group.template.simhash):
+            self._bands.setdefault(band, []).append(group)
+
+    def _remove_group(self, group: DuplicateGroup) -> None:
+        self._texts.pop((group.offer_type, group.offer), None)
+        self._groups.pop((group.offer_type, group.template.template), None)
+        for band in get_bands(group.template.simhash):
+            self._bands[band].remove(group)
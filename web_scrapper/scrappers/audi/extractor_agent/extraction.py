@@ -0,0 +1,155 @@
+import logging
+import threading
+from typing import TYPE_CHECKING, Callable
+
+from pydantic import BaseModel
+
+from web_scrapper.instrumentation import instrumentation
+from web_scrapper.scrappers.audi.extractor_agent.rule_based_extractor import (
+    RuleBasedExtractor,
+)
+from web_scrapper.scrappers.audi.models_library import OfferSettings
+from web_scrapper.settings import (
+    LLM_BATCH_EXTRACTION,
+    RULE_BASED_EXTRACTION,
+    RULE_BASED_MIN_CONFIDENCE,
+)
+
+if TYPE_CHECKING:
+    from web_scrapper.scrappers.audi.extractor_agent.offer_extractor_agent import (
+        OfferExtractor,
+    )
+
+# Turns (offer text, offer type) pairs into extracted offer settings
+ExtractOffers = Callable[[list[tuple[str, str]]], list[OfferSettings]]
+
+
+class OfferExtractionInput(BaseModel):
+    offer_type: str
+    offer: str
+
+
+rule_based_extractor: RuleBasedExtractor | None = (
+    RuleBasedExtractor(min_confidence=RULE_BASED_MIN_CONFIDENCE)
+    if RULE_BASED_EXTRACTION
+    else None
+)
+
+
+_extractor: "OfferExtractor | None" = None
+_extractor_lock: threading.Lock = threading.Lock()
+
+
+def get_extractor() -> "OfferExtractor":
+    # langchain and the OpenAI client take most of the startup time, they are
+    # only loaded once an offer actually has to go to the LLM
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            from web_scrapper.scrappers.audi.extractor_agent.offer_extractor_agent import (  # noqa: E501
+                build_extractor,
+            )
+
+            _extractor = build_extractor()
+        return _extractor
+
+
+def extractor_loaded() -> bool:
+    return _extractor is not None
+
+
+def log_extraction_usage(
+    offer_extractor: "OfferExtractor | None", fast_path: RuleBasedExtractor | None
+) -> None:
+    if offer_extractor is not None:
+        logging.info(
+            f"OPENAI cumulative cost of extraction so far: ${offer_extractor.total_cumulative_cost_of_usage} USD",  # noqa: E501
+        )
+        if offer_extractor.cache is not None:
+            logging.info(
+                f"Extraction cache hits: {offer_extractor.cache.hits}, "
+                f"misses: {offer_extractor.cache.misses}"
+            )
+        if offer_extractor.latency_budget is not None:
+            offer_extractor.latency_budget.log_stats()
+    if fast_path is not None:
+        logging.info(
+            f"Offers extracted without LLM: {fast_path.skipped_llm}, "
+            f"sent to LLM: {fast_path.sent_to_llm}"
+        )
+
+
+def build_extraction_input(offer: str, offer_type: str) -> OfferExtractionInput:
+    return OfferExtractionInput(offer=offer, offer_type=offer_type.split("_")[0])
+
+
+def keep_offer_texts(offers: list[tuple[str, str]]) -> list[OfferSettings]:
+    # Scrape only runs keep the raw text so it can be extracted later
+    return [OfferSettings(full_offer=offer) for offer, _ in offers]
+
+
+def extract_offer_info(
+    offer: str,
+    offer_type: str,
+    offer_extractor: "OfferExtractor | None" = None,
+    fast_path: RuleBasedExtractor | None = rule_based_extractor,
+) -> OfferSettings:
+    return extract_offers_info([(offer, offer_type)], offer_extractor, fast_path)[0]
+
+
+def extract_offers_info(
+    offers: list[tuple[str, str]],
+    offer_extractor: "OfferExtractor | None" = None,
+    fast_path: RuleBasedExtractor | None = rule_based_extractor,
+    batched: bool = LLM_BATCH_EXTRACTION,
+) -> list[OfferSettings]:
+    with instrumentation.span("extraction", offers=len(offers)):
+        offers_settings: list[OfferSettings] = extract_pending_offers(
+            offers, offer_extractor, fast_path, batched
+        )
+
+    if offer_extractor is None and extractor_loaded():
+        offer_extractor = get_extractor()
+    log_extraction_usage(offer_extractor, fast_path)
+
+    return offers_settings
+
+
+def extract_pending_offers(
+    offers: list[tuple[str, str]],
+    offer_extractor: "OfferExtractor | None",
+    fast_path: RuleBasedExtractor | None,
+    batched: bool,
+) -> list[OfferSettings]:
+    offer_inputs: list[OfferExtractionInput] = [
+        build_extraction_input(offer, offer_type) for offer, offer_type in offers
+    ]
+
+    offers_settings: list[OfferSettings | None] = [
+        (
+            fast_path.try_extract(offer_input.offer, offer_input.offer_type)
+            if fast_path is not None
+            else None
+        )
+        for offer_input in offer_inputs
+    ]
+    pending: list[int] = [
+        idx
+        for idx, offer_settings in enumerate(offers_settings)
+        if offer_settings is None
+    ]
+
+    if pending:
+        llm_extractor: OfferExtractor = offer_extractor or get_extractor()
+        pending_inputs: list[OfferExtractionInput] = [
+            offer_inputs[idx] for idx in pending
+        ]
+        extracted_offers: list[OfferSettings] = (
+            llm_extractor.extract_batch(pending_inputs)
+            if batched
+            else llm_extractor.extract_many(pending_inputs)
+        )
+        for idx, extracted_offer in zip(pending, extracted_offers):
+            offers_settings[idx] = extracted_offer
+
+    return offers_settings  # type: ignore
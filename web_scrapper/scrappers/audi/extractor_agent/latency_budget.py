@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Awaitable, Callable, TypeVar
+
+from pydantic import BaseModel
+
+from web_scrapper.instrumentation import Span, percentile
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class LatencyBudgetStats(BaseModel):
+    offers: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    deadline_exceeded: int = 0
+    cost: float = 0.0
+    hedge_cost: float = 0.0
+
+    @property
+    def hedge_overhead(self) -> float:
+        # Extra spend on top of what the same offers cost without hedging
+        primary_cost: float = self.cost - self.hedge_cost
+        return self.hedge_cost / primary_cost if primary_cost else 0.0
+
+
+class LatencyBudget:
+    hedge: bool
+    hedge_percentile: float
+    min_samples: int
+    initial_hedge_delay_seconds: float
+    deadline_seconds: float
+    stats: LatencyBudgetStats
+
+    def __init__(
+        self,
+        hedge: bool = True,
+        hedge_percentile: float = 95.0,
+        min_samples: int = 20,
+        initial_hedge_delay_seconds: float = 10.0,
+        deadline_seconds: float = 60.0,
+        window: int = 200,
+    ) -> None:
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.initial_hedge_delay_seconds = initial_hedge_delay_seconds
+        self.deadline_seconds = deadline_seconds
+        self.stats = LatencyBudgetStats()
+        # Updated on the extractor's event loop, read by the crawl threads
+        self._lock: threading.Lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=window)
+
+    def hedge_delay(self) -> float:
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.initial_hedge_delay_seconds
+            return percentile(list(self._latencies), self.hedge_percentile)
+
+    def record_latency(self, seconds: float) -> None:
+        # Only the model call, a hedge delay learned from rate limiter waits
+        # would fire late whenever the limiter is busy
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def record_cost(self, cost: float, hedge: bool) -> None:
+        with self._lock:
+            self.stats.cost += cost
+            if hedge:
+                self.stats.hedge_cost += cost
+
+    async def run(
+        self,
+        primary: Callable[[], Awaitable[T]],
+        hedge: Callable[[], Awaitable[T]] | None = None,
+        span: Span | None = None,
+    ) -> T:
+        # A call still running after the hedge delay is duplicated and the
+        # first valid result wins, every call is cancelled at the deadline
+        with self._lock:
+            self.stats.offers += 1
+        if not self.hedge:
+            hedge = None
+        tasks: list[asyncio.Task[T]] = [asyncio.ensure_future(primary())]
+        try:
+            return await asyncio.wait_for(
+                self._first_valid(tasks, hedge, span), self.deadline_seconds
+            )
+        except TimeoutError as error:
+            with self._lock:
+                self.stats.deadline_exceeded += 1
+            if span is not None:
+                span.update(deadline_exceeded=1)
+            raise DeadlineExceeded(
+                f"No valid reply within {self.deadline_seconds:.1f}s"
+            ) from error
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Losing calls are collected so their errors are not reported later
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def log_stats(self) -> None:
+        logging.info(
+            f"Latency budget: {self.stats.offers} offers, "
+            f"{self.stats.hedged} hedged ({self.stats.hedge_wins} won by the hedge), "
+            f"{self.stats.deadline_exceeded} over the deadline, "
+            f"hedging cost ${self.stats.hedge_cost} USD "
+            f"(+{self.stats.hedge_overhead:.1%})"
+        )
+
+    async def _first_valid(
+        self,
+        tasks: list[asyncio.Task[T]],
+        hedge: Callable[[], Awaitable[T]] | None,
+        span: Span | None,
+    ) -> T:
+        hedge_delay: float | None = self.hedge_delay() if hedge is not None else None
+        pending: set[asyncio.Task[T]] = set(tasks)
+        first_error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                error: BaseException | None = task.exception()
+                if error is None:
+                    if task is not tasks[0]:
+                        self._record_hedge_win(span)
+                    return task.result()
+                first_error = first_error or error
+
+            # The primary is slower than the hedge delay or its reply was invalid
+            if hedge is not None and len(tasks) == 1:
+                tasks.append(asyncio.ensure_future(hedge()))
+                pending.add(tasks[-1])
+                hedge_delay = None
+                with self._lock:
+                    self.stats.hedged += 1
+                if span is not None:
+                    span.update(hedged=1)
+
+        assert first_error is not None
+        raise first_error
+
+    def _record_hedge_win(self, span: Span | None) -> None:
+        with self._lock:
+            self.stats.hedge_wins += 1
+        if span is not None:
+            span.update(hedge_won=1)
@@ -1,31 +1,97 @@
+import asyncio
 import json
 import logging
+import threading
+import time
+from functools import partial
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Coroutine, TypeVar
 
 from langchain.prompts.chat import ChatPromptTemplate, HumanMessagePromptTemplate
 from langchain.schema import BaseMessage, SystemMessage
-from langchain_community.callbacks import get_openai_callback
+from langchain_community.callbacks import OpenAICallbackHandler, get_openai_callback
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel
 
+from web_scrapper.instrumentation import Span, instrumentation
+from web_scrapper.scrappers.audi.extractor_agent.cache import (
+    ExtractionCache,
+    make_cache_key,
+)
+from web_scrapper.scrappers.audi.extractor_agent.compact_prompt import (
+    COMPACT_FIELD_HINTS,
+    build_field_schema,
+    coerce_fields,
+    extract_disclaimer,
+    parse_json_reply,
+    trim_disclaimer,
+)
+from web_scrapper.scrappers.audi.extractor_agent.extraction import (
+    OfferExtractionInput,
+)
+from web_scrapper.scrappers.audi.extractor_agent.latency_budget import (
+    DeadlineExceeded,
+    LatencyBudget,
+)
 from web_scrapper.scrappers.audi.extractor_agent.prompts import (
+    batch_human_message_prompt_template_string,
+    batch_offer_template_string,
+    compact_batch_human_message_prompt_template_string,
+    compact_batch_offer_template_string,
+    compact_human_message_prompt_template_string,
+    compact_system_message_string,
     human_message_prompt_template_string,
     system_message_string,
 )
-from web_scrapper.scrappers.audi.models_library import OfferSettings
-from web_scrapper.settings import LLM_MODEL_NAME
+from web_scrapper.scrappers.audi.extractor_agent.rate_limiter import (
+    AsyncRateLimiter,
+    count_tokens,
+    estimate_tokens,
+    retry_with_backoff,
+)
+from web_scrapper.scrappers.audi.models_library import Offer, OfferSettings
+from web_scrapper.settings import (
+    EXTRACTION_CACHE_DIR,
+    EXTRACTION_CACHE_MAX_ENTRIES,
+    EXTRACTION_CACHE_TTL_SECONDS,
+    LLM_BATCH_TOKEN_BUDGET,
+    LLM_COMPACT_PROMPT,
+    LLM_DEADLINE_SECONDS,
+    LLM_DISCLAIMER_MAX_CHARS,
+    LLM_HEDGE_INITIAL_DELAY_SECONDS,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_HEDGE_MODEL_NAME,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_REQUESTS,
+    LLM_LATENCY_BUDGET,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_MODEL_NAME,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE,
+    OUTPUT_FILE,
+)
 
+# Upper bound used to reserve completion tokens in the rate limiter
+EXPECTED_COMPLETION_TOKENS: int = 400
 
-class OfferExtractionInput(BaseModel):
-    offer_type: str
-    offer: str
+T = TypeVar("T")
 
 
 class OfferExtractor:
     llm: ChatOpenAI
+    hedge_llm: ChatOpenAI
     system_message_prompt: SystemMessage
     human_message_prompt_template: HumanMessagePromptTemplate
     total_cumulative_cost_of_usage: float
     temperature: float
+    model_name: str
+    hedge_model_name: str
+    cache: ExtractionCache | None
+    compact: bool
+    disclaimer_max_chars: int
+    latency_budget: LatencyBudget | None
+    rate_limiter: AsyncRateLimiter
 
     def __init__(
         self,
@@ -33,57 +99,602 @@ class OfferExtractor:
         system_message_prompt: str,
         human_message_prompt_template: str,
         temperature: float = 0.0,
+        cache: ExtractionCache | None = None,
+        batch_human_message_prompt_template: str = (
+            batch_human_message_prompt_template_string
+        ),
+        batch_offer_template: str = batch_offer_template_string,
+        compact: bool = False,
+        disclaimer_max_chars: int = LLM_DISCLAIMER_MAX_CHARS,
+        latency_budget: LatencyBudget | None = None,
+        hedge_model_name: str | None = None,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        requests_per_minute: int | None = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int | None = LLM_TOKENS_PER_MINUTE,
     ) -> None:
+        self.model_name = model_name
+        self.hedge_model_name = hedge_model_name or model_name
+        self.latency_budget = latency_budget
+        self.temperature = temperature
+        self.cache = cache
+        self.compact = compact
+        self.disclaimer_max_chars = disclaimer_max_chars
         self.system_message_prompt = SystemMessage(content=system_message_prompt)
+        self.human_message_template: str = human_message_prompt_template
         self.human_message_prompt_template = HumanMessagePromptTemplate.from_template(
             human_message_prompt_template
         )
-        self.llm = ChatOpenAI(model_name=model_name, temperature=temperature)
+        self.batch_offer_template: str = batch_offer_template
+        self.llm = ChatOpenAI(
+            model_name=model_name, temperature=temperature, **self._llm_options()
+        )
+        self.hedge_llm = ChatOpenAI(
+            model=self.hedge_model_name,
+            temperature=temperature,
+            **self._llm_options(),
+        )
         self.chat_prompt = ChatPromptTemplate.from_messages(
             [self.system_message_prompt, self.human_message_prompt_template]
         )
+        self.batch_chat_prompt = ChatPromptTemplate.from_messages(
+            [
+                self.system_message_prompt,
+                HumanMessagePromptTemplate.from_template(
+                    batch_human_message_prompt_template
+                ),
+            ]
+        )
         self.total_cumulative_cost_of_usage = 0.0
+        self._cost_lock: threading.Lock = threading.Lock()
+        # Limits are per API key, so every extraction thread shares them. They
+        # are only used from the extractor's event loop, which keeps their
+        # asyncio locks valid across threads.
+        self.rate_limiter = AsyncRateLimiter(
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+        )
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(max_concurrency)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_lock: threading.Lock = threading.Lock()
+
+    def use_llm_client(self, **client_options: Any) -> None:
+        # e.g. base_url, api_key or http clients, to point extraction at
+        # another OpenAI-compatible endpoint
+        self.llm = ChatOpenAI(
+            model=self.model_name,
+            temperature=self.temperature,
+            **self._llm_options(),
+            **client_options,
+        )
+        self.hedge_llm = ChatOpenAI(
+            model=self.hedge_model_name,
+            temperature=self.temperature,
+            **self._llm_options(),
+            **client_options,
+        )
+
+    def _llm_options(self) -> dict[str, Any]:
+        if not self.compact:
+            return {}
+        # JSON mode guarantees the reply parses, it needs "json" in the prompt
+        return {"model_kwargs": {"response_format": {"type": "json_object"}}}
+
+    def prepare_offer(self, offer: str) -> str:
+        if not self.compact:
+            return offer
+        return trim_disclaimer(offer, self.disclaimer_max_chars)
+
+    def cache_key(self, offer_input: OfferExtractionInput) -> str:
+        return make_cache_key(
+            offer_input.offer,
+            offer_input.offer_type,
+            str(self.system_message_prompt.content),
+            self.human_message_template,
+            self.model_name,
+        )
 
     def extract(self, offer_input: OfferExtractionInput) -> OfferSettings:
-        with get_openai_callback() as cb:
-            output: BaseMessage = self.llm.invoke(
-                self.chat_prompt.format_prompt(
-                    offer_type=offer_input.offer_type, offer=offer_input.offer
-                ).to_messages()
+        if self.latency_budget is not None:
+            # Hedging and the deadline need a call that can be cancelled
+            return self.run_async(self.aextract(offer_input))
+
+        cache_key, cached_offer = self._lookup_cache(offer_input)
+        if cached_offer is not None:
+            return cached_offer
+
+        return self._store(cache_key, self._extract_with_llm(offer_input))
+
+    def extract_batch(
+        self,
+        offer_inputs: list[OfferExtractionInput],
+        token_budget: int = LLM_BATCH_TOKEN_BUDGET,
+    ) -> list[OfferSettings]:
+        results: list[OfferSettings | None] = [None] * len(offer_inputs)
+        pending: list[tuple[int, str | None, OfferExtractionInput]] = []
+        for idx, offer_input in enumerate(offer_inputs):
+            cache_key, cached_offer = self._lookup_cache(offer_input)
+            if cached_offer is not None:
+                results[idx] = cached_offer
+            else:
+                pending.append((idx, cache_key, offer_input))
+
+        for batch in pack_batches(pending, token_budget):
+            batch_inputs: list[OfferExtractionInput] = [
+                offer_input for _, _, offer_input in batch
+            ]
+            extracted_offers: list[OfferSettings] = (
+                # Hedging and the deadline need calls that can be cancelled
+                self.run_async(self.aextract_batch(batch_inputs))
+                if self.latency_budget is not None
+                else self._extract_batch_with_split(batch_inputs)
+            )
+            for (idx, cache_key, _), extracted_offer in zip(batch, extracted_offers):
+                results[idx] = self._store(cache_key, extracted_offer)
+
+        return results  # type: ignore
+
+    def _extract_with_llm(self, offer_input: OfferExtractionInput) -> OfferSettings:
+        with get_openai_callback() as cb, instrumentation.span("llm_call") as span:
+            output: BaseMessage = self.llm.invoke(self.format_messages(offer_input))
+            record_llm_usage(span, cb)
+            self.update_cumulative_cost(cb.total_cost)
+
+        logging.debug(f"Cost for extraction of current offer: ${cb.total_cost} USD")
+        return self.parse_output(output, offer_input)
+
+    def _extract_batch_with_split(
+        self, offer_inputs: list[OfferExtractionInput]
+    ) -> list[OfferSettings]:
+        if len(offer_inputs) == 1:
+            return [self._extract_with_llm(offer_inputs[0])]
+
+        try:
+            return self._extract_batch_with_llm(offer_inputs)
+        except ValueError as error:
+            logging.warning(
+                f"Malformed response for a batch of {len(offer_inputs)} offers "
+                f"({error.__class__.__name__}), splitting the batch"
             )
 
+        middle: int = len(offer_inputs) // 2
+        return self._extract_batch_with_split(
+            offer_inputs[:middle]
+        ) + self._extract_batch_with_split(offer_inputs[middle:])
+
+    def _extract_batch_with_llm(
+        self, offer_inputs: list[OfferExtractionInput]
+    ) -> list[OfferSettings]:
+        with get_openai_callback() as cb, instrumentation.span(
+            "llm_call", offers=len(offer_inputs)
+        ) as span:
+            output: BaseMessage = self.llm.invoke(
+                self.format_batch_messages(offer_inputs)
+            )
+            record_llm_usage(span, cb)
             self.update_cumulative_cost(cb.total_cost)
 
-            logging.debug(f"Cost for extraction of current offer: ${cb.total_cost} USD")
+        logging.debug(
+            f"Cost for extraction of a batch of {len(offer_inputs)} offers: "
+            f"${cb.total_cost} USD"
+        )
+        return self.parse_batch_output(output, offer_inputs)
+
+    def run_async(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        # Every thread submits to one long-lived loop. The async OpenAI client
+        # pools connections on the loop that opened them, a loop per call
+        # left it reusing connections of closed loops.
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="llm-event-loop", daemon=True
+                ).start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    async def aextract(
+        self,
+        offer_input: OfferExtractionInput,
+        max_attempts: int = LLM_MAX_RETRIES,
+    ) -> OfferSettings:
+        cache_key, cached_offer = self._lookup_cache(offer_input)
+        if cached_offer is not None:
+            return cached_offer
+
+        messages: list[BaseMessage] = self.format_messages(offer_input)
+        costs: dict[str, float] = {"cost": 0.0, "hedge_cost": 0.0}
+
+        async def invoke(llm: ChatOpenAI, hedge: bool) -> OfferSettings:
+            output: BaseMessage = await self._ainvoke(
+                llm, hedge, messages, costs, max_attempts
+            )
+            # Parsed inside the call so an invalid reply does not win the race
+            return self.parse_output(output, offer_input)
+
+        with instrumentation.span("llm_offer") as span:
+            try:
+                extracted_offer: OfferSettings = await self._extract_within_budget(
+                    invoke, span, lambda: defer_offer(offer_input)
+                )
+            finally:
+                span.update(**costs)
+
+        logging.debug(f"Cost for extraction of current offer: ${costs['cost']} USD")
+        return self._store(cache_key, extracted_offer)
+
+    async def aextract_batch(
+        self,
+        offer_inputs: list[OfferExtractionInput],
+        max_attempts: int = LLM_MAX_RETRIES,
+    ) -> list[OfferSettings]:
+        if len(offer_inputs) == 1:
+            return [await self.aextract(offer_inputs[0], max_attempts)]
+
+        try:
+            return await self._aextract_batch_with_llm(offer_inputs, max_attempts)
+        except ValueError as error:
+            logging.warning(
+                f"Malformed response for a batch of {len(offer_inputs)} offers "
+                f"({error.__class__.__name__}), splitting the batch"
+            )
+
+        middle: int = len(offer_inputs) // 2
+        return await self.aextract_batch(
+            offer_inputs[:middle], max_attempts
+        ) + await self.aextract_batch(offer_inputs[middle:], max_attempts)
+
+    async def _aextract_batch_with_llm(
+        self, offer_inputs: list[OfferExtractionInput], max_attempts: int
+    ) -> list[OfferSettings]:
+        messages: list[BaseMessage] = self.format_batch_messages(offer_inputs)
+        costs: dict[str, float] = {"cost": 0.0, "hedge_cost": 0.0}
+
+        async def invoke(llm: ChatOpenAI, hedge: bool) -> list[OfferSettings]:
+            output: BaseMessage = await self._ainvoke(
+                llm,
+                hedge,
+                messages,
+                costs,
+                max_attempts,
+                completion_tokens=EXPECTED_COMPLETION_TOKENS * len(offer_inputs),
+                offers=len(offer_inputs),
+            )
+            return self.parse_batch_output(output, offer_inputs)
+
+        with instrumentation.span("llm_offer", offers=len(offer_inputs)) as span:
+            try:
+                extracted_offers: list[OfferSettings] = (
+                    await self._extract_within_budget(
+                        invoke,
+                        span,
+                        lambda: [defer_offer(item) for item in offer_inputs],
+                    )
+                )
+            finally:
+                span.update(**costs)
+
+        logging.debug(
+            f"Cost for extraction of a batch of {len(offer_inputs)} offers: "
+            f"${costs['cost']} USD"
+        )
+        return extracted_offers
+
+    async def _ainvoke(
+        self,
+        llm: ChatOpenAI,
+        hedge: bool,
+        messages: list[BaseMessage],
+        costs: dict[str, float],
+        max_attempts: int,
+        completion_tokens: int = EXPECTED_COMPLETION_TOKENS,
+        **span_attributes: Any,
+    ) -> BaseMessage:
+        request_tokens: int = completion_tokens + sum(
+            estimate_tokens(str(message.content)) for message in messages
+        )
+
+        async def attempt() -> BaseMessage:
+            await self.rate_limiter.acquire(request_tokens)
+            # Timed per attempt so rate limit waits and backoff are not
+            # counted. The callback lives in a context variable, so each
+            # attempt, primary or hedge, gets its own.
+            with get_openai_callback() as cb, instrumentation.span(
+                "llm_call", hedge=int(hedge), **span_attributes
+            ) as span:
+                start_time: float = time.perf_counter()
+                output: BaseMessage = await llm.ainvoke(messages)
+                if self.latency_budget is not None:
+                    self.latency_budget.record_latency(time.perf_counter() - start_time)
+                record_llm_usage(span, cb)
+            self._record_attempt_cost(costs, cb.total_cost, hedge)
+            return output
+
+        return await retry_with_backoff(attempt, max_attempts)
+
+    def _record_attempt_cost(
+        self, costs: dict[str, float], cost: float, hedge: bool
+    ) -> None:
+        self.update_cumulative_cost(cost)
+        costs["cost"] += cost
+        if hedge:
+            costs["hedge_cost"] += cost
+        if self.latency_budget is not None:
+            self.latency_budget.record_cost(cost, hedge)
+
+    async def _extract_within_budget(
+        self,
+        invoke: Callable[[ChatOpenAI, bool], Awaitable[T]],
+        span: Span,
+        deferred: Callable[[], T],
+    ) -> T:
+        if self.latency_budget is None:
+            return await invoke(self.llm, False)
+
+        try:
+            return await self.latency_budget.run(
+                partial(invoke, self.llm, False),
+                partial(invoke, self.hedge_llm, True),
+                span,
+            )
+        except DeadlineExceeded as error:
+            logging.warning(f"Offer extraction cancelled: {error}")
+            return deferred()
+
+    async def aextract_many(
+        self, offer_inputs: list[OfferExtractionInput]
+    ) -> list[OfferSettings]:
+        # The concurrency cap is shared too, pages extracted at the same time
+        # do not multiply the requests in flight
+        async def extract_one(offer_input: OfferExtractionInput) -> OfferSettings:
+            async with self._semaphore:
+                return await self.aextract(offer_input)
 
-            extracted_offer: OfferSettings = OfferSettings(
-                **json.loads(output.content)  # type: ignore
+        # gather keeps results in the same order as the inputs
+        return await asyncio.gather(*(extract_one(item) for item in offer_inputs))
+
+    def extract_many(
+        self, offer_inputs: list[OfferExtractionInput]
+    ) -> list[OfferSettings]:
+        return self.run_async(self.aextract_many(offer_inputs))
+
+    def format_messages(self, offer_input: OfferExtractionInput) -> list[BaseMessage]:
+        return self.chat_prompt.format_prompt(
+            offer_type=offer_input.offer_type,
+            offer=self.prepare_offer(offer_input.offer),
+        ).to_messages()
+
+    def format_batch_messages(
+        self, offer_inputs: list[OfferExtractionInput]
+    ) -> list[BaseMessage]:
+        offers: str = "".join(
+            self.batch_offer_template.format(
+                number=number,
+                offer_type=offer_input.offer_type,
+                offer=self.prepare_offer(offer_input.offer),
+            )
+            for number, offer_input in enumerate(offer_inputs, start=1)
+        )
+        return self.batch_chat_prompt.format_prompt(
+            offers_count=len(offer_inputs), offers=offers
+        ).to_messages()
+
+    def parse_output(
+        self, output: BaseMessage, offer_input: OfferExtractionInput
+    ) -> OfferSettings:
+        parsed_output: object = parse_json_reply(str(output.content))
+        if not isinstance(parsed_output, dict):
+            raise ValueError("Output is not a json object")
+        return self.complete_offer(parsed_output, offer_input)
+
+    def parse_batch_output(
+        self, output: BaseMessage, offer_inputs: list[OfferExtractionInput]
+    ) -> list[OfferSettings]:
+        parsed_output: object = parse_json_reply(str(output.content))
+        # JSON mode only returns objects, so the array comes wrapped
+        if isinstance(parsed_output, dict) and "offers" in parsed_output:
+            parsed_output = parsed_output["offers"]
+        if not isinstance(parsed_output, list):
+            raise ValueError("Batch output is not a json array")
+        if len(parsed_output) != len(offer_inputs):
+            raise ValueError(
+                f"Expected {len(offer_inputs)} offers, got {len(parsed_output)}"
             )
-            extracted_offer.full_offer = offer_input.offer
+
+        extracted_offers: list[OfferSettings] = []
+        for extracted_fields, offer_input in zip(parsed_output, offer_inputs):
+            if not isinstance(extracted_fields, dict):
+                raise ValueError("Batch output item is not a json object")
+            extracted_offers.append(self.complete_offer(extracted_fields, offer_input))
+        return extracted_offers
+
+    def complete_offer(
+        self, extracted_fields: dict[str, Any], offer_input: OfferExtractionInput
+    ) -> OfferSettings:
+        extracted_offer: OfferSettings = coerce_fields(OfferSettings, extracted_fields)
+        extracted_offer.full_offer = offer_input.offer
+        # Set by the extractor only, a reply echoing the field defers nothing
+        extracted_offer.deferred = False
+        if self.compact:
+            # Not asked from the model, and it is verbatim in the offer anyway
+            extracted_offer.disclaimer = extract_disclaimer(offer_input.offer)
         return extracted_offer
 
     def update_cumulative_cost(self, extraction_cost: float) -> None:
-        self.total_cumulative_cost_of_usage += extraction_cost
+        with self._cost_lock:
+            self.total_cumulative_cost_of_usage += extraction_cost
 
+    def _lookup_cache(
+        self, offer_input: OfferExtractionInput
+    ) -> tuple[str | None, OfferSettings | None]:
+        if self.cache is None:
+            return None, None
 
-extractor: OfferExtractor = OfferExtractor(
-    model_name=LLM_MODEL_NAME,
-    system_message_prompt=system_message_string,
-    human_message_prompt_template=human_message_prompt_template_string,
-)
+        cache_key: str = self.cache_key(offer_input)
+        cached_offer: OfferSettings | None = self.cache.get(cache_key)
+        if cached_offer is not None:
+            logging.debug("Extraction cache hit for current offer")
+            cached_offer.full_offer = offer_input.offer
+        return cache_key, cached_offer
+
+    def _store(
+        self, cache_key: str | None, offer_settings: OfferSettings
+    ) -> OfferSettings:
+        # Deferred offers are extracted again on the next run
+        if (
+            self.cache is not None
+            and cache_key is not None
+            and not offer_settings.deferred
+        ):
+            self.cache.set(cache_key, offer_settings)
+        return offer_settings
+
+
+def defer_offer(offer_input: OfferExtractionInput) -> OfferSettings:
+    return OfferSettings(full_offer=offer_input.offer, deferred=True)
 
 
-def extract_offer_info(
-    offer: str, offer_type: str, offer_extractor: OfferExtractor = extractor
-) -> OfferSettings:
-    offer_input: OfferExtractionInput = OfferExtractionInput(
-        offer=offer, offer_type=offer_type.split("_")[0]
+def record_llm_usage(span: Span, cb: OpenAICallbackHandler) -> None:
+    span.update(
+        prompt_tokens=cb.prompt_tokens,
+        completion_tokens=cb.completion_tokens,
+        cost=cb.total_cost,
     )
 
-    offer_settings: OfferSettings = offer_extractor.extract(offer_input)
 
-    logging.info(
-        f"OPENAI cumulative cost of extraction so far: ${offer_extractor.total_cumulative_cost_of_usage} USD",  # noqa: E501
+def pack_batches(
+    items: list[tuple[int, str | None, OfferExtractionInput]], token_budget: int
+) -> list[list[tuple[int, str | None, OfferExtractionInput]]]:
+    batches: list[list[tuple[int, str | None, OfferExtractionInput]]] = []
+    current_batch: list[tuple[int, str | None, OfferExtractionInput]] = []
+    current_tokens: int = 0
+    for item in items:
+        # Each offer costs its own text plus the json object written back for it
+        item_tokens: int = estimate_tokens(item[2].offer) + EXPECTED_COMPLETION_TOKENS
+        if current_batch and current_tokens + item_tokens > token_budget:
+            batches.append(current_batch)
+            current_batch, current_tokens = [], 0
+        current_batch.append(item)
+        current_tokens += item_tokens
+
+    if current_batch:
+        batches.append(current_batch)
+    return batches
+
+
+def build_latency_budget(
+    enabled: bool = LLM_LATENCY_BUDGET,
+    hedge: bool = LLM_HEDGE_REQUESTS,
+    initial_hedge_delay_seconds: float = LLM_HEDGE_INITIAL_DELAY_SECONDS,
+    deadline_seconds: float = LLM_DEADLINE_SECONDS,
+) -> LatencyBudget | None:
+    if not enabled:
+        return None
+    return LatencyBudget(
+        hedge=hedge,
+        hedge_percentile=LLM_HEDGE_PERCENTILE,
+        min_samples=LLM_HEDGE_MIN_SAMPLES,
+        initial_hedge_delay_seconds=initial_hedge_delay_seconds,
+        deadline_seconds=deadline_seconds,
+    )
+
+
+def build_extractor(compact: bool = LLM_COMPACT_PROMPT) -> OfferExtractor:
+    cache: ExtractionCache = ExtractionCache(
+        directory=EXTRACTION_CACHE_DIR,
+        ttl_seconds=EXTRACTION_CACHE_TTL_SECONDS,
+        max_entries=EXTRACTION_CACHE_MAX_ENTRIES,
+    )
+    latency_budget: LatencyBudget | None = build_latency_budget()
+    if not compact:
+        return OfferExtractor(
+            model_name=LLM_MODEL_NAME,
+            system_message_prompt=system_message_string,
+            human_message_prompt_template=human_message_prompt_template_string,
+            cache=cache,
+            latency_budget=latency_budget,
+            hedge_model_name=LLM_HEDGE_MODEL_NAME,
+        )
+
+    return OfferExtractor(
+        model_name=LLM_MODEL_NAME,
+        system_message_prompt=compact_system_message_string.format(
+            schema=build_field_schema(OfferSettings)
+        ),
+        human_message_prompt_template=compact_human_message_prompt_template_string,
+        cache=cache,
+        batch_human_message_prompt_template=(
+            compact_batch_human_message_prompt_template_string
+        ),
+        batch_offer_template=compact_batch_offer_template_string,
+        compact=True,
+        latency_budget=latency_budget,
+        hedge_model_name=LLM_HEDGE_MODEL_NAME,
+    )
+
+
+class PromptTokenStats(BaseModel):
+    prompt_tokens_per_offer: float
+    completion_tokens_per_offer: float
+
+
+class PromptTokenComparison(BaseModel):
+    offers: int
+    verbose: PromptTokenStats
+    compact: PromptTokenStats
+
+
+def get_expected_reply(offer_extractor: OfferExtractor, offer: OfferSettings) -> str:
+    if offer_extractor.compact:
+        return json.dumps(offer.model_dump(include=set(COMPACT_FIELD_HINTS)))
+    # Same layout as the examples in the verbose prompt
+    return json.dumps(
+        offer.model_dump(include=set(COMPACT_FIELD_HINTS) | {"disclaimer"}), indent=2
     )
 
-    return offer_settings
+
+def measure_prompt_tokens(
+    offer_extractor: OfferExtractor, offers: list[OfferSettings]
+) -> PromptTokenStats:
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    for offer in offers:
+        offer_input: OfferExtractionInput = OfferExtractionInput(
+            offer=offer.full_offer or "",
+            offer_type="finance" if offer.apr else "promotion",
+        )
+        prompt_tokens += sum(
+            count_tokens(str(message.content), offer_extractor.model_name)
+            for message in offer_extractor.format_messages(offer_input)
+        )
+        completion_tokens += count_tokens(
+            get_expected_reply(offer_extractor, offer), offer_extractor.model_name
+        )
+    return PromptTokenStats(
+        prompt_tokens_per_offer=prompt_tokens / max(1, len(offers)),
+        completion_tokens_per_offer=completion_tokens / max(1, len(offers)),
+    )
+
+
+def compare_prompt_tokens(corpus_file: Path = OUTPUT_FILE) -> PromptTokenComparison:
+    # Replays the offers of a previous run through both prompts, the stored
+    # extraction stands in for the reply the model would write
+    with open(corpus_file) as file:
+        offers: list[OfferSettings] = [
+            offer.offer_settings
+            for record in json.load(file)
+            if (offer := Offer.model_validate(record)).offer_settings is not None
+        ]
+
+    comparison: PromptTokenComparison = PromptTokenComparison(
+        offers=len(offers),
+        verbose=measure_prompt_tokens(build_extractor(compact=False), offers),
+        compact=measure_prompt_tokens(build_extractor(compact=True), offers),
+    )
+    for mode, stats in (
+        ("verbose", comparison.verbose),
+        ("compact", comparison.compact),
+    ):
+        logging.info(
+            f"{mode} prompt: {stats.prompt_tokens_per_offer:.0f} prompt + "
+            f"{stats.completion_tokens_per_offer:.0f} completion tokens per offer"
+        )
+    return comparison
@@ -160,3 +160,59 @@ and write the output in the appropriate format.
 {offer}
 ```
 """
+
+batch_human_message_prompt_template_string: Final[
+    str
+] = """
+Below you will find {offers_count} offers, each one delimited by triple backticks
+and preceded by its number and its type.
+
+Please extract the information from every offer independently, following exactly
+the same rules and output format as for a single offer.
+
+Write the output as a json array with exactly {offers_count} objects, one per
+offer and in the same order as the offers are given. Do not write anything
+other than the json array.
+
+{offers}
+"""
+
+batch_offer_template_string: Final[
+    str
+] = """
+Offer {number}. This is a {offer_type} offer.
+```
+{offer}
+```
+"""
+
+compact_system_message_string: Final[
+    str
+] = """
+Extract the fields of an Audi dealership offer (finance or promotion).
+Reply with one json object with exactly these keys, null when not stated:
+{schema}
+Numbers without currency symbols or thousands separators.
+"""
+
+compact_human_message_prompt_template_string: Final[
+    str
+] = """
+{offer_type} offer:
+{offer}
+"""
+
+compact_batch_human_message_prompt_template_string: Final[
+    str
+] = """
+Extract each of the {offers_count} offers below independently.
+Reply with a json object {{"offers": [...]}} holding one object per offer, in order.
+{offers}
+"""
+
+compact_batch_offer_template_string: Final[
+    str
+] = """
+Offer {number}, {offer_type}:
+{offer}
+"""
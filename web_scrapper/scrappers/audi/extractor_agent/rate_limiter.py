@@ -0,0 +1,116 @@
+import asyncio
+import functools
+import logging
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, TypeVar
+
+import openai
+import tiktoken
+
+T = TypeVar("T")
+
+# Rough average for English text with OpenAI tokenizers
+CHARS_PER_TOKEN: int = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+@functools.cache
+def get_encoding(model_name: str) -> tiktoken.Encoding | None:
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except Exception as error:
+        # Encodings are downloaded on first use, which fails when offline
+        logging.info(f"No tokenizer for {model_name} ({error!r}), estimating tokens")
+        return None
+
+
+def count_tokens(text: str, model_name: str) -> int:
+    encoding: tiktoken.Encoding | None = get_encoding(model_name)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text))
+
+
+class AsyncRateLimiter:
+    requests_per_minute: int | None
+    tokens_per_minute: int | None
+    period_seconds: float
+
+    def __init__(
+        self,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        period_seconds: float = 60.0,
+    ) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.period_seconds = period_seconds
+        self._window: deque[tuple[float, int]] = deque()
+        self._window_tokens: int = 0
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int = 0) -> None:
+        async with self._lock:
+            while (wait_seconds := self._seconds_until_available(tokens)) > 0:
+                logging.debug(f"Rate limit reached, waiting {wait_seconds:.2f}s")
+                await asyncio.sleep(wait_seconds)
+            self._window.append((time.monotonic(), tokens))
+            self._window_tokens += tokens
+
+    def _seconds_until_available(self, tokens: int) -> float:
+        now: float = time.monotonic()
+        while self._window and now - self._window[0][0] >= self.period_seconds:
+            self._window_tokens -= self._window.popleft()[1]
+
+        if not self._window or not self._is_over_limit(tokens):
+            return 0.0
+        return self.period_seconds - (now - self._window[0][0])
+
+    def _is_over_limit(self, tokens: int) -> bool:
+        over_requests: bool = (
+            self.requests_per_minute is not None
+            and len(self._window) >= self.requests_per_minute
+        )
+        over_tokens: bool = (
+            self.tokens_per_minute is not None
+            and self._window_tokens + tokens > self.tokens_per_minute
+        )
+        return over_requests or over_tokens
+
+
+def is_retryable_error(error: Exception) -> bool:
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+async def retry_with_backoff(
+    call: Callable[[], Awaitable[T]],
+    max_attempts: int,
+    base_delay_seconds: float = 1.0,
+    max_delay_seconds: float = 60.0,
+) -> T:
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return await call()
+        except Exception as error:
+            if attempt == max_attempts or not is_retryable_error(error):
+                raise
+            # Full jitter keeps concurrent workers from retrying in lockstep
+            delay_seconds: float = random.uniform(
+                0, min(max_delay_seconds, base_delay_seconds * 2 ** (attempt - 1))
+            )
+            logging.warning(
+                f"Retryable LLM error ({error.__class__.__name__}), attempt "
+                f"{attempt}/{max_attempts}, retrying in {delay_seconds:.2f}s"
+            )
+            await asyncio.sleep(delay_seconds)
+
+    raise RuntimeError("max_attempts must be at least 1")
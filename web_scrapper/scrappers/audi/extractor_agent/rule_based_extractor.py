@@ -0,0 +1,181 @@
+import json
+import logging
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Final
+
+from pydantic import BaseModel
+
+from web_scrapper.scrappers.audi.models_library import OfferSettings
+
+APR_PATTERN: Final[re.Pattern[str]] = re.compile(r"(\d+(?:\.\d+)?%)\s*APR", re.I)
+TERM_PATTERN: Final[re.Pattern[str]] = re.compile(r"APR\*?\s+for\s+(\d+)\s+months", re.I)
+EXPIRATION_PATTERN: Final[re.Pattern[str]] = re.compile(
+    r"Offer only valid .*? through ([A-Z][a-z]{2} \d{2}, \d{4})"
+)
+DISCLAIMER_PATTERN: Final[re.Pattern[str]] = re.compile(
+    r"Disclaimer\(s\) :.*?(?=\nRequest More Info|\Z)", re.S
+)
+NO_DOWN_PAYMENT_PATTERN: Final[re.Pattern[str]] = re.compile(
+    r"\bno down payment required\b", re.I
+)
+HEADLINE_AMOUNT_PATTERN: Final[re.Pattern[str]] = re.compile(
+    r"^\$(\d{1,3}(?:,\d{3})*(?:\.\d+)?)\b"
+)
+CAPPED_AMOUNT_PATTERN: Final[re.Pattern[str]] = re.compile(
+    r"\bup to \$(\d{1,3}(?:,\d{3})*(?:\.\d+)?)\b", re.I
+)
+# Wording the rules do not understand, such as lease payments, needs the LLM
+UNSUPPORTED_TERMS_PATTERN: Final[re.Pattern[str]] = re.compile(
+    r"/mo\b|per month|due at signing|\bMSRP\b", re.I
+)
+
+REQUIRED_FIELDS: Final[dict[str, tuple[str, ...]]] = {
+    "finance": ("name", "expiration", "disclaimer", "apr", "term"),
+    "promotion": ("name", "expiration", "disclaimer", "amount"),
+}
+DEFAULT_REQUIRED_FIELDS: Final[tuple[str, ...]] = ("name", "expiration", "disclaimer")
+
+
+class RuleBasedExtraction(BaseModel):
+    offer_settings: OfferSettings
+    confidence: float
+    missing_fields: list[str]
+
+
+def parse_amount(value: str) -> float:
+    return float(value.replace(",", ""))
+
+
+def extract_name(lines: list[str]) -> str | None:
+    if not lines or not lines[0].strip():
+        return None
+    headline: str = lines[0].strip().rstrip(".")
+    if len(lines) > 1 and lines[1].strip() == "Manufacturer Offers":
+        return f"{headline} | {lines[1].strip()}"
+    return headline
+
+
+def extract_expiration(offer: str) -> str | None:
+    match: re.Match[str] | None = EXPIRATION_PATTERN.search(offer)
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), "%b %d, %Y").date().isoformat()
+
+
+def extract_amount(headline: str, disclaimer: str | None) -> float | None:
+    match: re.Match[str] | None = HEADLINE_AMOUNT_PATTERN.search(headline)
+    if match is None and disclaimer:
+        match = CAPPED_AMOUNT_PATTERN.search(disclaimer)
+    return parse_amount(match.group(1)) if match else None
+
+
+def extract_financing(description: str, offer: str) -> dict[str, Any]:
+    fields: dict[str, Any] = {}
+    apr_match: re.Match[str] | None = APR_PATTERN.search(description)
+    if apr_match:
+        fields["apr"] = apr_match.group(1)
+    term_match: re.Match[str] | None = TERM_PATTERN.search(description)
+    if term_match:
+        fields["term"] = int(term_match.group(1))
+    if NO_DOWN_PAYMENT_PATTERN.search(offer):
+        fields["down_payment"] = 0.0
+        fields["down_payment_label"] = "No down payment required"
+    return fields
+
+
+class RuleBasedExtractor:
+    min_confidence: float
+    skipped_llm: int
+    sent_to_llm: int
+
+    def __init__(self, min_confidence: float = 1.0) -> None:
+        self.min_confidence = min_confidence
+        self.skipped_llm = 0
+        self.sent_to_llm = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def extract(self, offer: str, offer_type: str) -> RuleBasedExtraction:
+        lines: list[str] = offer.split("\n")
+        disclaimer_match: re.Match[str] | None = DISCLAIMER_PATTERN.search(offer)
+        disclaimer: str | None = disclaimer_match.group(0) if disclaimer_match else None
+        description: str = (
+            offer[: disclaimer_match.start()] if disclaimer_match else offer
+        )
+
+        fields: dict[str, Any] = {
+            "name": extract_name(lines),
+            "expiration": extract_expiration(offer),
+            "disclaimer": disclaimer,
+        }
+        if offer_type == "finance":
+            fields.update(extract_financing(description, offer))
+        else:
+            fields["amount"] = extract_amount(lines[0], disclaimer)
+
+        offer_settings: OfferSettings = OfferSettings(**fields, full_offer=offer)
+        required_fields: tuple[str, ...] = REQUIRED_FIELDS.get(
+            offer_type, DEFAULT_REQUIRED_FIELDS
+        )
+        missing_fields: list[str] = [
+            field for field in required_fields if getattr(offer_settings, field) is None
+        ]
+        confidence: float = 1 - len(missing_fields) / len(required_fields)
+        if UNSUPPORTED_TERMS_PATTERN.search(description):
+            confidence /= 2
+
+        return RuleBasedExtraction(
+            offer_settings=offer_settings,
+            confidence=confidence,
+            missing_fields=missing_fields,
+        )
+
+    def try_extract(self, offer: str, offer_type: str) -> OfferSettings | None:
+        extraction: RuleBasedExtraction = self.extract(offer, offer_type)
+        is_confident: bool = extraction.confidence >= self.min_confidence
+        with self._lock:
+            if is_confident:
+                self.skipped_llm += 1
+            else:
+                self.sent_to_llm += 1
+
+        if not is_confident:
+            logging.debug(
+                f"Rule-based extraction not confident ({extraction.confidence:.2f}), "
+                f"missing: {extraction.missing_fields}"
+            )
+            return None
+        return extraction.offer_settings
+
+
+def evaluate_against_corpus(
+    corpus_file: Path, rule_based_extractor: RuleBasedExtractor | None = None
+) -> dict[str, float]:
+    # Only offers that would skip the LLM are compared against the stored results
+    evaluator: RuleBasedExtractor = rule_based_extractor or RuleBasedExtractor()
+    with open(corpus_file) as file:
+        corpus: list[dict[str, Any]] = json.load(file)
+
+    compared: int = 0
+    mismatches: int = 0
+    for record in corpus:
+        expected: dict[str, Any] = record["offer_settings"]
+        # The output file does not keep the section, infer it from the APR field
+        offer_type: str = "finance" if expected["apr"] else "promotion"
+        extraction: RuleBasedExtraction = evaluator.extract(
+            expected["full_offer"], offer_type
+        )
+        if extraction.confidence < evaluator.min_confidence:
+            continue
+        compared += 1
+        actual: dict[str, Any] = extraction.offer_settings.model_dump()
+        if any(actual[key] != value for key, value in expected.items()):
+            mismatches += 1
+
+    return {
+        "offers": float(len(corpus)),
+        "fast_path_coverage": compared / len(corpus) if corpus else 0.0,
+        "fast_path_accuracy": 1 - mismatches / compared if compared else 0.0,
+    }
@@ -1,13 +1,17 @@
 import logging
-from typing import Callable, TypeVar
+from typing import TYPE_CHECKING, Callable, TypeVar
 
 from pydantic import BaseModel
-from selenium.webdriver.chrome.webdriver import WebDriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webelement import WebElement
+
+if TYPE_CHECKING:
+    from web_scrapper.scrappers.audi.backends.base import ScrapingBackend
 
 T = TypeVar("T")
 
+YEARS_FACET_DIV: int = 2
+STYLES_FACET_DIV: int = 4
+MODELS_FACET_DIV: int = 5
+
 
 class OfferSettings(BaseModel):
     payment: float | None = None
@@ -25,6 +29,10 @@ class OfferSettings(BaseModel):
     vin: str | None = None
     msrp: float | None = None
     full_offer: str | None = None
+    # Only the offer text, the LLM missed its deadline. Saved like any other
+    # offer but kept out of the cache and the crawl state so the next run
+    # extracts it again.
+    deferred: bool = False
 
 
 class Offer(BaseModel):
@@ -35,9 +43,23 @@ class Offer(BaseModel):
     year: int | None = None
     condition: str | None = None
     type: str | None = None
+    dealer: str | None = None
     offer_settings: OfferSettings | None = None
 
 
+class ModelTile(BaseModel):
+    name: str
+    url: str
+
+
+class ModelPage(BaseModel):
+    model: ModelTile
+    offer_texts: list[tuple[str, str]]
+    fingerprint: str | None = None
+    # Set when the offers are known without extracting them again
+    offers: list[Offer] | None = None
+
+
 class Years(BaseModel):
     available_years: set[int]
 
@@ -50,39 +72,35 @@ class Models(BaseModel):
     available_models: set[str]
 
 
-def get_li_elements_from_div(sidebar: WebElement, div_number: int) -> list[WebElement]:
-    xpath: str = f"div[{div_number}]"
-    div_element: WebElement = sidebar.find_element(By.XPATH, xpath)
-    ul_element: WebElement = div_element.find_element(By.TAG_NAME, "ul")
-    li_elements: list[WebElement] = ul_element.find_elements(By.TAG_NAME, "li")
-    return li_elements
-
-
 def get_items_from_div(
-    sidebar: WebElement, div_number: int, converter: Callable[[str], T]
+    backend: "ScrapingBackend", div_number: int, converter: Callable[[str], T]
 ) -> list[T]:
-    li_elements: list[WebElement] = get_li_elements_from_div(sidebar, div_number)
-    return [converter(li.text) for li in li_elements]
+    return [converter(item) for item in backend.get_facet_items(div_number)]
 
 
-def get_years(sidebar: WebElement, div_number: int = 2) -> list[int]:
-    return get_items_from_div(sidebar, div_number, int)
+def get_years(
+    backend: "ScrapingBackend", div_number: int = YEARS_FACET_DIV
+) -> list[int]:
+    return get_items_from_div(backend, div_number, int)
 
 
-def get_styles(sidebar: WebElement, div_number: int = 4) -> list[str]:
-    return get_items_from_div(sidebar, div_number, str)
+def get_styles(
+    backend: "ScrapingBackend", div_number: int = STYLES_FACET_DIV
+) -> list[str]:
+    return get_items_from_div(backend, div_number, str)
 
 
-def get_models(sidebar: WebElement, div_number: int = 5) -> list[str]:
-    return get_items_from_div(sidebar, div_number, str)
+def get_models(
+    backend: "ScrapingBackend", div_number: int = MODELS_FACET_DIV
+) -> list[str]:
+    return get_items_from_div(backend, div_number, str)
 
 
-def build_data(driver: WebDriver) -> tuple[Years, BodyStyles, Models]:
+def build_data(backend: "ScrapingBackend") -> tuple[Years, BodyStyles, Models]:
     logging.info("Preparing information for all models, body styles, and years")
-    sidebar: WebElement = driver.find_element(By.CLASS_NAME, "facets-container")
 
-    years: Years = Years(available_years=set(get_years(sidebar)))
-    body_styles: BodyStyles = BodyStyles(available_styles=set(get_styles(sidebar)))
-    models: Models = Models(available_models=set(get_models(sidebar)))
+    years: Years = Years(available_years=set(get_years(backend)))
+    body_styles: BodyStyles = BodyStyles(available_styles=set(get_styles(backend)))
+    models: Models = Models(available_models=set(get_models(backend)))
 
     return years, body_styles, models
@@ -0,0 +1,85 @@
+import re
+from typing import Iterable
+
+from pydantic import BaseModel
+
+from web_scrapper.scrappers.audi.backends.base import ScrapingBackend
+from web_scrapper.scrappers.audi.models_library import (
+    BodyStyles,
+    Models,
+    Years,
+    build_data,
+)
+
+
+class ResolvedModel(BaseModel):
+    model: str | None = None
+    trim: str | None = None
+    year: int | None = None
+
+
+def compile_longest_first(values: Iterable[int | str]) -> re.Pattern[str] | None:
+    # Longest alternatives first so that "Q5 Sportback" wins over "Q5" at the
+    # same position, and sorted so the pattern does not depend on set order
+    alternatives: list[str] = sorted(
+        {str(value) for value in values if str(value)}, key=lambda v: (-len(v), v)
+    )
+    if not alternatives:
+        return None
+    return re.compile(rf"(?<!\w)({'|'.join(map(re.escape, alternatives))})(?!\w)")
+
+
+def search(pattern: re.Pattern[str] | None, input_string: str) -> str | None:
+    if pattern is None:
+        return None
+    match: re.Match[str] | None = pattern.search(input_string)
+    return match.group(1) if match else None
+
+
+class TaxonomyIndex:
+    years: list[int]
+    styles: list[str]
+    models: list[str]
+
+    def __init__(
+        self,
+        years: Iterable[int],
+        styles: Iterable[str],
+        models: Iterable[str],
+    ) -> None:
+        self.years = sorted(set(years))
+        self.styles = sorted(set(styles))
+        self.models = sorted(set(models))
+        self._year_pattern: re.Pattern[str] | None = compile_longest_first(self.years)
+        self._style_pattern: re.Pattern[str] | None = compile_longest_first(self.styles)
+        self._model_pattern: re.Pattern[str] | None = compile_longest_first(self.models)
+
+    @classmethod
+    def from_facets(
+        cls, years: Years, styles: BodyStyles, models: Models
+    ) -> "TaxonomyIndex":
+        return cls(
+            years.available_years, styles.available_styles, models.available_models
+        )
+
+    def resolve(self, name: str) -> ResolvedModel:
+        year: str | None = search(self._year_pattern, name)
+        return ResolvedModel(
+            model=search(self._model_pattern, name),
+            trim=search(self._style_pattern, name),
+            year=int(year) if (year and year.isdigit()) else None,
+        )
+
+    def resolve_many(self, names: Iterable[str]) -> list[ResolvedModel]:
+        names_list: list[str] = list(names)
+        resolved: dict[str, ResolvedModel] = {
+            name: self.resolve(name) for name in dict.fromkeys(names_list)
+        }
+        return [resolved[name] for name in names_list]
+
+
+def load_taxonomy(backend: ScrapingBackend) -> TaxonomyIndex:
+    # Built from the facets of the loaded listing, which come with the page
+    # snapshot. Fingerprinting them to cache the index would read the same
+    # facets, so there is nothing to skip.
+    return TaxonomyIndex.from_facets(*build_data(backend))
@@ -0,0 +1,128 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Generic, Iterator, Protocol, TypeVar
+
+import httpx
+from selenium.common.exceptions import WebDriverException
+
+
+class Driver(Protocol):
+    def quit(self) -> None: ...
+
+
+D = TypeVar("D", bound=Driver)
+T = TypeVar("T")
+R = TypeVar("R")
+
+RETRYABLE_ERRORS: tuple[type[Exception], ...] = (
+    WebDriverException,
+    httpx.TransportError,
+)
+
+
+def raise_failures(futures: list[Future[None]]) -> None:
+    for future in futures:
+        if future.done() and (error := future.exception()) is not None:
+            raise error
+
+
+class DriverPool(Generic[D, T, R]):
+    size: int
+    driver_factory: Callable[[], D]
+    max_retries: int
+    retry_on: tuple[type[Exception], ...]
+
+    def __init__(
+        self,
+        size: int,
+        driver_factory: Callable[[], D],
+        max_retries: int = 2,
+        retry_on: tuple[type[Exception], ...] = RETRYABLE_ERRORS,
+    ) -> None:
+        self.size = size
+        self.driver_factory = driver_factory
+        self.max_retries = max_retries
+        self.retry_on = retry_on
+
+    def map(self, task: Callable[[D, T], R], items: list[T]) -> list[R]:
+        return list(self.imap(task, items))
+
+    def imap(self, task: Callable[[D, T], R], items: list[T]) -> Iterator[R]:
+        # Interleaved shards spread slow and fast pages evenly across workers
+        shards: list[list[int]] = [
+            list(range(worker_idx, len(items), self.size))
+            for worker_idx in range(min(self.size, len(items)))
+        ]
+        completed: queue.Queue[tuple[int, R]] = queue.Queue()
+        stop: threading.Event = threading.Event()
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=len(shards) or 1, thread_name_prefix="driver"
+        )
+        futures: list[Future[None]] = [
+            executor.submit(
+                self._run_shard, worker_idx, task, items, shard, completed.put, stop
+            )
+            for worker_idx, shard in enumerate(shards)
+        ]
+
+        # Results arrive out of order, hold them back to yield in input order
+        pending: dict[int, R] = {}
+        try:
+            for next_idx in range(len(items)):
+                while next_idx not in pending:
+                    try:
+                        idx, result = completed.get(timeout=0.5)
+                    except queue.Empty:
+                        raise_failures(futures)
+                        continue
+                    pending[idx] = result
+                yield pending.pop(next_idx)
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
+
+    def _run_shard(
+        self,
+        worker_idx: int,
+        task: Callable[[D, T], R],
+        items: list[T],
+        shard: list[int],
+        on_result: Callable[[tuple[int, R]], None],
+        stop: threading.Event,
+    ) -> None:
+        logging.info(f"Worker {worker_idx} starting with {len(shard)} items")
+        driver: D = self.driver_factory()
+        attempts: int = 0
+        position: int = 0
+        try:
+            while position < len(shard) and not stop.is_set():
+                idx: int = shard[position]
+                try:
+                    on_result((idx, task(driver, items[idx])))
+                except self.retry_on as error:
+                    attempts += 1
+                    if attempts > self.max_retries:
+                        raise
+                    logging.warning(
+                        f"Worker {worker_idx} driver failed ({error!r}), "
+                        f"recycling it and retrying (attempt {attempts})"
+                    )
+                    driver = self._recycle(driver)
+                    continue
+                attempts = 0
+                position += 1
+        finally:
+            self._quit(driver)
+
+    def _recycle(self, driver: D) -> D:
+        self._quit(driver)
+        return self.driver_factory()
+
+    @staticmethod
+    def _quit(driver: Driver) -> None:
+        try:
+            driver.quit()
+        except Exception as error:
+            logging.debug(f"Ignoring error while quitting a driver: {error!r}")
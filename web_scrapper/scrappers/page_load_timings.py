@@ -0,0 +1,52 @@
+import logging
+import statistics
+import time
+from functools import partial
+from typing import Callable
+
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from web_scrapper.scrappers.utils import setup_driver, wait_for_page_ready
+from web_scrapper.settings import AUDI_URL, BROWSER_PAGE_READY_TIMEOUT_SECONDS
+
+READY_SELECTOR: str = ".ddc-wrapper"
+
+
+def time_page_loads(
+    driver_factory: Callable[[], WebDriver], urls: list[str], repeats: int = 3
+) -> tuple[float, list[float]]:
+    start_time: float = time.perf_counter()
+    driver: WebDriver = driver_factory()
+    startup_seconds: float = time.perf_counter() - start_time
+
+    load_seconds: list[float] = []
+    try:
+        for _ in range(repeats):
+            for url in urls:
+                start_time = time.perf_counter()
+                driver.get(url)
+                # Both modes wait for the same element, so eager is not
+                # credited for returning before the page is usable
+                wait_for_page_ready(
+                    driver, READY_SELECTOR, BROWSER_PAGE_READY_TIMEOUT_SECONDS
+                )
+                load_seconds.append(time.perf_counter() - start_time)
+    finally:
+        driver.quit()
+    return startup_seconds, load_seconds
+
+
+def compare_page_load_timings(urls: list[str], repeats: int = 3) -> None:
+    for mode, lean in (("default", False), ("lean", True)):
+        startup_seconds, load_seconds = time_page_loads(
+            partial(setup_driver, lean=lean), urls, repeats
+        )
+        logging.info(
+            f"{mode}: driver startup {startup_seconds:.2f}s, page load "
+            f"p50 {statistics.median(load_seconds):.2f}s, "
+            f"max {max(load_seconds):.2f}s over {len(load_seconds)} loads"
+        )
+
+
+if __name__ == "__main__":
+    compare_page_load_timings([AUDI_URL])
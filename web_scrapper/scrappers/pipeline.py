@@ -0,0 +1,117 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Generator, Generic, Iterable, Iterator, TypeVar
+
+from web_scrapper.scrappers.driver_pool import raise_failures
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Wakes blocked threads up to check whether the pipeline was stopped
+POLL_SECONDS: float = 0.5
+
+
+class Pipeline(Generic[T, R]):
+    workers: int
+    queue_size: int
+
+    def __init__(self, workers: int, queue_size: int) -> None:
+        self.workers = workers
+        self.queue_size = queue_size
+
+    def imap(self, items: Iterable[T], consume: Callable[[T], R]) -> Iterator[R]:
+        # items is iterated in its own thread and feeds the consumers through
+        # a bounded queue, a slow consumer stage stops the producer instead of
+        # piling up pages in memory
+        pending_items: queue.Queue[tuple[int, T] | None] = queue.Queue(
+            maxsize=self.queue_size
+        )
+        completed: queue.Queue[tuple[int, R]] = queue.Queue()
+        stop: threading.Event = threading.Event()
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=self.workers + 1, thread_name_prefix="pipeline"
+        )
+        producer: Future[int] = executor.submit(
+            self._produce, items, pending_items, stop
+        )
+        consumers: list[Future[None]] = [
+            executor.submit(self._consume, consume, pending_items, completed, stop)
+            for _ in range(self.workers)
+        ]
+
+        # Results arrive out of order, hold them back to yield in input order
+        pending: dict[int, R] = {}
+        next_idx: int = 0
+        try:
+            while not (producer.done() and next_idx == producer.result()):
+                if next_idx in pending:
+                    yield pending.pop(next_idx)
+                    next_idx += 1
+                    continue
+                raise_failures(consumers)
+                try:
+                    idx, result = completed.get(timeout=POLL_SECONDS)
+                except queue.Empty:
+                    continue
+                pending[idx] = result
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _produce(
+        self,
+        items: Iterable[T],
+        pending_items: queue.Queue[tuple[int, T] | None],
+        stop: threading.Event,
+    ) -> int:
+        count: int = 0
+        iterator: Iterator[T] = iter(items)
+        try:
+            for item in iterator:
+                if not self._put(pending_items, (count, item), stop):
+                    logging.info("Pipeline stopped, producer exiting")
+                    break
+                count += 1
+        finally:
+            # Lets a generator producer, e.g. a driver pool, release its browsers
+            if isinstance(iterator, Generator):
+                iterator.close()
+            # One end marker per consumer
+            for _ in range(self.workers):
+                self._put(pending_items, None, stop)
+        return count
+
+    def _consume(
+        self,
+        consume: Callable[[T], R],
+        pending_items: queue.Queue[tuple[int, T] | None],
+        completed: queue.Queue[tuple[int, R]],
+        stop: threading.Event,
+    ) -> None:
+        while not stop.is_set():
+            try:
+                pending_item: tuple[int, T] | None = pending_items.get(
+                    timeout=POLL_SECONDS
+                )
+            except queue.Empty:
+                continue
+            if pending_item is None:
+                return
+            idx, item = pending_item
+            completed.put((idx, consume(item)))
+
+    @staticmethod
+    def _put(
+        pending_items: queue.Queue[tuple[int, T] | None],
+        pending_item: tuple[int, T] | None,
+        stop: threading.Event,
+    ) -> bool:
+        while not stop.is_set():
+            try:
+                pending_items.put(pending_item, timeout=POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
@@ -0,0 +1,80 @@
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class RequestBudgetExceeded(Exception):
+    pass
+
+
+def get_host(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+class HostPolicy:
+    host: str
+    requests_per_minute: int | None
+    request_budget: int | None
+    requests_made: int
+
+    def __init__(
+        self,
+        host: str,
+        requests_per_minute: int | None = None,
+        request_budget: int | None = None,
+    ) -> None:
+        self.host = host
+        self.requests_per_minute = requests_per_minute
+        self.request_budget = request_budget
+        self.requests_made = 0
+        self._next_request_at: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def min_interval_seconds(self) -> float:
+        if not self.requests_per_minute:
+            return 0.0
+        return 60.0 / self.requests_per_minute
+
+    def acquire(self) -> None:
+        # Reserve the next slot under the lock and sleep outside of it, so
+        # concurrent workers on the same host are spaced out instead of bunched
+        with self._lock:
+            if (
+                self.request_budget is not None
+                and self.requests_made >= self.request_budget
+            ):
+                raise RequestBudgetExceeded(
+                    f"Request budget of {self.request_budget} exhausted for {self.host}"
+                )
+            now: float = time.monotonic()
+            request_at: float = max(now, self._next_request_at)
+            self._next_request_at = request_at + self.min_interval_seconds
+            self.requests_made += 1
+
+        if (wait_seconds := request_at - now) > 0:
+            logging.debug(f"Waiting {wait_seconds:.2f}s before requesting {self.host}")
+            time.sleep(wait_seconds)
+
+
+class HostPolicies:
+    requests_per_minute: int | None
+    request_budget: int | None
+
+    def __init__(
+        self, requests_per_minute: int | None = None, request_budget: int | None = None
+    ) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.request_budget = request_budget
+        self._policies: dict[str, HostPolicy] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def for_url(self, url: str) -> HostPolicy:
+        host: str = get_host(url)
+        with self._lock:
+            if host not in self._policies:
+                self._policies[host] = HostPolicy(
+                    host, self.requests_per_minute, self.request_budget
+                )
+            return self._policies[host]
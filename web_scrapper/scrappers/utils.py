@@ -1,20 +1,169 @@
+import itertools
 import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable
 
 from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException, TimeoutException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.chrome.webdriver import WebDriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions
+from selenium.webdriver.support.wait import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 
+from web_scrapper.instrumentation import instrumentation
+from web_scrapper.settings import (
+    BROWSER_BLOCKED_URL_PATTERNS,
+    BROWSER_PROFILES_DIR,
+    CHROMEDRIVER_PATH_CACHE_FILE,
+    LEAN_BROWSER,
+)
 
-def setup_driver() -> WebDriver:
+
+class BrowserProfiles:
+    directory: Path
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self._leased: set[int] = set()
+        self._lock: threading.Lock = threading.Lock()
+
+    def lease(self) -> Path:
+        # Chrome locks its user-data dir, so concurrent drivers each take their
+        # own slot while sequential ones keep reusing the same warm profiles
+        with self._lock:
+            slot: int = next(
+                slot for slot in itertools.count() if slot not in self._leased
+            )
+            self._leased.add(slot)
+        profile_dir: Path = self.directory / f"profile-{slot}"
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        return profile_dir
+
+    def release(self, profile_dir: Path) -> None:
+        with self._lock:
+            self._leased.discard(int(profile_dir.name.removeprefix("profile-")))
+
+
+browser_profiles: BrowserProfiles = BrowserProfiles(BROWSER_PROFILES_DIR)
+_chromedriver_lock: threading.Lock = threading.Lock()
+
+
+def get_chromedriver_path(
+    cache_file: Path = CHROMEDRIVER_PATH_CACHE_FILE, refresh: bool = False
+) -> str:
+    # ChromeDriverManager().install() checks for the latest release online on
+    # every call, the resolved path only changes when Chrome is updated
+    with _chromedriver_lock:
+        if not refresh:
+            try:
+                cached_path: str = cache_file.read_text(encoding="utf-8").strip()
+            except OSError:
+                cached_path = ""
+            if cached_path and Path(cached_path).is_file():
+                return cached_path
+
+        driver_path: str = ChromeDriverManager().install()
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file: Path = cache_file.with_suffix(".tmp")
+        tmp_file.write_text(driver_path, encoding="utf-8")
+        tmp_file.replace(cache_file)
+        return driver_path
+
+
+def start_lean_driver(options: Options, profile_dir: Path) -> WebDriver:
+    # Return once the DOM is parsed instead of waiting for every subresource
+    options.page_load_strategy = "eager"
+    options.add_argument(f"--user-data-dir={profile_dir.resolve()}")
+    options.add_experimental_option(
+        "prefs", {"profile.managed_default_content_settings.images": 2}
+    )
+    try:
+        driver: WebDriver = webdriver.Chrome(
+            service=ChromeService(executable_path=get_chromedriver_path()),
+            options=options,
+        )
+    except SessionNotCreatedException:
+        logging.info("Cached chromedriver does not match Chrome, reinstalling it")
+        driver = webdriver.Chrome(
+            service=ChromeService(executable_path=get_chromedriver_path(refresh=True)),
+            options=options,
+        )
+
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd(
+        "Network.setBlockedURLs", {"urls": BROWSER_BLOCKED_URL_PATTERNS}
+    )
+    return driver
+
+
+def setup_driver(lean: bool = LEAN_BROWSER) -> WebDriver:
+    with instrumentation.span("driver_setup", lean=lean):
+        return start_driver(lean)
+
+
+def start_driver(lean: bool) -> WebDriver:
     logging.info("Setting up Driver")
     options: Options = Options()
     options.add_argument("--headless")
     options.add_argument("--disable-gpu")
     options.add_argument("--no-sandbox")
-    service: ChromeService = ChromeService(
-        executable_path=ChromeDriverManager().install()
-    )
-    driver: WebDriver = webdriver.Chrome(service=service, options=options)
+    if not lean:
+        service: ChromeService = ChromeService(
+            executable_path=ChromeDriverManager().install()
+        )
+        return webdriver.Chrome(service=service, options=options)
+
+    profile_dir: Path = browser_profiles.lease()
+    try:
+        driver: WebDriver = start_lean_driver(options, profile_dir)
+    except Exception:
+        browser_profiles.release(profile_dir)
+        raise
+
+    quit_driver: Callable[[], None] = driver.quit
+
+    def quit_and_release_profile() -> None:
+        try:
+            quit_driver()
+        finally:
+            browser_profiles.release(profile_dir)
+
+    driver.quit = quit_and_release_profile  # type: ignore[method-assign]
     return driver
+
+
+def wait_for_page_ready(driver: WebDriver, css_selector: str, timeout: float) -> None:
+    # With the eager page load strategy driver.get returns before scripts that
+    # run on load have rendered the page
+    try:
+        WebDriverWait(driver, timeout).until(
+            expected_conditions.presence_of_element_located(
+                (By.CSS_SELECTOR, css_selector)
+            )
+        )
+    except TimeoutException:
+        logging.warning(f"{css_selector} did not show up within {timeout}s")
+
+
+class WebDriverCommandCounter:
+    total: int
+    current_page: int
+
+    def __init__(self, driver: WebDriver) -> None:
+        self.total = 0
+        self.current_page = 0
+        self._execute: Callable[..., Any] = driver.execute
+        # Every WebDriver and WebElement call goes through driver.execute
+        driver.execute = self._counting_execute  # type: ignore[method-assign]
+
+    def start_page(self) -> None:
+        self.current_page = 0
+
+    def _counting_execute(self, *args: Any, **kwargs: Any) -> Any:
+        self.total += 1
+        self.current_page += 1
+        return self._execute(*args, **kwargs)
@@ -0,0 +1,43 @@
+import argparse
+from pathlib import Path
+
+from web_scrapper.service.offer_index import LiveOfferIndex
+from web_scrapper.service.server import OfferQueryServer
+from web_scrapper.settings import (
+    OUTPUT_FILE,
+    QUERY_SERVICE_HOST,
+    QUERY_SERVICE_PORT,
+    QUERY_SERVICE_RELOAD_SECONDS,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m web_scrapper.service",
+        description="Answer offer queries over HTTP from the latest crawl",
+    )
+    parser.add_argument("--source", type=Path, default=OUTPUT_FILE)
+    parser.add_argument("--host", default=QUERY_SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=QUERY_SERVICE_PORT)
+    parser.add_argument(
+        "--reload-seconds", type=float, default=QUERY_SERVICE_RELOAD_SECONDS
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+    server: OfferQueryServer = OfferQueryServer(
+        LiveOfferIndex(args.source),
+        host=args.host,
+        port=args.port,
+        reload_seconds=args.reload_seconds,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
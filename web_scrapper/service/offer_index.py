@@ -0,0 +1,240 @@
+import bisect
+import logging
+import math
+import re
+import threading
+from collections import defaultdict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Final, Literal
+
+from pydantic import BaseModel, Field, ValidationError
+
+from web_scrapper.scrappers.audi.models_library import Offer
+from web_scrapper.settings import QUERY_SERVICE_MAX_LIMIT
+from web_scrapper.sinks.jsonl_sink import OFFER_ADAPTER, OFFERS_ADAPTER, read_jsonl
+
+# Exact match filters, compared case insensitively
+INDEXED_FIELDS: Final[tuple[str, ...]] = ("dealer", "model", "year", "trim", "type")
+RATE_PATTERN: Final[re.Pattern[str]] = re.compile(r"\d+(?:\.\d+)?")
+
+SortKey = Literal["apr", "payment", "expiration"]
+SORT_KEYS: Final[tuple[SortKey, ...]] = ("apr", "payment", "expiration")
+
+
+class OfferQuery(BaseModel):
+    dealer: str | None = None
+    model: str | None = None
+    year: int | None = None
+    trim: str | None = None
+    type: str | None = None
+    # Expiration dates are YYYY-MM-DD, so ranges compare as strings
+    expires_from: str | None = None
+    expires_to: str | None = None
+    # Ascending, offers without a value for the key are left out
+    sort: SortKey | None = None
+    limit: int | None = Field(default=None, ge=0, le=QUERY_SERVICE_MAX_LIMIT)
+
+
+def normalize(value: object) -> object:
+    return value.casefold() if isinstance(value, str) else value
+
+
+def parse_rate(rate: str | None) -> float | None:
+    # "3.99%" -> 3.99
+    match: re.Match[str] | None = RATE_PATTERN.search(rate or "")
+    return float(match.group()) if match else None
+
+
+def get_offer_type(offer: Offer) -> str | None:
+    # Offers saved before the type was recorded, same rule as the prompt
+    # token comparison
+    if offer.type is not None or offer.offer_settings is None:
+        return offer.type
+    return "finance" if offer.offer_settings.apr else "promotion"
+
+
+def parse_date(value: str | None) -> float | None:
+    try:
+        return float(date.fromisoformat(value).toordinal()) if value else None
+    except ValueError:
+        return None
+
+
+def get_sort_value(offer: Offer, sort: SortKey) -> float | None:
+    if offer.offer_settings is None:
+        return None
+    if sort == "apr":
+        return parse_rate(offer.offer_settings.apr)
+    if sort == "payment":
+        return offer.offer_settings.payment
+    return parse_date(offer.offer_settings.expiration)
+
+
+def load_offers(source: Path) -> list[Offer]:
+    if source.suffix == ".jsonl":
+        return list(read_jsonl(source))
+    return OFFERS_ADAPTER.validate_json(source.read_bytes())
+
+
+class OfferIndex:
+    offers: list[Offer]
+    loaded_at: str
+
+    def __init__(self, offers: list[Offer]) -> None:
+        # Built once and never mutated, a reload swaps in a new index
+        self.offers = offers
+        self.loaded_at = datetime.now().isoformat()
+        # Responses are joined from records serialized at load time
+        self._records: list[bytes] = [OFFER_ADAPTER.dump_json(offer) for offer in offers]
+        self._postings: dict[str, dict[object, list[int]]] = {
+            field: defaultdict(list) for field in INDEXED_FIELDS
+        }
+        for idx, offer in enumerate(offers):
+            for field in INDEXED_FIELDS:
+                value: object = (
+                    get_offer_type(offer) if field == "type" else getattr(offer, field)
+                )
+                if value is not None:
+                    self._postings[field][normalize(value)].append(idx)
+
+        # Offer ids in ascending order of each sort key, and each offer's
+        # position in that order to sort filtered candidates without lookups
+        self._sorted: dict[str, list[int]] = {}
+        self._ranks: dict[str, list[float]] = {}
+        for sort in SORT_KEYS:
+            values: dict[int, float] = {
+                idx: value
+                for idx, offer in enumerate(offers)
+                if (value := get_sort_value(offer, sort)) is not None
+            }
+            ordered: list[int] = sorted(values, key=values.__getitem__)
+            ranks: list[float] = [math.inf] * len(offers)
+            for rank, idx in enumerate(ordered):
+                ranks[idx] = rank
+            self._sorted[sort] = ordered
+            self._ranks[sort] = ranks
+        self._expirations: list[str] = [
+            offers[idx].offer_settings.expiration  # type: ignore
+            for idx in self._sorted["expiration"]
+        ]
+
+    def __len__(self) -> int:
+        return len(self.offers)
+
+    def search(self, query: OfferQuery) -> list[int]:
+        postings: list[list[int]] = [
+            self._postings[field].get(normalize(value), [])
+            for field in INDEXED_FIELDS
+            if (value := getattr(query, field)) is not None
+        ]
+        if query.expires_from is not None or query.expires_to is not None:
+            postings.append(self._expiring(query.expires_from, query.expires_to))
+
+        ids: list[int]
+        if not postings:
+            # Presorted, a "lowest APR" query without filters is a slice
+            ids = (
+                list(self._sorted[query.sort])
+                if query.sort is not None
+                else list(range(len(self.offers)))
+            )
+        else:
+            # Intersected from the most selective filter
+            postings.sort(key=len)
+            candidates: set[int] = set(postings[0]).intersection(*postings[1:])
+            if query.sort is not None:
+                ranks: list[float] = self._ranks[query.sort]
+                ids = sorted(
+                    (idx for idx in candidates if ranks[idx] != math.inf),
+                    key=ranks.__getitem__,
+                )
+            else:
+                ids = sorted(candidates)
+        return ids[: query.limit] if query.limit is not None else ids
+
+    def query(self, query: OfferQuery) -> list[Offer]:
+        return [self.offers[idx] for idx in self.search(query)]
+
+    def query_json(self, query: OfferQuery) -> bytes:
+        return b"[" + b",".join(self._records[idx] for idx in self.search(query)) + b"]"
+
+    def _expiring(self, expires_from: str | None, expires_to: str | None) -> list[int]:
+        start: int = (
+            bisect.bisect_left(self._expirations, expires_from)
+            if expires_from is not None
+            else 0
+        )
+        end: int = (
+            bisect.bisect_right(self._expirations, expires_to)
+            if expires_to is not None
+            else len(self._expirations)
+        )
+        return self._sorted["expiration"][start:end]
+
+
+def file_signature(source: Path) -> tuple[int, int] | None:
+    try:
+        stat = source.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class LiveOfferIndex:
+    source: Path
+    index: OfferIndex
+
+    def __init__(
+        self,
+        source: Path,
+        load: Callable[[Path], list[Offer]] = load_offers,
+    ) -> None:
+        self.source = source
+        self.index = OfferIndex([])
+        self._load: Callable[[Path], list[Offer]] = load
+        self._signature: tuple[int, int] | None = None
+        self._reload_lock: threading.Lock = threading.Lock()
+        self._stop: threading.Event = threading.Event()
+        self._watcher: threading.Thread | None = None
+        self.reload_if_changed()
+
+    def reload(self) -> bool:
+        with self._reload_lock:
+            # Also kept on failure, a broken file is retried once it changes
+            self._signature = file_signature(self.source)
+            try:
+                index: OfferIndex = OfferIndex(self._load(self.source))
+            except (OSError, ValidationError, ValueError) as error:
+                # The previous index keeps answering until a load succeeds
+                logging.warning(f"Could not load offers from {self.source}: {error!r}")
+                return False
+            # Readers take self.index once per query, so each query sees
+            # either the old or the new offers, never a mix
+            self.index = index
+        logging.info(f"Loaded {len(index)} offers from {self.source}")
+        return True
+
+    def reload_if_changed(self) -> bool:
+        # The output file is replaced once a crawl is compacted, a new
+        # signature means a finished crawl
+        signature: tuple[int, int] | None = file_signature(self.source)
+        if signature is None or signature == self._signature:
+            return False
+        return self.reload()
+
+    def watch(self, interval_seconds: float) -> None:
+        def poll() -> None:
+            while not self._stop.wait(interval_seconds):
+                self.reload_if_changed()
+
+        self._watcher = threading.Thread(
+            target=poll, name="offer-index-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
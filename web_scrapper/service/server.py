@@ -0,0 +1,124 @@
+import contextlib
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any
+from urllib.parse import SplitResult, parse_qsl, urlsplit
+
+from pydantic import ValidationError
+
+from web_scrapper.service.offer_index import LiveOfferIndex, OfferIndex, OfferQuery
+from web_scrapper.settings import (
+    QUERY_SERVICE_HOST,
+    QUERY_SERVICE_PORT,
+    QUERY_SERVICE_RELOAD_SECONDS,
+)
+
+
+def encode(body: dict[str, Any]) -> bytes:
+    return json.dumps(body).encode("utf-8")
+
+
+class OfferQueryServer:
+    offers: LiveOfferIndex
+    reload_seconds: float | None
+
+    def __init__(
+        self,
+        offers: LiveOfferIndex,
+        host: str = QUERY_SERVICE_HOST,
+        port: int = QUERY_SERVICE_PORT,
+        reload_seconds: float | None = QUERY_SERVICE_RELOAD_SECONDS,
+    ) -> None:
+        self.offers = offers
+        self.reload_seconds = reload_seconds
+        self._server: ThreadingHTTPServer = ThreadingHTTPServer(
+            (host, port), self._handler_class()
+        )
+        self._server.daemon_threads = True
+        self._thread: threading.Thread = threading.Thread(
+            target=self._server.serve_forever, name="offer-query-server", daemon=True
+        )
+
+    @property
+    def origin(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def __enter__(self) -> "OfferQueryServer":
+        if self.reload_seconds is not None:
+            self.offers.watch(self.reload_seconds)
+        self._thread.start()
+        logging.info(f"Offer query service listening on {self.origin}")
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self.offers.close()
+
+    def serve_forever(self) -> None:
+        with self:
+            self._thread.join()
+
+    def status(self) -> dict[str, Any]:
+        index: OfferIndex = self.offers.index
+        return {
+            "source": str(self.offers.source),
+            "offers": len(index),
+            "loaded_at": index.loaded_at,
+        }
+
+    def get(self, path: str) -> tuple[int, bytes]:
+        url: SplitResult = urlsplit(path)
+        if url.path == "/status":
+            return 200, encode(self.status())
+        if url.path != "/offers":
+            return 404, encode({"error": f"Unknown path: {url.path}"})
+        try:
+            query: OfferQuery = OfferQuery.model_validate(dict(parse_qsl(url.query)))
+        except ValidationError as error:
+            return 400, encode({"error": str(error)})
+        return 200, self.offers.index.query_json(query)
+
+    def post(self, path: str) -> tuple[int, bytes]:
+        if urlsplit(path).path != "/reload":
+            return 404, encode({"error": f"Unknown path: {path}"})
+        self.offers.reload()
+        return 200, encode(self.status())
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server: OfferQueryServer = self
+
+        class OfferQueryHandler(BaseHTTPRequestHandler):
+            # Keep-alive, clients polling the service reuse their connection.
+            # Headers and body are separate writes, with Nagle on each reply
+            # would wait for the delayed ACK of the client.
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                self._send(*server.get(self.path))
+
+            def do_POST(self) -> None:
+                self._send(*server.post(self.path))
+
+            def _send(self, status: int, body: bytes) -> None:
+                with contextlib.suppress(BrokenPipeError, ConnectionResetError):
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return OfferQueryHandler
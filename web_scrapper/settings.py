@@ -1,4 +1,6 @@
 import logging
+import os
+from pathlib import Path
 from typing import Final
 
 from dotenv import load_dotenv
@@ -9,7 +11,141 @@ AUDI_URL: Final[
     str
 ] = "https://www.audigainesville.com/global-incentives-search/index.htm?ddcref=tier1_offers"  # noqa: E501
 
+# Dealer sites on the same platform, crawled concurrently by the scheduler
+DEALER_URLS: Final[list[str]] = [AUDI_URL]
+DEALER_WORKERS: Final[int] = 4
+DEALER_MAX_RETRIES: Final[int] = 2
+DEALER_RETRY_DELAY_SECONDS: Final[float] = 30.0
+# Politeness limits applied to page loads per dealer host
+HOST_REQUESTS_PER_MINUTE: Final[int] = 30
+HOST_REQUEST_BUDGET: Final[int] = 500
+# Keep one browser per scheduler worker across dealers instead of one per dealer
+REUSE_BROWSER_SESSIONS: Final[bool] = True
+
+SCRAPER_WORKERS: Final[int] = min(4, os.cpu_count() or 1)
+# Model pages are loaded while earlier ones are still being extracted, the
+# queue bounds how many loaded pages can wait for an extraction worker
+EXTRACTION_WORKERS: Final[int] = 4
+EXTRACTION_QUEUE_SIZE: Final[int] = 8
+# "http" parses the served HTML and falls back to a browser, "selenium" always
+# uses a browser
+SCRAPER_BACKEND: Final[str] = "http"
+HTTP_TIMEOUT_SECONDS: Final[float] = 30.0
+HTTP_MAX_CONNECTIONS: Final[int] = 10
+# Lean browsers skip images, media, fonts and trackers and do not wait for
+# subresources, the scraper only reads the DOM
+LEAN_BROWSER: Final[bool] = True
+BROWSER_PROFILES_DIR: Final[Path] = Path(".cache/chrome-profiles")
+CHROMEDRIVER_PATH_CACHE_FILE: Final[Path] = Path(".cache/chromedriver_path")
+BROWSER_PAGE_READY_TIMEOUT_SECONDS: Final[float] = 10.0
+# Offer sections are rendered by scripts after the page is ready, a detail page
+# without any is given this long before it is read again
+BROWSER_OFFERS_READY_TIMEOUT_SECONDS: Final[float] = 5.0
+BROWSER_BLOCKED_URL_PATTERNS: Final[list[str]] = [
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.webp",
+    "*.avif",
+    "*.svg",
+    "*.ico",
+    "*.mp4",
+    "*.webm",
+    "*.mp3",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    "*.eot",
+    "*doubleclick.net*",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*googlesyndication.com*",
+    "*facebook.net*",
+    "*facebook.com/tr*",
+    "*bing.com*",
+    "*hotjar.com*",
+    "*youtube.com*",
+    "*ytimg.com*",
+]
+
+OUTPUT_FILE: Final[Path] = Path("extracted_offers.json")
+# Records are streamed to OUTPUT_FILE with a .jsonl suffix while crawling
+OUTPUT_FSYNC: Final[bool] = False
+COMPACT_OUTPUT: Final[bool] = True
+# None writes one offer per line, re-indenting every record dominates the
+# time to save large crawls
+OUTPUT_INDENT: Final[int | None] = None
+# Most offers serialized per write. Nothing is buffered across pages, the
+# offers of a dealer crawl or an extracted model page are written and flushed
+# as soon as they are ready, so a crash only loses offers not extracted yet.
+SERIALIZATION_BATCH_SIZE: Final[int] = 100
+# Optional indexed store of the offers, upserted across runs with the repeated
+# disclaimer and offer texts stored once
+SQLITE_OUTPUT: Final[bool] = False
+SQLITE_OUTPUT_FILE: Final[Path] = Path("extracted_offers.sqlite3")
+SQLITE_BATCH_SIZE: Final[int] = 100
+# python -m web_scrapper.service answers offer queries from memory and reloads
+# when a finished crawl replaces OUTPUT_FILE
+QUERY_SERVICE_HOST: Final[str] = "127.0.0.1"
+QUERY_SERVICE_PORT: Final[int] = 8765
+QUERY_SERVICE_RELOAD_SECONDS: Final[float] = 2.0
+# Largest ?limit= accepted, queries without a limit return every match
+QUERY_SERVICE_MAX_LIMIT: Final[int] = 10_000
+# p50/p95 timings, tokens and cost per phase of the last run
+RUN_REPORT_FILE: Final[Path] = Path("run_report.json")
+# web-scrapper --scrape-only writes the raw offer texts here for a later
+# --extract-only run
+RAW_OFFERS_FILE: Final[Path] = Path("raw_offers.jsonl")
+# web-scrapper --check-import-time fails above this, the CLI should start
+# without loading langchain or the OpenAI client
+IMPORT_TIME_BUDGET_SECONDS: Final[float] = 1.0
+# python -m web_scrapper.benchmark record/run
+BENCHMARK_RECORDING_FILE: Final[Path] = Path(".cache/benchmark/recording.json")
+BENCHMARK_RESULTS_FILE: Final[Path] = Path(".cache/benchmark/results.json")
+
+# Offers repeated across the models of a listing, exactly or with only the
+# model name changed, are extracted once per run and reused
+DEDUPLICATE_OFFERS: Final[bool] = True
+
+# Reruns skip extraction for models whose offers did not change and resume
+# interrupted crawls from the last completed model
+INCREMENTAL_CRAWL: Final[bool] = True
+CRAWL_STATE_FILE: Final[Path] = Path(".cache/crawl_state.json")
+
 LLM_MODEL_NAME: Final[str] = "gpt-3.5-turbo-0125"
 
+LLM_MAX_CONCURRENCY: Final[int] = 8
+LLM_MAX_RETRIES: Final[int] = 5
+LLM_REQUESTS_PER_MINUTE: Final[int] = 3_500
+LLM_TOKENS_PER_MINUTE: Final[int] = 160_000
+LLM_BATCH_EXTRACTION: Final[bool] = False
+LLM_BATCH_TOKEN_BUDGET: Final[int] = 4_000
+# Schema-driven prompt with json mode, the disclaimer is trimmed before it is
+# sent and copied from the offer text instead of being extracted
+LLM_COMPACT_PROMPT: Final[bool] = True
+LLM_DISCLAIMER_MAX_CHARS: Final[int] = 300
+# Latency budget: offers without a reply by the deadline are cancelled and
+# left for the next incremental run.
+LLM_LATENCY_BUDGET: Final[bool] = True
+# Opt-in hedging: a request still running after the LLM_HEDGE_PERCENTILE
+# latency of recent calls is sent again and the first valid reply wins. Each
+# hedge pays for the full prompt a second time, to the same model unless
+# LLM_HEDGE_MODEL_NAME is set, about 5% more spend at the 95th percentile.
+LLM_HEDGE_REQUESTS: Final[bool] = False
+LLM_HEDGE_PERCENTILE: Final[float] = 95.0
+# Until enough calls are observed the hedge waits a fixed delay
+LLM_HEDGE_MIN_SAMPLES: Final[int] = 20
+LLM_HEDGE_INITIAL_DELAY_SECONDS: Final[float] = 10.0
+LLM_HEDGE_MODEL_NAME: Final[str | None] = None
+LLM_DEADLINE_SECONDS: Final[float] = 60.0
+RULE_BASED_EXTRACTION: Final[bool] = True
+RULE_BASED_MIN_CONFIDENCE: Final[float] = 1.0
+
+EXTRACTION_CACHE_DIR: Final[Path] = Path(".cache/offer_extractions")
+EXTRACTION_CACHE_TTL_SECONDS: Final[float] = 7 * 24 * 60 * 60
+EXTRACTION_CACHE_MAX_ENTRIES: Final[int] = 10_000
+
 
 logging.basicConfig(level=logging.INFO)
@@ -0,0 +1,127 @@
+import itertools
+import json
+import logging
+import os
+import textwrap
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Final, Iterable, Iterator, TypeVar
+
+from pydantic import TypeAdapter
+
+from web_scrapper.instrumentation import instrumentation
+from web_scrapper.scrappers.audi.models_library import Offer
+from web_scrapper.settings import OUTPUT_INDENT
+
+T = TypeVar("T")
+
+OFFER_ADAPTER: Final[TypeAdapter[Offer]] = TypeAdapter(Offer)
+OFFERS_ADAPTER: Final[TypeAdapter[list[Offer]]] = TypeAdapter(list[Offer])
+
+
+def iter_batches(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    # islice stops at once for 0, which would silently drop every item
+    if size < 1:
+        raise ValueError(f"Batch size must be at least 1, got {size}")
+    iterator: Iterator[T] = iter(items)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+class JsonlSink:
+    output_file: Path
+    fsync: bool
+    records_written: int
+
+    def __init__(self, output_file: Path, fsync: bool = False) -> None:
+        self.output_file = output_file
+        self.fsync = fsync
+        self.records_written = 0
+        self._file: IO[bytes] | None = None
+
+    def __enter__(self) -> "JsonlSink":
+        self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.output_file, "wb")
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def write(self, offer: Offer) -> None:
+        self.write_many([offer])
+
+    def write_many(self, offers: list[Offer]) -> None:
+        assert self._file is not None, "Sink is not open"
+        with instrumentation.span("serialization", offers=len(offers)):
+            # pydantic-core encodes straight to utf-8 bytes, one write and
+            # one flush per batch instead of per record
+            self._file.write(
+                b"".join(OFFER_ADAPTER.dump_json(offer) + b"\n" for offer in offers)
+            )
+            # A crash loses at most the batch being written
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        self.records_written += len(offers)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_jsonl(jsonl_file: Path) -> Iterator[Offer]:
+    with open(jsonl_file, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield Offer.model_validate_json(line)
+
+
+def compact_jsonl(
+    jsonl_file: Path, output_file: Path, indent: int | None = OUTPUT_INDENT
+) -> int:
+    with instrumentation.span("compaction"):
+        return write_compacted(jsonl_file, output_file, indent)
+
+
+def write_compacted(
+    jsonl_file: Path, output_file: Path, indent: int | None = None
+) -> int:
+    # Writes a json array one record at a time, so compaction never holds the
+    # whole crawl in memory. Without indentation the jsonl records are copied
+    # as they are instead of being parsed and dumped again.
+    records_count: int = 0
+    tmp_file: Path = output_file.with_suffix(".tmp")
+    with open(jsonl_file, "rb") as source, open(tmp_file, "wb") as target:
+        for line in source:
+            record: bytes = line.strip()
+            if not record:
+                continue
+            if indent is not None:
+                record = textwrap.indent(
+                    json.dumps(json.loads(record), indent=indent, default=str),
+                    " " * indent,
+                ).encode("utf-8")
+            target.write(b"[\n" if records_count == 0 else b",\n")
+            target.write(record)
+            records_count += 1
+        target.write(b"\n]" if records_count else b"[]")
+    tmp_file.replace(output_file)
+
+    logging.info(f"Compacted {records_count} offers from {jsonl_file} to {output_file}")
+    return records_count
+
+
+def write_offers_json(
+    offers: list[Offer], output_file: Path, indent: int | None = OUTPUT_INDENT
+) -> None:
+    # Bulk path for offers already in memory, one pydantic-core call for the
+    # whole list
+    tmp_file: Path = output_file.with_suffix(".tmp")
+    tmp_file.write_bytes(OFFERS_ADAPTER.dump_json(offers, indent=indent))
+    tmp_file.replace(output_file)
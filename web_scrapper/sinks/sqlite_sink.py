@@ -0,0 +1,241 @@
+import hashlib
+import logging
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Final
+
+from web_scrapper.instrumentation import instrumentation
+from web_scrapper.scrappers.audi.models_library import Offer, OfferSettings
+
+# Long strings repeated across models, stored once in the texts table
+TEXT_FIELDS: Final[tuple[str, ...]] = ("disclaimer", "full_offer")
+OFFER_FIELDS: Final[tuple[str, ...]] = (
+    "dealer",
+    "audience_model",
+    "make",
+    "model",
+    "trim",
+    "year",
+    "condition",
+    "type",
+)
+SETTINGS_FIELDS: Final[tuple[str, ...]] = tuple(
+    name for name in OfferSettings.model_fields if name not in TEXT_FIELDS
+)
+COLUMNS: Final[tuple[str, ...]] = OFFER_FIELDS + SETTINGS_FIELDS
+# A deferred offer has only its text, the extraction of an earlier run is kept
+KEEP_EXTRACTED: Final[str] = "excluded.deferred AND NOT offers.deferred"
+SCHEMA: Final[
+    str
+] = f"""
+CREATE TABLE IF NOT EXISTS texts (
+    hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS offers (
+    offer_key TEXT PRIMARY KEY,
+    {", ".join(COLUMNS)},
+    disclaimer_hash TEXT REFERENCES texts (hash),
+    full_offer_hash TEXT REFERENCES texts (hash),
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS offers_model_year_type_expiration
+    ON offers (model, year, type, expiration);
+CREATE INDEX IF NOT EXISTS offers_trim ON offers (trim);
+CREATE INDEX IF NOT EXISTS offers_type_expiration ON offers (type, expiration);
+"""
+UPSERT_OFFER: Final[
+    str
+] = f"""
+INSERT INTO offers (
+    offer_key, {", ".join(COLUMNS)},
+    disclaimer_hash, full_offer_hash, first_seen, last_seen
+)
+VALUES ({", ".join("?" * (len(COLUMNS) + 5))})
+ON CONFLICT (offer_key) DO UPDATE SET
+    {", ".join(f"{name} = excluded.{name}" for name in OFFER_FIELDS)},
+    {", ".join(
+        f"{name} = CASE WHEN {KEEP_EXTRACTED} "
+        f"THEN offers.{name} ELSE excluded.{name} END"
+        for name in SETTINGS_FIELDS + ("disclaimer_hash",)
+    )},
+    last_seen = excluded.last_seen
+"""
+SELECT_OFFERS: Final[
+    str
+] = f"""
+SELECT {", ".join(f"offers.{name}" for name in COLUMNS)},
+    disclaimers.text, full_offers.text
+FROM offers
+LEFT JOIN texts AS disclaimers ON disclaimers.hash = offers.disclaimer_hash
+LEFT JOIN texts AS full_offers ON full_offers.hash = offers.full_offer_hash
+"""
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_offer_key(offer: Offer, full_offer_hash: str | None) -> str:
+    # The same offer text on the same model page is the same offer across runs
+    return hash_text(
+        "\x00".join(
+            [
+                offer.dealer or "",
+                offer.audience_model,
+                offer.type or "",
+                full_offer_hash or "",
+            ]
+        )
+    )
+
+
+def connect(database_file: Path) -> sqlite3.Connection:
+    database_file.parent.mkdir(parents=True, exist_ok=True)
+    connection: sqlite3.Connection = sqlite3.connect(database_file)
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def connect_read_only(database_file: Path) -> sqlite3.Connection:
+    # Queries never create the database, run the schema or switch the journal
+    return sqlite3.connect(f"{database_file.resolve().as_uri()}?mode=ro", uri=True)
+
+
+class SqliteSink:
+    database_file: Path
+    batch_size: int
+    records_written: int
+    run_started: str
+
+    def __init__(self, database_file: Path, batch_size: int = 100) -> None:
+        self.database_file = database_file
+        self.batch_size = batch_size
+        self.records_written = 0
+        self.run_started = datetime.now(timezone.utc).isoformat()
+        self._connection: sqlite3.Connection | None = None
+        self._texts: dict[str, str] = {}
+        self._rows: list[tuple[Any, ...]] = []
+
+    def __enter__(self) -> "SqliteSink":
+        self._connection = connect(self.database_file)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def write(self, offer: Offer) -> None:
+        assert self._connection is not None, "Sink is not open"
+        offer_settings: OfferSettings = offer.offer_settings or OfferSettings()
+        text_hashes: dict[str, str | None] = {}
+        for name in TEXT_FIELDS:
+            text: str | None = getattr(offer_settings, name)
+            if text is None:
+                text_hashes[name] = None
+                continue
+            text_hash: str = hash_text(text)
+            text_hashes[name] = text_hash
+            self._texts[text_hash] = text
+
+        self._rows.append(
+            (
+                make_offer_key(offer, text_hashes["full_offer"]),
+                *(getattr(offer, name) for name in OFFER_FIELDS),
+                *(getattr(offer_settings, name) for name in SETTINGS_FIELDS),
+                text_hashes["disclaimer"],
+                text_hashes["full_offer"],
+                self.run_started,
+                self.run_started,
+            )
+        )
+        self.records_written += 1
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        assert self._connection is not None, "Sink is not open"
+        if not self._rows:
+            return
+        with instrumentation.span("serialization", offers=len(self._rows)):
+            # One transaction per batch, a crash loses at most the open batch
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO texts (hash, text) VALUES (?, ?)",
+                    self._texts.items(),
+                )
+                self._connection.executemany(UPSERT_OFFER, self._rows)
+        self._texts.clear()
+        self._rows.clear()
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self.flush()
+            self._connection.close()
+            self._connection = None
+            logging.info(
+                f"{self.records_written} Extracted Offers stored in: "
+                f"{self.database_file}"
+            )
+
+
+def row_to_offer(row: tuple[Any, ...]) -> Offer:
+    settings_start: int = len(OFFER_FIELDS)
+    texts_start: int = len(COLUMNS)
+    offer_values: tuple[Any, ...] = row[:settings_start]
+    settings_values: tuple[Any, ...] = row[settings_start:texts_start]
+    text_values: tuple[Any, ...] = row[texts_start:]
+    return Offer(
+        **dict(zip(OFFER_FIELDS, offer_values)),
+        offer_settings=OfferSettings(
+            **dict(zip(SETTINGS_FIELDS, settings_values)),
+            **dict(zip(TEXT_FIELDS, text_values)),
+        ),
+    )
+
+
+def query_offers(
+    database_file: Path,
+    model: str | None = None,
+    year: int | None = None,
+    trim: str | None = None,
+    offer_type: str | None = None,
+    expires_from: str | None = None,
+    expires_to: str | None = None,
+    seen_since: str | None = None,
+) -> list[Offer]:
+    # Expiration dates are stored as YYYY-MM-DD, so ranges compare as strings
+    conditions: list[tuple[str, Any]] = [
+        (condition, value)
+        for condition, value in (
+            ("offers.model = ?", model),
+            ("offers.year = ?", year),
+            ("offers.trim = ?", trim),
+            ("offers.type = ?", offer_type),
+            ("offers.expiration >= ?", expires_from),
+            ("offers.expiration <= ?", expires_to),
+            ("offers.last_seen >= ?", seen_since),
+        )
+        if value is not None
+    ]
+    query: str = SELECT_OFFERS
+    if conditions:
+        query += " WHERE " + " AND ".join(condition for condition, _ in conditions)
+    query += " ORDER BY offers.model, offers.year, offers.expiration"
+
+    connection: sqlite3.Connection = connect_read_only(database_file)
+    try:
+        rows: list[tuple[Any, ...]] = connection.execute(
+            query, [value for _, value in conditions]
+        ).fetchall()
+    finally:
+        connection.close()
+    return [row_to_offer(row) for row in rows]